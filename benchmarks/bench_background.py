@@ -0,0 +1,87 @@
+"""背景绘制微基准: 每帧分支构建渐变 (旧实现) 对比预计算调色表
+
+用法: python benchmarks/bench_background.py [--frames N]
+"""
+import argparse
+import time
+
+from common import emit, load_plugin, setup_qt, summarize
+
+
+def legacy_background(painter, settings, rect, fill=True):
+    """旧版 draw_modern_background 的每帧开销: 取时间、分支、新建渐变"""
+    from PyQt5.QtCore import QTime, Qt
+    from PyQt5.QtGui import QBrush, QColor, QLinearGradient
+
+    gradient = QLinearGradient(0, 0, rect.width(), rect.height())
+    current_hour = QTime.currentTime().hour()
+    if 6 <= current_hour < 12:
+        gradient.setColorAt(0, QColor(255, 183, 77, int(settings.get('background_alpha', 50))))
+        gradient.setColorAt(1, QColor(255, 138, 101, int(settings.get('background_alpha', 50))))
+    elif 12 <= current_hour < 18:
+        gradient.setColorAt(0, QColor(74, 144, 226, int(settings.get('background_alpha', 50))))
+        gradient.setColorAt(1, QColor(80, 170, 255, int(settings.get('background_alpha', 50))))
+    elif 18 <= current_hour < 22:
+        gradient.setColorAt(0, QColor(255, 94, 77, int(settings.get('background_alpha', 50))))
+        gradient.setColorAt(1, QColor(255, 154, 0, int(settings.get('background_alpha', 50))))
+    else:
+        gradient.setColorAt(0, QColor(44, 62, 80, int(settings.get('background_alpha', 50))))
+        gradient.setColorAt(1, QColor(76, 84, 102, int(settings.get('background_alpha', 50))))
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QBrush(gradient))
+    if fill:
+        painter.drawRect(rect)
+
+
+def table_background(painter, palette, rect, fill=True):
+    """调色表实现: 一次查表得到现成画刷"""
+    from PyQt5.QtCore import QTime, Qt
+
+    current_time = QTime.currentTime()
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(palette.brush(palette.slot(current_time.hour(), current_time.minute())))
+    if fill:
+        painter.drawRect(rect)
+
+
+def run(frames):
+    setup_qt()
+    plugin_module = load_plugin("time.py")
+    from PyQt5.QtCore import QRect, Qt
+    from PyQt5.QtGui import QImage, QPainter
+
+    settings = dict(plugin_module.TimeDisplayPlugin().settings)
+    rect = QRect(0, 0, 400, 200)
+    image = QImage(rect.size(), QImage.Format_ARGB32_Premultiplied)
+
+    def measure(draw):
+        samples = []
+        for _ in range(frames):
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            start = time.perf_counter_ns()
+            draw(painter)
+            samples.append(time.perf_counter_ns() - start)
+            painter.end()
+        return summarize(samples)
+
+    palette = plugin_module.PaletteTable.for_settings(settings['theme'], settings['background_alpha'])
+    result = {"benchmark": "background", "frames": frames}
+    # prepare 只统计画刷准备, frame 包含 400x200 的渐变填充
+    for stage, fill in (("prepare", False), ("frame", True)):
+        before = measure(lambda painter: legacy_background(painter, settings, rect, fill))
+        after = measure(lambda painter: table_background(painter, palette, rect, fill))
+        result[stage] = {
+            "before": before,
+            "after": after,
+            "speedup_p50": before["p50_ms"] / after["p50_ms"] if after["p50_ms"] else None,
+        }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    emit(run(args.frames), args.output)
@@ -0,0 +1,120 @@
+"""帧合成方式基准: 每帧新建 QPixmap vs 可复用的预乘 ARGB QImage 后备缓冲
+
+对 render_mode 的每种取值 (pixmap / image), 分别在固定颜色和动态颜色下创建一个
+半透明时钟, 分两部分测量:
+
+- repaint: 按 20fps 的节奏推进时间和发光相位, 每帧只重绘变化的区域并记录耗时;
+  pixmap 模式每个新帧都分配并合成整张图, image 模式复用同一块缓冲, 只重新合成变化区域;
+- idle: 以 20fps 的动态颜色动画运行事件循环, 记录进程 CPU 时间和重绘次数。
+
+用法: python benchmarks/bench_backing_store.py [--frames N] [--seconds S] [--output FILE]
+"""
+import argparse
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt, summarize
+
+RENDER_MODES = ('pixmap', 'image')
+FRAME_INTERVAL_MS = 50
+
+
+def bench_mode(app, host, module, mode, frames, seconds, dynamic_color):
+    from PyQt5.QtCore import QDate, QTime, QTimer
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'render_mode': mode, 'dynamic_color': dynamic_color, 'animation_enabled': False})
+    plugin.operate_on_window(host)
+    widget = plugin.widget
+    app.processEvents()
+
+    # 预热, 生成静态图层
+    for _ in range(3):
+        widget.update_glow()
+        widget.repaint()
+
+    # 模拟时钟: 每帧推进 50ms 的时间和发光相位, 只重绘变化的区域。
+    # 不推进显示的时间时, 同一秒内的帧会反复命中共享帧缓存, 与实际运行不符
+    samples = []
+    now_ms = 0
+    widget.wall_clock = lambda: (QTime(0, 0).addMSecs(now_ms % 86400000), QDate(2024, 1, 1))
+    for _ in range(frames):
+        now_ms += FRAME_INTERVAL_MS
+        widget.glow_intensity, widget.animation_phase = module.glow_state(now_ms)
+        start = time.perf_counter_ns()
+        region = widget.dirty_region(widget.painted_state, widget.frame_state())
+        if not region.isEmpty():
+            widget.repaint(region)
+        samples.append(time.perf_counter_ns() - start)
+
+    # 开启动画后让事件循环按真实时间驱动重绘
+    del widget.wall_clock
+    plugin.apply_settings({'animation_enabled': True})
+    paints = [0]
+    original = widget.paintEvent
+
+    def counted(event):
+        paints[0] += 1
+        original(event)
+
+    widget.paintEvent = counted
+    cpu_start = time.process_time()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+
+    plugin.stop_timer()
+    widget.close()
+    widget.deleteLater()
+    return {
+        "render_mode": mode,
+        "dynamic_color": dynamic_color,
+        "size": [widget.width(), widget.height()],
+        "repaint": summarize(samples),
+        "idle": {"seconds": seconds, "cpu_ms": cpu_ms, "paints": paints[0],
+                 "cpu_ms_per_paint": cpu_ms / paints[0] if paints[0] else 0},
+    }
+
+
+def run(frames, seconds):
+    app = setup_qt()
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.setAttribute(Qt.WA_TranslucentBackground, True)
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    results = []
+    speedups = {}
+    # 固定颜色时每帧只有变化的数字或发光边框需要重绘, 动态颜色时整段文字每帧都变
+    for dynamic_color in (False, True):
+        by_mode = {mode: bench_mode(app, host, module, mode, frames, seconds, dynamic_color)
+                   for mode in RENDER_MODES}
+        pixmap, image = by_mode["pixmap"], by_mode["image"]
+        results.extend(by_mode.values())
+        speedups["dynamic_color" if dynamic_color else "static_color"] = {
+            "repaint_speedup": pixmap["repaint"]["mean_ms"] / image["repaint"]["mean_ms"],
+            "idle_cpu_ratio": image["idle"]["cpu_ms"] / pixmap["idle"]["cpu_ms"] if pixmap["idle"]["cpu_ms"] else 0,
+        }
+    return {
+        "benchmark": "backing_store",
+        "environment": environment(),
+        "frames": frames,
+        "results": results,
+        "speedups": speedups,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=400)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.frames, args.seconds)
+    emit(result, args.output)
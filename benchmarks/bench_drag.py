@@ -0,0 +1,188 @@
+"""拖动时钟的基准: 1 kHz 合成鼠标事件
+
+按下左键后以 --rate 的频率 (默认 1000 次/秒, 相当于高回报率鼠标) 向时钟发送
+移动事件, 持续 --seconds 秒后松开。事件按时间表补发: 事件循环被重绘占满时,
+到期的事件会在下一次定时器回调中一次发出, 与系统积压的鼠标事件一样。统计:
+
+- events / moves: 发出的移动事件数和控件实际移动的次数;
+- paints / host_paints: 时钟和宿主窗口的重绘次数;
+- cpu_ms: 进程 CPU 时间; lag_max_ms: 事件晚于计划时间发出的最大值;
+- persisted: 拖动期间加入设置写队列的次数; final_ok: 松开后控件停在最后的位置。
+
+每个 --shadow-modes 在独立的子进程中运行。--baseline 同时测量指定 git 版本的
+time.py, 用于前后对比。
+
+用法: python benchmarks/bench_drag.py [--rate N] [--seconds S] [--shadow-modes effect,cached] [--baseline REF]
+                                     [--output FILE]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import REPO_ROOT, checkout, emit, environment, plugin_output_to_stderr, setup_qt
+
+DEFAULT_SHADOW_MODES = ('effect', 'cached')
+TIMER_INTERVAL_MS = 1
+
+
+def load_time_plugin(path):
+    """按路径加载 time.py (当前版本或导出的旧版本)"""
+    spec = importlib.util.spec_from_file_location("time_plugin", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["time_plugin"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def drag_path(index):
+    """第 index 个事件相对起点的指针偏移"""
+    return index % 300, index // 300 % 100
+
+
+def run_drag(path, shadow_mode, rate, seconds):
+    """在子进程中拖动一个时钟, 返回统计"""
+    app = setup_qt()
+    from PyQt5.QtCore import QElapsedTimer, QEvent, QObject, QPoint, Qt, QTimer
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_time_plugin(path)
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'shadow_mode': shadow_mode, 'dynamic_color': True})
+    plugin.operate_on_window(host)
+    plugin.on_wallpaper_start("bench.mp4", True)
+    widget = plugin.widget
+
+    class Counter(QObject):
+        def __init__(self):
+            super().__init__()
+            self.counts = {}
+
+        def eventFilter(self, obj, event):
+            if event.type() in (QEvent.Move, QEvent.Paint):
+                key = (obj is widget, event.type())
+                self.counts[key] = self.counts.get(key, 0) + 1
+            return False
+
+    # 淡入结束后开始拖动
+    QTimer.singleShot(1000, app.quit)
+    app.exec_()
+    counter = Counter()
+    widget.installEventFilter(counter)
+    host.installEventFilter(counter)
+    persistence = module.SettingsPersistence.instance()
+    queued_before = persistence.queued_count
+
+    start_global = widget.mapToGlobal(QPoint(20, 20))
+    origin = widget.pos()
+
+    def send(kind, index, button, buttons):
+        dx, dy = drag_path(index)
+        point = QPoint(20 + dx, 20 + dy)
+        global_point = start_global + QPoint(dx, dy)
+        app.sendEvent(widget, QMouseEvent(kind, point, global_point, button, buttons, Qt.NoModifier))
+
+    send(QEvent.MouseButtonPress, 0, Qt.LeftButton, Qt.LeftButton)
+    total = int(rate * seconds)
+    sent = [0]
+    lag_max = [0.0]
+    clock = QElapsedTimer()
+
+    def tick():
+        elapsed = clock.nsecsElapsed() / 1e6
+        due = min(total, int(elapsed * rate / 1000))
+        if due > sent[0]:
+            lag_max[0] = max(lag_max[0], elapsed - (sent[0] + 1) * 1000 / rate)
+        while sent[0] < due:
+            sent[0] += 1
+            send(QEvent.MouseMove, sent[0], Qt.NoButton, Qt.LeftButton)
+        if sent[0] >= total:
+            timer.stop()
+            app.quit()
+
+    timer = QTimer()
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.timeout.connect(tick)
+    cpu_start = time.process_time()
+    clock.start()
+    timer.start(TIMER_INTERVAL_MS)
+    app.exec_()
+    drag_ms = clock.elapsed()
+    persisted = persistence.queued_count - queued_before
+    send(QEvent.MouseButtonRelease, sent[0], Qt.LeftButton, Qt.NoButton)
+    app.processEvents()
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+
+    dx, dy = drag_path(sent[0])
+    result = {
+        "shadow_mode": shadow_mode,
+        "events": sent[0],
+        "drag_ms": drag_ms,
+        "moves": counter.counts.get((True, QEvent.Move), 0),
+        "paints": counter.counts.get((True, QEvent.Paint), 0),
+        "host_paints": counter.counts.get((False, QEvent.Paint), 0),
+        "cpu_ms": cpu_ms,
+        "lag_max_ms": lag_max[0],
+        "persisted_during_drag": persisted,
+        "persisted_on_release": persistence.queued_count - queued_before - persisted,
+        "final_ok": widget.pos() == origin + QPoint(dx, dy),
+    }
+    plugin.close_widget()
+    return result
+
+
+def measure(path, shadow_modes, rate, seconds):
+    results = []
+    for mode in shadow_modes:
+        command = [sys.executable, os.path.abspath(__file__), "--child", path, "--shadow-modes", mode,
+                   "--rate", str(rate), "--seconds", str(seconds)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def run(shadow_modes, rate, seconds, baseline):
+    result = {
+        "benchmark": "drag",
+        "rate": rate,
+        "seconds": seconds,
+        "results": measure(os.path.join(REPO_ROOT, "time.py"), shadow_modes, rate, seconds),
+    }
+    if baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            result["baseline"] = measure(checkout(baseline, "time.py", directory), shadow_modes, rate, seconds)
+            result["baseline_ref"] = baseline
+
+    setup_qt()
+    result["environment"] = environment()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=1000, help="每秒的鼠标移动事件数")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--shadow-modes", default=",".join(DEFAULT_SHADOW_MODES), help="逗号分隔的窗口阴影模式")
+    parser.add_argument("--baseline", help="对比的 git 版本, 例如 HEAD~1")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+
+    if args.child:
+        with plugin_output_to_stderr():
+            result = run_drag(args.child, args.shadow_modes, args.rate, args.seconds)
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        result = run(args.shadow_modes.split(","), args.rate, args.seconds, args.baseline)
+        emit(result, args.output)
@@ -0,0 +1,104 @@
+"""插件启动开销: 模块导入和 create_plugin() 的耗时
+
+每个插件在独立子进程中以 -X importtime 加载。宿主程序本来就会加载的
+PyQt5 模块先行导入, 不计入插件成本; 之后插件触发的每个顶层导入都会列出,
+可以直接看到 tkinter 等依赖是否在扫描插件时被加载。
+
+用法: python benchmarks/bench_import.py [--repeat N] [--baseline GIT_REF]
+      --baseline 会同时测量指定 git 版本中的插件文件, 用于前后对比。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import REPO_ROOT, STUBS_DIR, checkout, emit
+
+PLUGINS = ("time.py", "notepad.py")
+MARKER = "--- plugin import start ---"
+
+CHILD = r'''
+import importlib.util, json, os, sys, time
+sys.path.insert(0, {stubs!r})
+from PyQt5 import QtCore, QtGui, QtWidgets
+sys.stderr.write({marker!r} + "\n")
+sys.stderr.flush()
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("plugin_under_test", {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+loaded = time.perf_counter()
+module.create_plugin()
+created = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (loaded - start) * 1000,
+    "create_plugin_ms": (created - loaded) * 1000,
+    "tkinter_loaded": "tkinter" in sys.modules,
+}}))
+'''
+
+
+def parse_importtime(stderr):
+    """解析标记之后的 -X importtime 输出, 返回插件触发的顶层导入"""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, raw_name = line[len("import time:"):].split("|", 2)
+        if not cumulative_us.strip().isdigit():
+            continue
+        # 顶层导入只有一个前导空格, 嵌套导入会额外缩进
+        if raw_name.startswith("  "):
+            continue
+        imports.append({"module": raw_name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(imports, key=lambda item: item["cumulative_ms"], reverse=True)
+
+
+def measure(path, repeat):
+    """多次测量取中位数, 导入明细取最后一次"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    runs = []
+    imports = []
+    for _ in range(repeat):
+        code = CHILD.format(stubs=STUBS_DIR, marker=MARKER, path=path)
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, env=env, check=True)
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        imports = parse_importtime(proc.stderr)
+
+    def median(key):
+        values = sorted(run[key] for run in runs)
+        return values[len(values) // 2]
+
+    return {
+        "import_ms": median("import_ms"),
+        "create_plugin_ms": median("create_plugin_ms"),
+        "tkinter_loaded": runs[-1]["tkinter_loaded"],
+        "top_imports": imports[:10],
+    }
+
+
+def run(repeat, baseline):
+    result = {"benchmark": "import", "repeat": repeat, "plugins": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for filename in PLUGINS:
+            entry = {"current": measure(os.path.join(REPO_ROOT, filename), repeat)}
+            if baseline:
+                entry["baseline"] = measure(checkout(baseline, filename, directory), repeat)
+                entry["baseline_ref"] = baseline
+            result["plugins"][filename] = entry
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="对比的 git 版本, 例如 HEAD~1")
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    emit(run(args.repeat, args.baseline), args.output)
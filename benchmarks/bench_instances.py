@@ -0,0 +1,151 @@
+"""多实例时钟的资源基准
+
+分别以 1、4、16 个时钟实例 (设置相同, 由 instances 设置创建) 运行事件循环,
+统计 CPU 时间、常驻内存增量、重绘次数、共享缓存条目数和定时器唤醒次数。
+所有实例共用一个时钟调度器、一个动画时钟、一个排版缓存和一个静态图层缓存,
+因此除逐实例的重绘外, 其余开销不应随实例数线性增长。
+
+--zones 以世界时钟模式运行, 每个实例显示一个不同的 IANA 时区, 同时统计
+时区数据库的查询次数 (只在夏令时转换时发生, 正常应等于时区数)。
+
+每个实例数在独立的子进程中运行, 内存数据互不干扰。
+
+用法: python benchmarks/bench_instances.py [--seconds S] [--counts 1,4,16] [--zones] [--output FILE]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+DEFAULT_COUNTS = (1, 4, 16)
+GRID_SPACING = 20
+
+
+def current_rss_kb():
+    """当前常驻内存 (KB), 读取 /proc 失败时返回 0"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def run_instances(count, seconds, zones):
+    """在子进程中运行 count 个实例 seconds 秒并返回统计"""
+    app = setup_qt()
+    from PyQt5.QtCore import QTimer, QTimeZone
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(1920, 1080)
+    host.show()
+    app.processEvents()
+    rss_before = current_rss_kb()
+
+    plugin = module.create_plugin()
+    # 网格排列, 世界时钟模式下缩小一半以容纳几十个时区
+    scale = 0.5 if zones else 1.0
+    cell_width = int(module.CLOCK_WIDTH * scale) + GRID_SPACING
+    cell_height = int(module.CLOCK_HEIGHT * scale) + GRID_SPACING
+    columns = host.width() // cell_width
+    instances = [
+        {"x": GRID_SPACING + index % columns * cell_width, "y": GRID_SPACING + index // columns * cell_height,
+         "scale": scale}
+        for index in range(count)
+    ]
+    if zones:
+        # 取带夏令时转换的时区, 覆盖偏移表的转换处理
+        zone_ids = [bytes(zone).decode() for zone in QTimeZone.availableTimeZoneIds()
+                    if b'/' in bytes(zone) and QTimeZone(zone).hasDaylightTime()]
+        for item, zone in zip(instances, zone_ids):
+            item["zone"] = zone
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'instances': json.dumps(instances), 'dynamic_color': True})
+    plugin.operate_on_window(host)
+    plugin.on_wallpaper_start("bench.mp4", True)
+
+    # 统计每个实例的重绘次数
+    paints = [0]
+    for widget in plugin.widgets:
+        original = widget.paintEvent
+
+        def counted(event, original=original):
+            paints[0] += 1
+            original(event)
+
+        widget.paintEvent = counted
+
+    # 淡入动画结束后开始计时
+    QTimer.singleShot(1000, app.quit)
+    app.exec_()
+    paints[0] = 0
+    wakeups_before = plugin.get_animation_stats()["wakeups"]
+    ticks_before = plugin.get_scheduler_stats()["ticks"]
+
+    cpu_start = time.process_time()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+
+    result = {
+        "instances": len(plugin.widgets),
+        "seconds": seconds,
+        "cpu_ms": cpu_ms,
+        "cpu_ms_per_instance": cpu_ms / count,
+        "rss_delta_kb": current_rss_kb() - rss_before,
+        "paints": paints[0],
+        "animation_wakeups": plugin.get_animation_stats()["wakeups"] - wakeups_before,
+        "clock_ticks": plugin.get_scheduler_stats()["ticks"] - ticks_before,
+        "layer_cache": plugin.get_render_cache_stats(),
+        "text_layout_cache": plugin.get_text_layout_stats(),
+        "zone_table": plugin.get_zone_stats(),
+    }
+    plugin.close_widget()
+    return result
+
+
+def run(counts, seconds, zones):
+    results = []
+    for count in counts:
+        command = [sys.executable, os.path.abspath(__file__), "--child", str(count), "--seconds", str(seconds)]
+        if zones:
+            command.append("--zones")
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    # 相对单实例的增长倍数, 小于实例数即为亚线性
+    base = results[0]
+    for result in results:
+        result["cpu_growth"] = result["cpu_ms"] / base["cpu_ms"] if base["cpu_ms"] else 0
+        result["rss_growth"] = result["rss_delta_kb"] / base["rss_delta_kb"] if base["rss_delta_kb"] else 0
+
+    setup_qt()
+    return {
+        "benchmark": "world_clock" if zones else "instances",
+        "environment": environment(),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--counts", default=",".join(map(str, DEFAULT_COUNTS)), help="逗号分隔的实例数")
+    parser.add_argument("--zones", action="store_true", help="每个实例显示不同的时区")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+
+    if args.child:
+        with plugin_output_to_stderr():
+            result = run_instances(args.child, args.seconds, args.zones)
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        result = run([int(count) for count in args.counts.split(",")], args.seconds, args.zones)
+        emit(result, args.output)
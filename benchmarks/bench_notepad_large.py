@@ -0,0 +1,249 @@
+"""记事本大文本基准: 10 MB 笔记存放在 QSettings vs 大文本模式的笔记文件
+
+每种模式分两个子进程运行, 共用同一个设置目录:
+
+- prepare: 生成约 10 MB 的日志式笔记并保存 (普通模式写入 QSettings,
+  大文本模式写入笔记文件, QSettings 中只保留其他设置);
+- measure: 在新进程中加载设置、创建记事本控件, 记录设置加载耗时、控件
+  创建到显示的耗时和常驻内存增量; 然后在末尾追加一行、在中间原地修改
+  一个字符、在开头插入一行, 记录每次修改的应用耗时、保存耗时和写入的
+  字节数; 再在开头连续输入若干次不保存, 记录输入期间和防抖窗口结束后
+  的文件写入次数; 最后打开设置面板, 记录打开耗时、内容填完的耗时和
+  期间事件循环单轮的最长耗时。
+
+用法: python benchmarks/bench_notepad_large.py [--megabytes N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+MODES = ('settings', 'large')
+TYPING_EDITS = 20
+LINE = "2024-01-01 12:00:{:02d} [INFO] worker-{:03d} 处理任务 #{} 完成, 耗时 {} ms\n"
+
+
+def note_text(megabytes):
+    """生成约 megabytes MB (UTF-8) 的日志式文本"""
+    lines = []
+    size = 0
+    index = 0
+    while size < megabytes * 1024 * 1024:
+        line = LINE.format(index % 60, index % 128, index, index % 997)
+        lines.append(line)
+        size += len(line.encode('utf-8'))
+        index += 1
+    return "".join(lines)
+
+
+def current_rss_kb():
+    """当前常驻内存 (KB), 读取 /proc 失败时返回 0"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def use_settings_dir(directory):
+    """让两个阶段的子进程读写同一个设置目录"""
+    from PyQt5.QtCore import QSettings
+    for fmt in (QSettings.NativeFormat, QSettings.IniFormat):
+        QSettings.setPath(fmt, QSettings.UserScope, directory)
+
+
+def prepare(mode, directory, megabytes):
+    app = setup_qt()
+    use_settings_dir(directory)
+    module = load_plugin("notepad.py")
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'note_file': os.path.join(directory, 'note.txt'), 'note_content': note_text(megabytes),
+                           'large_note': mode == 'large'})
+    plugin.save_settings()
+    module.SettingsPersistence.instance().flush()
+    app.processEvents()
+    return {}
+
+
+def timed_ms(function, *args):
+    start = time.perf_counter_ns()
+    result = function(*args)
+    return (time.perf_counter_ns() - start) / 1e6, result
+
+
+def wait_loop(app, milliseconds):
+    from PyQt5.QtCore import QTimer
+
+    QTimer.singleShot(milliseconds, app.quit)
+    app.exec_()
+
+
+def open_panel(app, plugin):
+    """打开设置面板并运行事件循环直到笔记内容填完, 返回耗时和单轮最长耗时"""
+    from PyQt5.QtCore import QElapsedTimer, QTimer
+    from PyQt5.QtWidgets import QPlainTextEdit
+
+    open_ms, _ = timed_ms(plugin.show_settings_dialog)
+    editor = plugin.settings_panel.findChild(QPlainTextEdit)
+    clock = QElapsedTimer()
+    clock.start()
+    last = [0]
+    longest = [0]
+
+    def probe():
+        now = clock.elapsed()
+        longest[0] = max(longest[0], now - last[0])
+        last[0] = now
+        if not editor.isReadOnly():
+            app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(probe)
+    timer.start(0)
+    app.exec_()
+    timer.stop()
+    return {
+        "open_ms": open_ms,
+        "fill_ms": clock.elapsed(),
+        "max_turn_ms": longest[0],
+        "filled": editor.toPlainText() == plugin.settings['note_content'],
+    }
+
+
+def measure(mode, directory):
+    app = setup_qt()
+    use_settings_dir(directory)
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("notepad.py")
+    # 插件导入后, 与插件同目录的共享模块已可导入
+    import wallpaper_shared
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+    persistence = module.SettingsPersistence.instance()
+    rss_before = current_rss_kb()
+
+    plugin = module.create_plugin()
+    load_ms, _ = timed_ms(plugin.ensure_settings_loaded)
+
+    def show():
+        plugin.operate_on_window(host)
+        app.processEvents()
+
+    show_ms, _ = timed_ms(show)
+    rss_after_show = current_rss_kb()
+
+    def edit(text):
+        """应用一次修改并保存, 返回耗时和写入的字节数"""
+        store = plugin.note_store
+        written_before = store.bytes_written if store else 0
+        apply_ms, _ = timed_ms(plugin.apply_settings, {'note_content': text})
+        persistence_before = persistence.stats()["last_flush_ms"]
+        save_ms, _ = timed_ms(lambda: (plugin.save_settings(), persistence.flush()))
+        store = plugin.note_store
+        return {
+            "apply_ms": apply_ms,
+            "save_ms": save_ms,
+            "flush_ms": persistence.stats()["last_flush_ms"] if save_ms else persistence_before,
+            "file_bytes_written": (store.bytes_written if store else 0) - written_before,
+        }
+
+    # 修改前先取得全文, 相当于打开设置面板
+    full_text_ms, text = timed_ms(plugin.note_text)
+    append = edit(text + "追加的一行\n")
+    text = plugin.settings['note_content']
+    middle = len(text) // 2
+    in_place = edit(text[:middle] + ("X" if text[middle] != "X" else "Y") + text[middle + 1:])
+    prepend = edit("开头插入的一行\n" + plugin.settings['note_content'])
+
+    # 在开头连续输入, 不点保存: 大文本模式下修改留在内存中, 防抖窗口结束后写入一次
+    store = plugin.note_store
+    writes_before = store.writes if store else 0
+    typing_ms = []
+    for index in range(TYPING_EDITS):
+        text = plugin.settings['note_content']
+        elapsed_ms, _ = timed_ms(plugin.apply_settings, {'note_content': text[:index] + "字" + text[index:]})
+        typing_ms.append(elapsed_ms)
+    writes_typing = (store.writes if store else 0) - writes_before
+    wait_loop(app, wallpaper_shared.SETTINGS_DEBOUNCE_MS + 200)
+    typing = {
+        "edits": TYPING_EDITS,
+        "apply_ms_max": max(typing_ms),
+        "apply_ms_total": sum(typing_ms),
+        "file_writes_while_typing": writes_typing,
+        "file_writes_after_debounce": (store.writes if store else 0) - writes_before - writes_typing,
+    }
+    panel = open_panel(app, plugin)
+
+    result = {
+        "mode": mode,
+        "note_bytes": len(text.encode('utf-8')),
+        "settings_load_ms": load_ms,
+        "show_ms": show_ms,
+        "rss_delta_kb": rss_after_show - rss_before,
+        "displayed_chars": plugin.get_note_stats()["loaded_chars"],
+        "full_text_ms": full_text_ms,
+        "append_edit": append,
+        "in_place_edit": in_place,
+        "prepend_edit": prepend,
+        "typing_at_start": typing,
+        "settings_panel": panel,
+    }
+    plugin.settings_panel.close()
+    plugin.close_widget()
+    return result
+
+
+def run(megabytes):
+    results = []
+    for mode in MODES:
+        directory = tempfile.mkdtemp(prefix="notepad-large-")
+        for phase in ("prepare", "measure"):
+            command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--phase", phase,
+                       "--dir", directory, "--megabytes", str(megabytes)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    setup_qt()
+    by_mode = {result["mode"]: result for result in results}
+    settings, large = by_mode["settings"], by_mode["large"]
+    return {
+        "benchmark": "notepad_large",
+        "environment": environment(),
+        "megabytes": megabytes,
+        "results": results,
+        "settings_load_speedup": settings["settings_load_ms"] / large["settings_load_ms"]
+        if large["settings_load_ms"] else 0,
+        "show_speedup": settings["show_ms"] / large["show_ms"] if large["show_ms"] else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=10)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--phase", choices=("prepare", "measure"), help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+
+    if args.child:
+        with plugin_output_to_stderr():
+            if args.phase == "prepare":
+                result = prepare(args.child, args.dir, args.megabytes)
+            else:
+                result = measure(args.child, args.dir)
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        result = run(args.megabytes)
+        emit(result, args.output)
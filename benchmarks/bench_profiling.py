@@ -0,0 +1,82 @@
+"""绘制耗时分析的开销基准
+
+同一个时钟分别在关闭和开启 paint_profiling 时, 按 20fps 的节奏推进时间和
+发光相位并重绘变化的区域, 比较单帧耗时; 同时输出开启时记录到的各阶段
+p50/p95/最大耗时。关闭时每个阶段只多一次分支判断, 两者的差即为记录本身的开销。
+
+用法: python benchmarks/bench_profiling.py [--frames N] [--rounds N] [--output FILE]
+"""
+import argparse
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt, summarize
+
+FRAME_INTERVAL_MS = 50
+
+
+def measure(module, widget, frames, start_ms):
+    """从 start_ms 开始模拟 frames 帧, 返回每帧耗时 (纳秒)"""
+    from PyQt5.QtCore import QDate, QTime
+
+    now_ms = start_ms
+    widget.wall_clock = lambda: (QTime(0, 0).addMSecs(now_ms % 86400000), QDate(2024, 1, 1))
+    samples = []
+    for _ in range(frames):
+        now_ms += FRAME_INTERVAL_MS
+        widget.glow_intensity, widget.animation_phase = module.glow_state(now_ms)
+        start = time.perf_counter_ns()
+        region = widget.dirty_region(widget.painted_state, widget.frame_state())
+        if not region.isEmpty():
+            widget.repaint(region)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def run(frames, rounds):
+    app = setup_qt()
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'dynamic_color': True, 'animation_enabled': False})
+    plugin.operate_on_window(host)
+    widget = plugin.widget
+    app.processEvents()
+    measure(module, widget, frames, 0)
+
+    # 交替测量, 抵消缓存预热和频率波动
+    samples = {False: [], True: []}
+    for index in range(rounds):
+        for enabled in (False, True):
+            plugin.apply_settings({'paint_profiling': enabled})
+            samples[enabled] += measure(module, widget, frames, (index * 2 + enabled + 1) * frames * FRAME_INTERVAL_MS)
+    profile = plugin.get_paint_profile()
+    plugin.close_widget()
+
+    disabled, enabled = summarize(samples[False]), summarize(samples[True])
+    return {
+        "benchmark": "profiling",
+        "environment": environment(),
+        "frames": frames * rounds,
+        "disabled": disabled,
+        "enabled": enabled,
+        "overhead_ratio": enabled["mean_ms"] / disabled["mean_ms"] - 1,
+        "profile": profile,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.frames, args.rounds)
+    emit(result, args.output)
@@ -0,0 +1,163 @@
+"""两个插件控件的离屏渲染基准
+
+在 QT_QPA_PLATFORM=offscreen 下把控件逐帧渲染到 QImage, 覆盖时间控件的
+设置矩阵 (阴影/发光/装饰/动态颜色开关, 字号 24-96, 12/24 小时制, 是否显示
+日期) 和记事本的字号/内容长度, 输出 p50/p95/p99 帧时间、每帧内存分配和
+峰值 RSS 的 JSON 结果, 用于在版本之间追踪性能回退。
+
+内容不变时时间控件的重绘大多直接复用共享的合成帧, 默认的帧时间 (warm) 衡量的
+是这种情况。时间控件另外报告 cold: 每个计时帧之前清空静态图层缓存和合成帧
+缓存 (清空不计时), 衡量完整合成一帧的耗时, 可与引入这些缓存之前的结果对比。
+
+用法: python benchmarks/bench_render.py [--frames N] [--quick] [--output FILE]
+"""
+import argparse
+import itertools
+import sys
+import time
+import tracemalloc
+
+from common import emit, environment, load_plugin, peak_rss_kb, plugin_output_to_stderr, setup_qt, summarize
+
+EFFECT_KEYS = ('use_shadow', 'use_glow', 'show_decorations', 'dynamic_color')
+FONT_SIZES = (24, 48, 72, 96)
+QUICK_FONT_SIZES = (24, 96)
+NOTE_FONT_SIZES = (12, 18, 24)
+NOTE_LINES = (5, 500)
+
+
+def time_widget_matrix(quick):
+    """生成时间控件的设置矩阵"""
+    font_sizes = QUICK_FONT_SIZES if quick else FONT_SIZES
+    for effects in itertools.product((False, True), repeat=len(EFFECT_KEYS)):
+        for font_size, time_format, show_date in itertools.product(font_sizes, ('24h', '12h'), (True, False)):
+            config = dict(zip(EFFECT_KEYS, effects))
+            config.update(font_size=font_size, time_format=time_format, show_date=show_date)
+            yield config
+
+
+def measure_frames(widget, frames, before_frame=None, invalidate=None, allocations=True):
+    """渲染 frames 帧, 返回帧时间统计和每帧的分配统计
+
+    给出 invalidate 时在每个计时帧之前调用 (不计时), 用于清空缓存。
+    """
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    image = QImage(widget.size(), QImage.Format_ARGB32_Premultiplied)
+
+    def render_one():
+        if before_frame:
+            before_frame()
+        image.fill(Qt.transparent)
+        widget.render(image)
+
+    # 预热, 让各类缓存进入稳定状态
+    for _ in range(3):
+        render_one()
+
+    samples = []
+    for _ in range(frames):
+        if invalidate:
+            invalidate()
+        start = time.perf_counter_ns()
+        render_one()
+        samples.append(time.perf_counter_ns() - start)
+    if not allocations:
+        return summarize(samples)
+
+    # 分配统计单独一轮, 避免 tracemalloc 影响计时
+    alloc_frames = max(1, min(frames, 20))
+    tracemalloc.start()
+    peak_bytes = 0
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(alloc_frames):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        render_one()
+        peak_bytes += tracemalloc.get_traced_memory()[1] - current
+    net_blocks = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    stats = summarize(samples)
+    stats["alloc_peak_bytes_per_frame"] = peak_bytes / alloc_frames
+    stats["net_blocks_per_frame"] = net_blocks / alloc_frames
+    return stats
+
+
+def invalidate_caches(module):
+    """清空静态图层和合成帧缓存, 下一帧从头合成"""
+    module.STATIC_LAYER_CACHE.clear()
+    module.SHARED_FRAME_CACHE.clear()
+
+
+def bench_time_widget(host, frames, quick):
+    module = load_plugin("time.py")
+    results = []
+    for config in time_widget_matrix(quick):
+        plugin = module.create_plugin()
+        # 先加载设置, 否则 operate_on_window 首次加载时会覆盖下面的矩阵设置
+        plugin.ensure_settings_loaded()
+        # 关闭淡入动画, 直接以完全不透明状态渲染
+        plugin.apply_settings(dict(config, animation_enabled=False))
+        plugin.operate_on_window(host)
+        widget = plugin.widget
+
+        stats = measure_frames(widget, frames, before_frame=widget.update_glow)
+        stats["cold"] = measure_frames(widget, frames, before_frame=widget.update_glow,
+                                       invalidate=lambda: invalidate_caches(module), allocations=False)
+        results.append({"settings": config, **stats})
+
+        plugin.stop_timer()
+        widget.close()
+        widget.deleteLater()
+    return results
+
+
+def bench_notepad(host, frames):
+    module = load_plugin("notepad.py")
+    results = []
+    for font_size, lines in itertools.product(NOTE_FONT_SIZES, NOTE_LINES):
+        plugin = module.create_plugin()
+        plugin.ensure_settings_loaded()
+        plugin.settings.update(
+            font_size=font_size,
+            note_content="\n".join(f"第 {i} 行: 桌面记事本渲染基准" for i in range(lines)),
+        )
+        plugin.operate_on_window(host)
+
+        stats = measure_frames(plugin.widget, frames)
+        results.append({"settings": {"font_size": font_size, "lines": lines}, **stats})
+        plugin.close_widget()
+    return results
+
+
+def run(frames, quick):
+    app = setup_qt()
+    from PyQt5.QtWidgets import QWidget
+
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    result = {
+        "benchmark": "render",
+        "environment": environment(),
+        "frames": frames,
+        "time_widget": bench_time_widget(host, frames, quick),
+        "notepad": bench_notepad(host, frames),
+    }
+    result["peak_rss_kb"] = peak_rss_kb()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--quick", action="store_true", help="缩小字号矩阵")
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.frames, args.quick)
+    emit(result, args.output)
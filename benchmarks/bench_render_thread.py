@@ -0,0 +1,122 @@
+"""渲染线程基准: GUI 线程中合成 vs 渲染线程合成到 QImage 双缓冲
+
+对 render_mode 的每种取值 (pixmap / image / thread) 在独立的子进程中创建
+若干个缩放不同的时钟实例 (不共用合成帧), 开启动态颜色和缓存阴影, 以动画
+帧率上限运行事件循环, 统计:
+
+- gui_cpu_ms: GUI 线程的 CPU 时间 (time.thread_time), 即 GUI 线程的忙碌时间;
+- process_cpu_ms: 整个进程的 CPU 时间, thread 模式下包括渲染线程;
+- paints: 重绘次数; thread 模式下另有渲染线程合成的帧数和丢弃的请求数。
+
+用法: python benchmarks/bench_render_thread.py [--seconds S] [--instances N] [--fps N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+RENDER_MODES = ('pixmap', 'image', 'thread')
+
+
+def run_mode(mode, seconds, count, fps):
+    """在子进程中以 mode 运行 count 个实例 seconds 秒并返回统计"""
+    app = setup_qt()
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(1920, 1080)
+    host.show()
+    app.processEvents()
+
+    # 缩放各不相同, pixmap 模式下实例之间不能共用合成帧
+    instances = [{"x": 20 + index % 3 * 600, "y": 20 + index // 3 * 320, "scale": 1.0 - index * 0.05}
+                 for index in range(count)]
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'instances': json.dumps(instances), 'dynamic_color': True, 'shadow_mode': 'cached',
+                           'animation_fps_cap': fps, 'render_mode': mode})
+    plugin.operate_on_window(host)
+    plugin.on_wallpaper_start("bench.mp4", True)
+
+    paints = [0]
+    for widget in plugin.widgets:
+        original = widget.paintEvent
+
+        def counted(event, original=original):
+            paints[0] += 1
+            original(event)
+
+        widget.paintEvent = counted
+
+    # 淡入动画结束、缓存预热后开始计时
+    QTimer.singleShot(1000, app.quit)
+    app.exec_()
+    paints[0] = 0
+    before = plugin.get_render_thread_stats()
+
+    gui_start, cpu_start = time.thread_time(), time.process_time()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    gui_ms = (time.thread_time() - gui_start) * 1000
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+
+    after = plugin.get_render_thread_stats()
+    result = {
+        "render_mode": mode,
+        "instances": len(plugin.widgets),
+        "seconds": seconds,
+        "gui_cpu_ms": gui_ms,
+        "gui_busy_ratio": gui_ms / (seconds * 1000),
+        "process_cpu_ms": cpu_ms,
+        "paints": paints[0],
+        "gui_cpu_ms_per_paint": gui_ms / paints[0] if paints[0] else 0,
+        "rendered": after["rendered"] - before["rendered"],
+        "dropped": after["dropped"] - before["dropped"],
+    }
+    plugin.close_widget()
+    return result
+
+
+def run(seconds, count, fps):
+    results = []
+    for mode in RENDER_MODES:
+        command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--seconds", str(seconds),
+                   "--instances", str(count), "--fps", str(fps)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    setup_qt()
+    by_mode = {result["render_mode"]: result for result in results}
+    image, thread = by_mode["image"], by_mode["thread"]
+    return {
+        "benchmark": "render_thread",
+        "environment": environment(),
+        "results": results,
+        # 相对 image 模式的 GUI 线程忙碌时间和进程总 CPU 时间
+        "gui_cpu_ratio": thread["gui_cpu_ms"] / image["gui_cpu_ms"] if image["gui_cpu_ms"] else 0,
+        "process_cpu_ratio": thread["process_cpu_ms"] / image["process_cpu_ms"] if image["process_cpu_ms"] else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--fps", type=int, default=30, help="动画帧率上限")
+    parser.add_argument("--child", choices=RENDER_MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+
+    if args.child:
+        with plugin_output_to_stderr():
+            result = run_mode(args.child, args.seconds, args.instances, args.fps)
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        result = run(args.seconds, args.instances, args.fps)
+        emit(result, args.output)
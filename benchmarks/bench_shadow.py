@@ -0,0 +1,99 @@
+"""窗口阴影基准: Qt 阴影特效 vs 预模糊的缓存阴影图层
+
+对 shadow_mode 的每种取值 (effect / cached / none) 创建一个时钟, 分两部分测量:
+
+- repaint: 连续强制重绘, 记录单次重绘耗时; effect 模式每次重绘都要离屏渲染
+  整个控件并做 CPU 模糊, cached 模式只贴一张缓存图层;
+- idle: 以 20fps 的动态颜色动画运行事件循环, 记录进程 CPU 时间和重绘次数。
+
+用法: python benchmarks/bench_shadow.py [--frames N] [--seconds S] [--output FILE]
+"""
+import argparse
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt, summarize
+
+SHADOW_MODES = ('effect', 'cached', 'none')
+
+
+def bench_mode(app, host, module, mode, frames, seconds):
+    from PyQt5.QtCore import QTimer
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'shadow_mode': mode, 'dynamic_color': True, 'animation_enabled': False})
+    plugin.operate_on_window(host)
+    widget = plugin.widget
+    app.processEvents()
+
+    # 预热, 生成缓存图层
+    for _ in range(3):
+        widget.update_glow()
+        widget.repaint()
+
+    samples = []
+    for _ in range(frames):
+        widget.update_glow()
+        start = time.perf_counter_ns()
+        widget.repaint()
+        samples.append(time.perf_counter_ns() - start)
+
+    # 开启动画后让事件循环自行驱动重绘
+    plugin.apply_settings({'animation_enabled': True})
+    paints = [0]
+    original = widget.paintEvent
+
+    def counted(event):
+        paints[0] += 1
+        original(event)
+
+    widget.paintEvent = counted
+    cpu_start = time.process_time()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+
+    plugin.stop_timer()
+    widget.close()
+    widget.deleteLater()
+    return {
+        "shadow_mode": mode,
+        "size": [widget.width(), widget.height()],
+        "repaint": summarize(samples),
+        "idle": {"seconds": seconds, "cpu_ms": cpu_ms, "paints": paints[0],
+                 "cpu_ms_per_paint": cpu_ms / paints[0] if paints[0] else 0},
+    }
+
+
+def run(frames, seconds):
+    app = setup_qt()
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    results = [bench_mode(app, host, module, mode, frames, seconds) for mode in SHADOW_MODES]
+    by_mode = {result["shadow_mode"]: result for result in results}
+    effect, cached = by_mode["effect"], by_mode["cached"]
+    return {
+        "benchmark": "shadow",
+        "environment": environment(),
+        "frames": frames,
+        "results": results,
+        "repaint_speedup": effect["repaint"]["mean_ms"] / cached["repaint"]["mean_ms"],
+        "idle_cpu_ratio": cached["idle"]["cpu_ms"] / effect["idle"]["cpu_ms"] if effect["idle"]["cpu_ms"] else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.frames, args.seconds)
+    emit(result, args.output)
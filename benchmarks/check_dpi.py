@@ -0,0 +1,126 @@
+"""时间控件的 DPI 裁剪检查
+
+分别以 QT_SCALE_FACTOR=1、1.5、2 (每个缩放一个子进程) 在 offscreen 平台上
+渲染时间控件, 覆盖字号 24-96、12/24 小时制、是否显示日期、世界时钟标签和
+实例缩放。对每种组合检查:
+
+- 合成帧的物理像素尺寸等于逻辑尺寸乘以设备像素比 (不会被放大模糊);
+- 只绘制文字时, 图像最外一圈像素完全透明, 即时间和日期没有被控件边缘裁剪。
+
+任一组合不通过时以非零状态退出。
+
+用法: python benchmarks/check_dpi.py [--factors 1,1.5,2] [--output FILE]
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+DEFAULT_FACTORS = (1, 1.5, 2)
+FONT_SIZES = (24, 48, 72, 96)
+INSTANCE_SCALES = (0.5, 1.0, 2.0)
+
+
+def check_matrix():
+    """生成 (设置, 实例缩放, 时区) 组合"""
+    for font_size, time_format, show_date, zone in itertools.product(
+            FONT_SIZES, ('24h', '12h'), (True, False), ('', 'America/Argentina/Buenos_Aires')):
+        for scale in INSTANCE_SCALES:
+            yield {'font_size': font_size, 'time_format': time_format, 'show_date': show_date}, scale, zone
+
+
+def edge_is_clear(image):
+    """图像最外一圈像素是否完全透明"""
+    width, height = image.width(), image.height()
+    for x in range(width):
+        if image.pixelColor(x, 0).alpha() or image.pixelColor(x, height - 1).alpha():
+            return False
+    for y in range(height):
+        if image.pixelColor(0, y).alpha() or image.pixelColor(width - 1, y).alpha():
+            return False
+    return True
+
+
+def run_factor():
+    """在当前进程的缩放因子下检查全部组合"""
+    app = setup_qt()
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(3840, 2160)
+    host.show()
+    app.processEvents()
+
+    failures = []
+    checked = 0
+    for settings, scale, zone in check_matrix():
+        # 只保留文字: 关闭背景、发光边框、装饰、文字阴影和窗口阴影
+        config = module.RenderConfig(dict(settings, background_alpha=0, use_glow=False, show_decorations=False,
+                                          use_shadow=False, shadow_mode='none', dynamic_color=False,
+                                          theme='neon'))
+        widget = module.ModernTimeWidget(host)
+        widget.setAttribute(Qt.WA_TranslucentBackground, True)
+        widget.layout_scale = scale
+        widget.time_zone = zone
+        widget.zone_label = module.zone_label(zone) if zone else ''
+        widget.apply_config(config)
+        widget.show()
+
+        ratio = widget.devicePixelRatioF()
+        image = QImage(widget.size() * ratio, QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        image.fill(Qt.transparent)
+        widget.render(image)
+
+        frame = widget.new_layer()
+        sharp = frame.size() == widget.size() * ratio
+        clear = edge_is_clear(image)
+        checked += 1
+        if not (sharp and clear):
+            failures.append({'settings': settings, 'scale': scale, 'zone': zone,
+                             'size': [widget.width(), widget.height()], 'sharp': sharp, 'edge_clear': clear})
+        widget.close()
+        widget.deleteLater()
+
+    return {'device_pixel_ratio': host.devicePixelRatioF(), 'checked': checked, 'failures': failures}
+
+
+def run(factors):
+    results = []
+    for factor in factors:
+        env = dict(os.environ, QT_SCALE_FACTOR=str(factor))
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                                env=env, check=True, capture_output=True, text=True).stdout
+        results.append(dict(json.loads(output), scale_factor=factor))
+
+    setup_qt()
+    return {
+        "check": "dpi",
+        "environment": environment(),
+        "results": results,
+        "passed": not any(result["failures"] for result in results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factors", default=",".join(map(str, DEFAULT_FACTORS)), help="逗号分隔的缩放因子")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+
+    if args.child:
+        with plugin_output_to_stderr():
+            result = run_factor()
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        result = run([float(factor) for factor in args.factors.split(",")])
+        emit(result, args.output)
+        sys.exit(0 if result["passed"] else 1)
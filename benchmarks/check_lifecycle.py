@@ -0,0 +1,115 @@
+"""时间控件生命周期压力检查
+
+反复执行壁纸启动/停止: 每个周期创建时钟 (两个实例, 轮流使用三种窗口阴影
+模式和三种渲染方式, 覆盖 Qt 图形特效和渲染线程), 启动壁纸, 再交替通过
+on_wallpaper_stop 和 close_widget 淡出关闭。淡出动画在周期之间按真实时间
+推进, 同时有多批时钟处于淡出中。
+
+每隔 --every 个周期等待淡出结束并处理延迟删除, 记录存活的控件、定时器、
+动画、特效、像素图、渲染槽、动画时钟和调度器登记数、窗口的子对象数以及常驻内存。
+除像素图 (受缓存上限约束) 外各项必须与第一个检查点相同, 否则以非零状态退出。
+
+用法: python benchmarks/check_lifecycle.py [--cycles N] [--every N] [--output FILE]
+"""
+import argparse
+import json
+import sys
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+INSTANCES = [{"x": 40, "y": 40}, {"x": 40, "y": 300, "scale": 0.5}]
+DRAIN_TIMEOUT_S = 3.0
+
+
+def current_rss_kb():
+    """当前常驻内存 (KB), 读取 /proc 失败时返回 0"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    import os
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def drain(app, plugin):
+    """等待淡出动画结束, 处理延迟删除"""
+    from PyQt5.QtCore import QCoreApplication, QEvent
+
+    deadline = time.monotonic() + DRAIN_TIMEOUT_S
+    while plugin.closing_widgets and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def run(cycles, every):
+    app = setup_qt()
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtWidgets import QWidget
+
+    module = load_plugin("time.py")
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    plugin = module.create_plugin()
+    plugin.ensure_settings_loaded()
+    plugin.apply_settings({'instances': json.dumps(INSTANCES), 'animation_enabled': True})
+
+    checkpoints = []
+    for cycle in range(1, cycles + 1):
+        plugin.apply_settings({'shadow_mode': module.SHADOW_MODES[cycle % len(module.SHADOW_MODES)],
+                               'render_mode': module.RENDER_MODES[cycle // len(module.SHADOW_MODES)
+                                                                  % len(module.RENDER_MODES)]})
+        plugin.operate_on_window(host)
+        plugin.on_wallpaper_start("stress.mp4", True)
+        app.processEvents()
+        if cycle % 2:
+            plugin.on_wallpaper_stop()
+        else:
+            plugin.close_widget()
+        app.processEvents()
+
+        if cycle % every == 0:
+            drain(app, plugin)
+            stats = plugin.get_resource_stats()
+            stats.update(cycle=cycle, host_children=len(host.findChildren(QObject)), rss_kb=current_rss_kb())
+            checkpoints.append(stats)
+
+    # 像素图只要求不超过缓存上限; 其余计数必须保持不变
+    baseline = checkpoints[0]
+    flat_keys = [key for key in baseline if key not in ("cycle", "pixmaps", "rss_kb")]
+    pixmap_limit = module.LAYER_CACHE_LIMIT + module.FRAME_CACHE_LIMIT + len(INSTANCES)
+    failures = [
+        {"cycle": point["cycle"], "key": key, "baseline": baseline[key], "value": point[key]}
+        for point in checkpoints for key in flat_keys if point[key] != baseline[key]
+    ] + [
+        {"cycle": point["cycle"], "key": "pixmaps", "limit": pixmap_limit, "value": point["pixmaps"]}
+        for point in checkpoints if point["pixmaps"] > pixmap_limit
+    ]
+    return {
+        "check": "lifecycle",
+        "environment": environment(),
+        "cycles": cycles,
+        "created": module.RESOURCES.stats()["created"],
+        "checkpoints": checkpoints,
+        "rss_growth_kb": checkpoints[-1]["rss_kb"] - baseline["rss_kb"],
+        "failures": failures,
+        "passed": not failures,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=100, help="每隔多少个周期检查一次")
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.cycles, args.every)
+    emit(result, args.output)
+    sys.exit(0 if result["passed"] else 1)
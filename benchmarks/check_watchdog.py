@@ -0,0 +1,177 @@
+"""事件循环卡顿检测检查
+
+同时加载时间插件和记事本插件。卡顿检测默认关闭: 先检查此时没有心跳和辅助
+线程, 再在两个插件的设置中开启, 空转事件循环记录心跳延迟, 然后依次制造卡顿:
+
+- sleep: 时间插件的 on_settings_changed 中睡眠 (释放 GIL);
+- busy: 记事本插件的 on_settings_changed 中纯 Python 忙循环 (持有 GIL);
+- outside: 不经过插件回调的定时器槽函数中睡眠。
+
+检查每次卡顿都被记录、时长不小于制造的时长、归属到正确的插件和回调
+(插件外的卡顿归属为空), 栈采样中包含制造卡顿的函数, 且按插件查询时
+两个插件的记录互不混杂; 两个插件都关闭后检测停止、辅助线程退出。任一项
+不通过时以非零状态退出。
+
+用法: python benchmarks/check_watchdog.py [--stall-ms N] [--idle-seconds S] [--output FILE]
+"""
+import argparse
+import sys
+import time
+
+from common import emit, environment, load_plugin, plugin_output_to_stderr, setup_qt
+
+
+def sleep_in_callback(seconds):
+    time.sleep(seconds)
+
+
+def busy_in_callback(seconds):
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        count += 1
+    return count
+
+
+def sleep_outside(seconds):
+    time.sleep(seconds)
+
+
+def watchdog_threads():
+    import threading
+    return sum(1 for thread in threading.enumerate() if thread.name == "stall-watchdog")
+
+
+def run_loop(app, seconds):
+    from PyQt5.QtCore import QTimer
+
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+
+
+def stall_case(app, module, trigger, stall_ms):
+    """在事件循环中触发一次卡顿, 返回新增的卡顿记录"""
+    from PyQt5.QtCore import QTimer
+
+    watchdog = module.StallWatchdog.instance()
+    before = len(watchdog.stalls)
+    QTimer.singleShot(50, trigger)
+    run_loop(app, stall_ms / 1000 + 0.5)
+    return list(watchdog.stalls)[before:]
+
+
+def verify(name, stalls, stall_ms, plugin, callback, function):
+    """检查一个场景的卡顿记录, 返回 (结果, 失败原因列表)"""
+    failures = []
+    stall = max(stalls, key=lambda item: item['duration_ms']) if stalls else None
+    if stall is None:
+        failures.append("未记录卡顿")
+    else:
+        if stall['duration_ms'] < stall_ms:
+            failures.append(f"卡顿时长 {stall['duration_ms']} ms 小于 {stall_ms} ms")
+        if (stall['plugin'], stall['callback']) != (plugin, callback):
+            failures.append(f"归属为 {stall['plugin']}.{stall['callback']}, 应为 {plugin}.{callback}")
+        if not any(function in line for line in stall['stack']):
+            failures.append(f"栈采样中没有 {function}")
+    result = {
+        "case": name,
+        "stalls": len(stalls),
+        "duration_ms": stall['duration_ms'] if stall else 0,
+        "plugin": stall['plugin'] if stall else None,
+        "callback": stall['callback'] if stall else None,
+        "callbacks": stall['callbacks'] if stall else [],
+        "stack_tail": stall['stack'][-2:] if stall else [],
+        "failures": failures,
+    }
+    return result, failures
+
+
+def run(stall_ms, idle_seconds):
+    app = setup_qt()
+    from PyQt5.QtWidgets import QWidget
+
+    time_module = load_plugin("time.py")
+    notepad_module = load_plugin("notepad.py")
+    host = QWidget()
+    host.resize(1280, 720)
+    host.show()
+    app.processEvents()
+
+    clock = time_module.create_plugin()
+    notepad = notepad_module.create_plugin()
+    for plugin in (clock, notepad):
+        plugin.ensure_settings_loaded()
+        plugin.operate_on_window(host)
+        plugin.on_wallpaper_start("check.mp4", True)
+    run_loop(app, 0.3)
+    idle_off = {"running": time_module.StallWatchdog.active() is not None, "threads": watchdog_threads()}
+
+    for plugin in (clock, notepad):
+        plugin.apply_settings({'stall_watchdog': True})
+    # 两个插件文件应复用同一个检测服务
+    shared = time_module.StallWatchdog.instance() is notepad_module.StallWatchdog.instance()
+
+    run_loop(app, idle_seconds)
+    idle = clock.get_stall_stats()
+    idle_stalls = time_module.StallWatchdog.instance().stats()['stalls']
+
+    seconds = stall_ms / 1000
+    clock.apply_settings = lambda changes: sleep_in_callback(seconds)
+    notepad.apply_settings = lambda changes: busy_in_callback(seconds)
+    cases = [
+        ("sleep", lambda: clock.on_settings_changed({}), clock.name, "on_settings_changed", "sleep_in_callback"),
+        ("busy", lambda: notepad.on_settings_changed({}), notepad.name, "on_settings_changed", "busy_in_callback"),
+        ("outside", lambda: sleep_outside(seconds), None, None, "sleep_outside"),
+    ]
+    results, failures = [], []
+    for name, trigger, plugin, callback, function in cases:
+        stalls = stall_case(app, time_module, trigger, stall_ms)
+        result, case_failures = verify(name, stalls, stall_ms, plugin, callback, function)
+        results.append(result)
+        failures += [f"{name}: {failure}" for failure in case_failures]
+
+    per_plugin = {plugin.name: plugin.get_stall_stats() for plugin in (clock, notepad)}
+    for plugin in (clock, notepad):
+        if any(stall['plugin'] != plugin.name for stall in per_plugin[plugin.name]['recent']):
+            failures.append(f"{plugin.name} 的查询结果混入了其他插件的卡顿")
+    if not shared:
+        failures.append("两个插件文件创建了各自的检测服务")
+    if idle_stalls:
+        failures.append(f"空转时记录了 {idle_stalls} 次卡顿")
+
+    clock.close_widget()
+    still_running = time_module.StallWatchdog.active() is not None
+    notepad.close_widget()
+    closed = {"running": time_module.StallWatchdog.active() is not None, "threads": watchdog_threads()}
+    if idle_off["running"] or idle_off["threads"]:
+        failures.append(f"设置关闭时检测仍在运行: {idle_off}")
+    if not still_running:
+        failures.append("一个插件关闭后检测即停止, 另一个插件仍在使用")
+    if closed["running"] or closed["threads"]:
+        failures.append(f"两个插件都关闭后检测仍在运行: {closed}")
+    return {
+        "check": "watchdog",
+        "environment": environment(),
+        "stall_ms": stall_ms,
+        "idle": {key: idle[key] for key in ("heartbeat_ms", "threshold_ms", "latency_p50_ms",
+                                            "latency_p95_ms", "latency_max_ms")},
+        "disabled": idle_off,
+        "after_close": closed,
+        "cases": results,
+        "per_plugin": {name: {"stalls": stats["stalls"], "by_callback": stats["by_callback"]}
+                       for name, stats in per_plugin.items()},
+        "failures": failures,
+        "passed": not failures,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stall-ms", type=int, default=400, help="制造的卡顿时长 (毫秒), 需大于检测阈值")
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--output", help="将 JSON 结果写入文件")
+    args = parser.parse_args()
+    with plugin_output_to_stderr():
+        result = run(args.stall_ms, args.idle_seconds)
+    emit(result, args.output)
+    sys.exit(0 if result["passed"] else 1)
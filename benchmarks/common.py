@@ -0,0 +1,114 @@
+"""基准测试公共工具: 离屏 Qt 环境、插件加载和统计输出"""
+import contextlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+STUBS_DIR = os.path.join(BENCH_DIR, "stubs")
+# 插件导入的共享模块, 与插件放在同一目录
+SHARED_MODULE = "wallpaper_shared.py"
+
+
+def setup_qt():
+    """在 offscreen 平台上创建 QApplication, 并让插件能导入 plugin_base
+
+    QSettings 被重定向到临时目录, 基准测试不会读写用户的真实插件设置。
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if STUBS_DIR not in sys.path:
+        sys.path.insert(0, STUBS_DIR)
+
+    from PyQt5.QtCore import QSettings
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    settings_dir = tempfile.mkdtemp(prefix="wallpaper-bench-")
+    for fmt in (QSettings.NativeFormat, QSettings.IniFormat):
+        QSettings.setPath(fmt, QSettings.UserScope, settings_dir)
+    return app
+
+
+def load_plugin(filename):
+    """按文件路径加载插件模块; time.py 不能以 time 为模块名导入"""
+    module_name = f"{os.path.splitext(filename)[0]}_plugin"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def checkout(ref, filename, directory):
+    """将指定 git 版本中的插件文件导出到临时目录; 该版本有共享模块时一并导出"""
+    shared = subprocess.run(["git", "-C", REPO_ROOT, "show", f"{ref}:{SHARED_MODULE}"], capture_output=True)
+    if shared.returncode == 0:
+        with open(os.path.join(directory, SHARED_MODULE), "wb") as f:
+            f.write(shared.stdout)
+    content = subprocess.run(["git", "-C", REPO_ROOT, "show", f"{ref}:{filename}"],
+                             capture_output=True, check=True).stdout
+    path = os.path.join(directory, filename)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def plugin_output_to_stderr():
+    """插件的 print 日志转到 stderr, 保持 stdout 只输出 JSON"""
+    return contextlib.redirect_stdout(sys.stderr)
+
+
+def environment():
+    """记录 Python/Qt 版本和平台, 便于跨版本对比"""
+    import platform
+    from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    from PyQt5.QtGui import QGuiApplication
+
+    return {
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": QGuiApplication.platformName(),
+        "machine": platform.machine(),
+    }
+
+
+def peak_rss_kb():
+    """进程峰值常驻内存 (KB)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def summarize(samples_ns):
+    """返回以毫秒为单位的 p50/p95/p99/平均值"""
+    if not samples_ns:
+        return {"count": 0}
+    ordered = sorted(samples_ns)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1e6
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) / 1e6,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] / 1e6,
+    }
+
+
+def emit(result, path=None):
+    """以 JSON 输出结果, 可选写入文件"""
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
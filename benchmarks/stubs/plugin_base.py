@@ -0,0 +1,10 @@
+"""基准测试用的 plugin_base 替身, 只提供插件基类"""
+
+
+class PluginBase:
+    def __init__(self):
+        self.name = ""
+        self.version = ""
+        self.description = ""
+        self.author = ""
+        self.app = None
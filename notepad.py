@@ -1,13 +1,197 @@
 import traceback
-from PyQt5.QtWidgets import QWidget, QPushButton, QTextEdit, QVBoxLayout, QHBoxLayout, QLabel
-from PyQt5.QtCore import Qt, QSettings
-from PyQt5.QtGui import QPainter, QColor, QPen, QBrush, QFont
-import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from PyQt5.QtWidgets import QWidget, QPushButton, QTextEdit, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, \
+    QMessageBox
+from PyQt5.QtCore import Qt, QTimer, QElapsedTimer, QStandardPaths
+from PyQt5.QtGui import QPainter, QColor, QPen, QBrush, QFont, QTextCursor
 import os
+import re
+import sys
 
 from plugin_base import PluginBase
 
+try:
+    from wallpaper_shared import StallWatchdog, watched, SettingsPersistence, SettingSpec, load_settings, \
+        validate_changes, SettingsPanel
+except ImportError:
+    # 宿主按文件路径加载插件而没有把插件目录加入 sys.path 时, 从本文件所在目录导入
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from wallpaper_shared import StallWatchdog, watched, SettingsPersistence, SettingSpec, load_settings, \
+        validate_changes, SettingsPanel
+
+
+# 为 True 时 initialize() 不读取 QSettings, 推迟到控件首次显示或打开设置时
+DEFER_SETTINGS_LOAD = False
+
+# 大文本模式: 每次从文件读入的字节数 (延伸到行尾), 以及距底部多少页时读入下一块
+LARGE_NOTE_CHUNK_BYTES = 256 * 1024
+LARGE_NOTE_PREFETCH_PAGES = 2
+# 比较新旧文本时每次比较的字符数
+DIFF_BLOCK_CHARS = 64 * 1024
+
+# BMP 之外的字符在 Qt 文档中占两个位置
+_ASTRAL = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def default_note_path():
+    """大文本模式默认的笔记文件路径"""
+    base = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation) or os.path.expanduser('~')
+    return os.path.join(base, 'notepad', 'note.txt')
+
+
+def text_diff(old, new):
+    """比较新旧文本, 返回 (start, old_end, new_end): old[start:old_end] 被替换为 new[start:new_end]
+
+    按块比较公共前缀和后缀, 不为整段文本创建副本。
+    """
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start:start + DIFF_BLOCK_CHARS] == new[start:start + DIFF_BLOCK_CHARS]:
+        start += DIFF_BLOCK_CHARS
+    start = min(start, limit)
+    while start < limit and old[start] == new[start]:
+        start += 1
+
+    # 后缀不能与前缀重叠
+    limit = min(len(old), len(new)) - start
+    suffix = 0
+    while suffix < limit:
+        step = min(DIFF_BLOCK_CHARS, limit - suffix)
+        if old[len(old) - suffix - step:len(old) - suffix] != new[len(new) - suffix - step:len(new) - suffix]:
+            break
+        suffix += step
+    while suffix < limit and old[len(old) - suffix - 1] == new[len(new) - suffix - 1]:
+        suffix += 1
+    return start, len(old) - suffix, len(new) - suffix
+
+
+def qt_position(text, index):
+    """Python 字符下标对应的 Qt 文档位置 (UTF-16 码元)"""
+    return index + len(_ASTRAL.findall(text, 0, index))
+
+
+class NoteFileStore:
+    """大文本模式的笔记文件: UTF-8 编码, 以 \\n 换行
+
+    读取按字节偏移分块进行, 每块延伸到行尾, 不会截断多字节字符; 写入只从
+    第一个变化的字节开始: 替换前后字节数相同时原地覆盖, 在末尾追加时直接
+    追加, 否则写入临时文件后替换原文件, 写到一半中断时原文件保持完整。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.writes = 0
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read_chunk(self, offset, size=LARGE_NOTE_CHUNK_BYTES):
+        """从 offset 读取约 size 字节到行尾, 返回 (文本, 下一块的偏移); 到达末尾时文本为空"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(size)
+                if len(data) == size:
+                    data += f.readline()
+        except OSError:
+            return '', offset
+        self.bytes_read += len(data)
+        return data.decode('utf-8', errors='replace'), offset + len(data)
+
+    def read_all(self):
+        """读取整个文件, 文件不存在时返回空文本"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return ''
+        self.bytes_read += len(data)
+        return data.decode('utf-8', errors='replace')
+
+    def write_all(self, text):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = text.encode('utf-8')
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        self.bytes_written += len(data)
+        self.writes += 1
+
+    def write_diff(self, old, new):
+        """文件内容为 old 时, 只写入变成 new 所需的字节"""
+        if old == new:
+            return
+        if not os.path.exists(self.path):
+            self.write_all(new)
+            return
+        start, old_end, new_end = text_diff(old, new)
+        offset = len(old[:start].encode('utf-8'))
+        old_segment = old[start:old_end].encode('utf-8')
+        new_segment = new[start:new_end].encode('utf-8')
+        if len(old_segment) == len(new_segment):
+            with open(self.path, 'r+b') as f:
+                f.seek(offset)
+                f.write(new_segment)
+            written = len(new_segment)
+        elif start == old_end == len(old):
+            with open(self.path, 'ab') as f:
+                f.write(new_segment)
+            written = len(new_segment)
+        else:
+            written = self.replace_tail(offset, new_segment + new[new_end:].encode('utf-8'))
+        self.bytes_written += written
+        self.writes += 1
+
+    def replace_tail(self, offset, tail):
+        """保留前 offset 字节、其后替换为 tail: 写入临时文件再替换原文件, 返回写入的字节数"""
+        temp = self.path + '.tmp'
+        with open(self.path, 'rb') as source, open(temp, 'wb') as target:
+            remaining = offset
+            while remaining:
+                block = source.read(min(remaining, LARGE_NOTE_CHUNK_BYTES))
+                if not block:
+                    break
+                target.write(block)
+                remaining -= len(block)
+            target.write(tail)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp, self.path)
+        return offset - remaining + len(tail)
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'size': self.size(),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'writes': self.writes,
+        }
+
+# 记事本插件的设置声明
+SETTINGS_SCHEMA = (
+    SettingSpec('note_content', str, '这是一个桌面记事本\n\n你可以在设置中编辑内容\n\n支持多行文本显示',
+                label="记事本内容", editor='multiline'),
+    SettingSpec('large_note', bool, False, label="大文本模式"),
+    SettingSpec('note_file', str, '', label="笔记文件"),
+    SettingSpec('font_size', int, 12, minimum=6, maximum=72, label="字体大小", editor='spin'),
+    SettingSpec('text_color', str, '#000000', validator=QColor.isValidColor, label="文本颜色", editor='color'),
+    SettingSpec('background_color', str, '#FFFACD', validator=QColor.isValidColor, label="背景颜色", editor='color'),
+    SettingSpec('position_x', int, 100, label="X位置"),
+    SettingSpec('position_y', int, 100, label="Y位置"),
+    SettingSpec('width', int, 300, minimum=100, maximum=4096, label="宽度", editor='spin'),
+    SettingSpec('height', int, 400, minimum=100, maximum=4096, label="高度", editor='spin'),
+    SettingSpec('stall_watchdog', bool, False, label="检测事件循环卡顿"),
+)
+
+# 设置面板的页面及其包含的设置项
+SETTINGS_PAGES = (
+    ("记事本", tuple(spec.key for spec in SETTINGS_SCHEMA)),
+)
+
 
 class NotePadPlugin(PluginBase):
     def __init__(self):
@@ -16,156 +200,271 @@ class NotePadPlugin(PluginBase):
         self.version = "1.0.0"
         self.description = "在桌面上显示可编辑的记事本"
         self.author = "Assistant"
-        self.settings = {
-            'note_content': '这是一个桌面记事本\n\n你可以在设置中编辑内容\n\n支持多行文本显示',
-            'font_size': 12,
-            'text_color': '#000000',
-            'background_color': '#FFFACD',
-            'position_x': 100,
-            'position_y': 100,
-            'width': 300,
-            'height': 400
-        }
+        self.settings = {spec.key: spec.default for spec in SETTINGS_SCHEMA}
+        self.settings_loaded = False
+        self.init_time_ms = 0.0
         self.widget = None
-
+        self.text_display = None
+        self.settings_panel = None
+        self.interaction_box = None
+
+        # 大文本模式: 笔记文件, settings['note_content'] 是否已载入全文,
+        # 以及显示区已读入的字符数、对应的文件字节偏移和是否已读到末尾
+        self.note_store = None
+        self.note_loaded = False
+        # 大文本模式: 笔记文件当前的内容, 与 settings['note_content'] 不同时有修改尚未写入
+        self.note_on_disk = ''
+        self.loaded_chars = 0
+        self.loaded_bytes = 0
+        self.note_eof = True
+        self.prefetch_timer = None
+
+    @watched
     def initialize(self, app_instance):
-        print(f"[{self.name}] 插件初始化")
+        elapsed = QElapsedTimer()
+        elapsed.start()
         self.app = app_instance
-        
-        # 从QSettings加载保存的设置
-        settings = QSettings("VideoWallpaper", "PluginSettings")
-        settings.beginGroup(f"plugins/{self.name}")
-        
-        # 加载每个设置，如果不存在则使用默认值
-        self.settings['note_content'] = settings.value('note_content', self.settings['note_content'], type=str)
-        self.settings['font_size'] = settings.value('font_size', self.settings['font_size'], type=int)
-        self.settings['text_color'] = settings.value('text_color', self.settings['text_color'], type=str)
-        self.settings['background_color'] = settings.value('background_color', self.settings['background_color'], type=str)
-        self.settings['position_x'] = settings.value('position_x', self.settings['position_x'], type=int)
-        self.settings['position_y'] = settings.value('position_y', self.settings['position_y'], type=int)
-        self.settings['width'] = settings.value('width', self.settings['width'], type=int)
-        self.settings['height'] = settings.value('height', self.settings['height'], type=int)
-        
-        settings.endGroup()
 
+        # 从QSettings加载保存的设置, 可延迟到控件首次显示
+        if not DEFER_SETTINGS_LOAD:
+            self.ensure_settings_loaded()
+
+        self.init_time_ms = elapsed.nsecsElapsed() / 1e6
+        print(f"[{self.name}] 插件初始化 ({self.init_time_ms:.2f} ms)")
+
+    def ensure_settings_loaded(self):
+        """按设置声明一次性加载整个设置组"""
+        if self.settings_loaded:
+            return
+        self.settings_loaded = True
+        self.settings.update(load_settings(f"plugins/{self.name}", SETTINGS_SCHEMA))
+
+    @watched
     def on_wallpaper_start(self, video_path, loop):
         print(f"[{self.name}] 壁纸启动: {os.path.basename(video_path)}")
 
+    @watched
     def on_wallpaper_stop(self):
         print(f"[{self.name}] 壁纸停止")
+        SettingsPersistence.instance().flush()
         if self.widget:
             self.widget.close()
-            self.widget = None
+            self.widget.deleteLater()
+            self.widget = self.text_display = None
+            self.update_stall_watchdog()
 
+    @watched
     def on_settings_changed(self, settings):
         print(f"[{self.name}] 设置已更改")
+        self.ensure_settings_loaded()
+        self.apply_settings(settings)
 
+    @watched
     def show_settings_dialog(self):
-        root = tk.Tk()
-        root.title(f"{self.name} 设置")
-        root.geometry("500x600")
-
-        # 记事本内容
-        tk.Label(root, text="记事本内容:", font=("Arial", 10, "bold")).pack(pady=(10, 5))
-        content_text = scrolledtext.ScrolledText(root, height=15, width=60)
-        content_text.insert(tk.END, self.settings.get('note_content', ''))
-        content_text.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
-
-        # 设置区域
-        settings_frame = tk.Frame(root)
-        settings_frame.pack(pady=10, padx=10, fill=tk.X)
-
-        # 字体大小
-        tk.Label(settings_frame, text="字体大小:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        font_size_entry = tk.Entry(settings_frame, width=15)
-        font_size_entry.insert(0, str(self.settings.get('font_size', 12)))
-        font_size_entry.grid(row=0, column=1, sticky=tk.W, padx=(5, 20))
-
-        # 文本颜色
-        tk.Label(settings_frame, text="文本颜色:").grid(row=0, column=2, sticky=tk.W, pady=2)
-        text_color_entry = tk.Entry(settings_frame, width=15)
-        text_color_entry.insert(0, self.settings.get('text_color', '#000000'))
-        text_color_entry.grid(row=0, column=3, sticky=tk.W, padx=5)
-
-        # 背景颜色
-        tk.Label(settings_frame, text="背景颜色:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        bg_color_entry = tk.Entry(settings_frame, width=15)
-        bg_color_entry.insert(0, self.settings.get('background_color', '#FFFACD'))
-        bg_color_entry.grid(row=1, column=1, sticky=tk.W, padx=(5, 20))
-
-        # 位置设置
-        tk.Label(settings_frame, text="X位置:").grid(row=1, column=2, sticky=tk.W, pady=2)
-        x_entry = tk.Entry(settings_frame, width=15)
-        x_entry.insert(0, str(self.settings.get('position_x', 100)))
-        x_entry.grid(row=1, column=3, sticky=tk.W, padx=5)
-
-        tk.Label(settings_frame, text="Y位置:").grid(row=2, column=0, sticky=tk.W, pady=2)
-        y_entry = tk.Entry(settings_frame, width=15)
-        y_entry.insert(0, str(self.settings.get('position_y', 100)))
-        y_entry.grid(row=2, column=1, sticky=tk.W, padx=(5, 20))
-
-        # 尺寸设置
-        tk.Label(settings_frame, text="宽度:").grid(row=2, column=2, sticky=tk.W, pady=2)
-        width_entry = tk.Entry(settings_frame, width=15)
-        width_entry.insert(0, str(self.settings.get('width', 300)))
-        width_entry.grid(row=2, column=3, sticky=tk.W, padx=5)
-
-        tk.Label(settings_frame, text="高度:").grid(row=3, column=0, sticky=tk.W, pady=2)
-        height_entry = tk.Entry(settings_frame, width=15)
-        height_entry.insert(0, str(self.settings.get('height', 400)))
-        height_entry.grid(row=3, column=1, sticky=tk.W, padx=(5, 20))
-
-        def save_settings():
-            try:
-                new_settings = {
-                    'note_content': content_text.get(1.0, tk.END).strip(),
-                    'font_size': int(font_size_entry.get()),
-                    'text_color': text_color_entry.get(),
-                    'background_color': bg_color_entry.get(),
-                    'position_x': int(x_entry.get()),
-                    'position_y': int(y_entry.get()),
-                    'width': int(width_entry.get()),
-                    'height': int(height_entry.get())
-                }
-                
-                # 保存设置到QSettings
-                settings = QSettings("VideoWallpaper", "PluginSettings")
-                settings.beginGroup(f"plugins/{self.name}")
-                for key, value in new_settings.items():
-                    settings.setValue(key, value)
-                settings.endGroup()
-                
-                self.settings.update(new_settings)
-
-                # 更新现有控件
-                if self.widget:
-                    self.widget.move(self.settings['position_x'], self.settings['position_y'])
-                    self.widget.resize(self.settings['width'], self.settings['height'])
-                    self.widget.update()  # 强制重绘
-
-                messagebox.showinfo("保存成功", "设置已保存并应用")
-                root.destroy()
-            except ValueError as e:
-                messagebox.showerror("错误", "请输入有效的数值")
-            except Exception as e:
-                messagebox.showerror("错误", f"保存设置时出错: {e}")
-
-        # 按钮区域
-        button_frame = tk.Frame(root)
-        button_frame.pack(pady=20)
-
-        save_button = tk.Button(button_frame, text="保存设置", command=save_settings, 
-                               bg="#4CAF50", fg="white", font=("Arial", 10, "bold"))
-        save_button.pack(side=tk.LEFT, padx=5)
-
-        cancel_button = tk.Button(button_frame, text="取消", command=root.destroy,
-                                 bg="#f44336", fg="white", font=("Arial", 10, "bold"))
-        cancel_button.pack(side=tk.LEFT, padx=5)
-
-        root.mainloop()
+        """打开非模态设置面板, 修改实时生效"""
+        self.ensure_settings_loaded()
+        self.note_text()
+        if self.settings_panel is None:
+            self.settings_panel = SettingsPanel(
+                f"{self.name} 设置", SETTINGS_SCHEMA, SETTINGS_PAGES,
+                on_change=self.apply_settings, on_save=self.save_settings)
+            self.settings_panel.resize(500, 600)
+        self.settings_panel.open_with(self.settings)
+
+    @watched
+    def apply_settings(self, changes):
+        """应用部分设置并更新现有控件
+
+        大文本模式下笔记内容的修改先保留在内存中, 保存或防抖窗口结束时按差异
+        写入笔记文件一次; 显示区只替换变化的部分。修改先按设置声明校验, 越界值
+        夹紧, 非法值和未声明的键被忽略。
+        """
+        changes, rejected = validate_changes(SETTINGS_SCHEMA, changes)
+        if rejected:
+            print(f"[{self.name}] 忽略无效的设置: {'; '.join(rejected)}")
+        if not changes:
+            return
+        was_large, old_path = self.settings['large_note'], self.note_path()
+        if was_large and ('large_note' in changes or 'note_file' in changes):
+            # 切换模式或更换文件前把尚未写入的修改写入原来的文件
+            self.flush_note()
+        large = changes.get('large_note', was_large)
+        content_changed = 'note_content' in changes or large != was_large
+        old_text = self.note_text() if content_changed else None
+        self.settings.update(changes)
+        path_changed = self.note_path() != old_path
+
+        if content_changed:
+            new_text = changes.get('note_content', old_text)
+            self.settings['note_content'] = new_text
+            if large and (not was_large or path_changed):
+                # 切换到大文本模式或更换文件时把内容整体写入笔记文件一次
+                self.get_note_store().write_all(new_text)
+                self.note_loaded = True
+                self.note_on_disk = new_text
+            elif large:
+                SettingsPersistence.instance().queue_write(f"plugins/{self.name}/note", self.flush_note)
+
+        if 'stall_watchdog' in changes:
+            self.update_stall_watchdog()
+        if not self.widget:
+            return
+        if large != was_large or large and path_changed:
+            # 切换模式或打开另一个笔记文件时重建显示区
+            self.rebuild_text_display()
+        elif 'note_content' in changes and large:
+            self.update_text_display(old_text, self.settings['note_content'])
+        elif 'note_content' in changes:
+            self.text_display.setPlainText(self.settings['note_content'])
+            self.loaded_chars = len(self.settings['note_content'])
+        self.widget.setGeometry(
+            self.settings['position_x'],
+            self.settings['position_y'],
+            self.settings['width'],
+            self.settings['height']
+        )
+        self.apply_style()
+
+    @watched
+    def save_settings(self):
+        """由持久化服务合并写入全部设置, 大文本模式的内容已在笔记文件中, 不写入 QSettings"""
+        values = {spec.key: self.settings[spec.key] for spec in SETTINGS_SCHEMA}
+        if self.settings['large_note']:
+            self.flush_note()
+            values['note_content'] = ''
+        SettingsPersistence.instance().queue(f"plugins/{self.name}", values)
+        print(f"[{self.name}] 设置已保存")
+
+    @watched
+    def flush_note(self):
+        """大文本模式: 把内存中尚未写入的笔记修改按差异写入笔记文件"""
+        if not self.settings['large_note'] or not self.note_loaded:
+            return
+        text = self.settings['note_content']
+        if text is not self.note_on_disk:
+            self.get_note_store().write_diff(self.note_on_disk, text)
+            self.note_on_disk = text
+
+    def note_path(self):
+        return self.settings['note_file'] or default_note_path()
+
+    def get_note_store(self):
+        """当前设置对应的笔记文件"""
+        path = self.note_path()
+        if self.note_store is None or self.note_store.path != path:
+            self.note_store = NoteFileStore(path)
+            self.note_loaded = False
+        return self.note_store
+
+    def note_text(self):
+        """笔记全文; 大文本模式下首次调用 (如打开设置面板) 时才读取整个文件"""
+        if self.settings['large_note']:
+            store = self.get_note_store()
+            if not self.note_loaded:
+                self.settings['note_content'] = self.note_on_disk = store.read_all()
+                self.note_loaded = True
+        return self.settings['note_content']
+
+    def create_text_display(self):
+        """创建只读的文本显示区
+
+        普通模式一次载入全部内容; 大文本模式使用按文本块布局的 QPlainTextEdit,
+        先读入第一块, 滚动到接近底部时再读入后续的块。
+        """
+        if self.settings['large_note']:
+            display = QPlainTextEdit()
+            display.setReadOnly(True)
+            display.setUndoRedoEnabled(False)
+            self.text_display = display
+            self.loaded_chars = self.loaded_bytes = 0
+            self.note_eof = False
+            self.load_note_chunk()
+            # 插入位置上的光标会随文本移到末尾, 放回开头使显示区从第一行开始
+            display.moveCursor(QTextCursor.Start)
+            # 滚动后在下一轮事件循环中检查是否需要读入, 避免在替换文本的过程中追加
+            self.prefetch_timer = QTimer(display)
+            self.prefetch_timer.setSingleShot(True)
+            self.prefetch_timer.setInterval(0)
+            self.prefetch_timer.timeout.connect(self.prefetch_note)
+            display.verticalScrollBar().valueChanged.connect(lambda value: self.prefetch_timer.start())
+            self.prefetch_timer.start()
+        else:
+            display = QTextEdit()
+            display.setReadOnly(True)  # 只读模式
+            display.setPlainText(self.settings['note_content'])
+            self.text_display = display
+            self.loaded_chars = len(self.settings['note_content'])
+            self.note_eof = True
+        return display
+
+    def rebuild_text_display(self):
+        """切换模式后用新的显示区替换原来的"""
+        old = self.text_display
+        self.widget.layout().replaceWidget(old, self.create_text_display())
+        old.deleteLater()
+        self.apply_style()
+
+    def load_note_chunk(self):
+        """从笔记文件读入下一块追加到显示区末尾"""
+        text, offset = self.get_note_store().read_chunk(self.loaded_bytes)
+        if not text:
+            self.note_eof = True
+            return
+        # 停在底部时 QPlainTextEdit 会随追加的内容滚动, 保持原来的滚动位置
+        bar = self.text_display.verticalScrollBar()
+        position = bar.value()
+        cursor = QTextCursor(self.text_display.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        bar.setValue(position)
+        self.loaded_chars += len(text)
+        self.loaded_bytes = offset
+
+    @watched
+    def prefetch_note(self):
+        """距底部不足几页时读入下一块, 直到填满或读到文件末尾"""
+        if self.note_eof or not self.widget:
+            return
+        bar = self.text_display.verticalScrollBar()
+        if bar.maximum() - bar.value() <= bar.pageStep() * LARGE_NOTE_PREFETCH_PAGES:
+            self.load_note_chunk()
+            self.prefetch_timer.start()
+
+    def update_text_display(self, old, new):
+        """只替换显示区中变化的部分; 变化位于尚未读入的部分时留到读入时显示
+
+        只用于大文本模式: QTextEdit 定位光标时要排版之前的全部内容, 比整体替换还慢。
+        """
+        start, old_end, new_end = text_diff(old, new)
+        loaded = self.loaded_chars
+        if start > loaded or start == loaded and not self.note_eof:
+            return
+
+        end = min(old_end, loaded)
+        inserted = new[start:new_end]
+        cursor = QTextCursor(self.text_display.document())
+        cursor.setPosition(qt_position(old, start))
+        cursor.setPosition(qt_position(old, end), QTextCursor.KeepAnchor)
+        cursor.insertText(inserted)
+
+        # 显示区仍对应文件开头的一段, 同步更新其字符数和字节偏移
+        self.loaded_bytes += len(inserted.encode('utf-8')) - len(old[start:end].encode('utf-8'))
+        self.loaded_chars = loaded + new_end - old_end if old_end <= loaded else new_end
+
+    def get_note_stats(self):
+        """返回笔记模式、显示区已读入的字符数和笔记文件的读写统计"""
+        return {
+            'large_note': self.settings['large_note'],
+            'loaded_chars': self.loaded_chars,
+            'loaded_bytes': self.loaded_bytes,
+            'eof': self.note_eof,
+            'file': self.note_store.stats() if self.note_store else None,
+        }
 
+    @watched
     def operate_on_window(self, window):
         """在壁纸上方创建记事本控件"""
+        self.ensure_settings_loaded()
         try:
             # 创建记事本控件
             self.widget = QWidget(window)
@@ -182,16 +481,8 @@ class NotePadPlugin(PluginBase):
 
             # 标题栏
             title_layout = QHBoxLayout()
-            title_label = QLabel("📝 记事本")
-            title_label.setStyleSheet(f"""
-                QLabel {{
-                    font-size: {self.settings['font_size'] + 2}px;
-                    font-weight: bold;
-                    color: {self.settings['text_color']};
-                    padding: 5px;
-                }}
-            """)
-            title_layout.addWidget(title_label)
+            self.title_label = QLabel("📝 记事本")
+            title_layout.addWidget(self.title_label)
 
             # 设置按钮
             settings_btn = QPushButton("设置")
@@ -215,31 +506,10 @@ class NotePadPlugin(PluginBase):
             layout.addLayout(title_layout)
 
             # 文本显示区域
-            self.text_display = QTextEdit()
-            self.text_display.setPlainText(self.settings['note_content'])
-            self.text_display.setReadOnly(True)  # 只读模式
-            self.text_display.setStyleSheet(f"""
-                QTextEdit {{
-                    background-color: {self.settings['background_color']};
-                    color: {self.settings['text_color']};
-                    font-size: {self.settings['font_size']}px;
-                    font-family: Arial, sans-serif;
-                    border: 1px solid #ccc;
-                    border-radius: 5px;
-                    padding: 8px;
-                    line-height: 1.4;
-                }}
-            """)
-            layout.addWidget(self.text_display)
+            layout.addWidget(self.create_text_display())
 
             # 设置控件样式
-            self.widget.setStyleSheet(f"""
-                QWidget {{
-                    background-color: {self.settings['background_color']};
-                    border: 2px solid #888;
-                    border-radius: 8px;
-                }}
-            """)
+            self.apply_style()
 
             # 重写paintEvent来绘制阴影效果
             def paintEvent(event):
@@ -257,19 +527,75 @@ class NotePadPlugin(PluginBase):
 
             # 显示控件
             self.widget.show()
+            self.update_stall_watchdog()
             print(f"[{self.name}] 记事本已显示在桌面")
         except Exception as e:
             print(f"[{self.name}] 创建记事本时出错: {e}")
             traceback.print_exc()
 
+    def update_stall_watchdog(self):
+        """按设置登记或注销卡顿检测, 只在记事本显示时运行"""
+        watchdog = StallWatchdog.active()
+        if self.settings['stall_watchdog'] and self.widget:
+            StallWatchdog.instance().acquire(self.name)
+        elif watchdog is not None:
+            watchdog.release(self.name)
+
+    def apply_style(self):
+        """按当前设置更新标题、文本区和控件的样式"""
+        self.title_label.setStyleSheet(f"""
+            QLabel {{
+                font-size: {self.settings['font_size'] + 2}px;
+                font-weight: bold;
+                color: {self.settings['text_color']};
+                padding: 5px;
+            }}
+        """)
+        self.text_display.setStyleSheet(f"""
+            {type(self.text_display).__name__} {{
+                background-color: {self.settings['background_color']};
+                color: {self.settings['text_color']};
+                font-size: {self.settings['font_size']}px;
+                font-family: Arial, sans-serif;
+                border: 1px solid #ccc;
+                border-radius: 5px;
+                padding: 8px;
+                line-height: 1.4;
+            }}
+        """)
+        self.widget.setStyleSheet(f"""
+            QWidget {{
+                background-color: {self.settings['background_color']};
+                border: 2px solid #888;
+                border-radius: 8px;
+            }}
+        """)
+
+    def get_persistence_stats(self):
+        """返回设置持久化的写入次数和 flush 耗时"""
+        return SettingsPersistence.instance().stats()
+
+    def get_stall_stats(self):
+        """返回事件循环延迟, 以及本插件回调造成的卡顿次数、时长和调用栈采样"""
+        return StallWatchdog.instance().stats(self.name)
+
+    @watched
     def show_interaction(self):
-        tk.messagebox.showinfo("记事本", "这是一个桌面记事本插件！\n\n点击""按钮来编辑内容。")
+        # 非模态消息框, 不阻塞壁纸的事件循环
+        self.interaction_box = QMessageBox(QMessageBox.Information, "记事本",
+                                           "这是一个桌面记事本插件！\n\n点击""按钮来编辑内容。")
+        self.interaction_box.setModal(False)
+        self.interaction_box.show()
 
+    @watched
     def close_widget(self):
         """关闭控件的方法"""
+        SettingsPersistence.instance().flush()
         if self.widget:
             self.widget.close()
-            self.widget = None
+            self.widget.deleteLater()
+            self.widget = self.text_display = None
+            self.update_stall_watchdog()
             print(f"[{self.name}] 记事本已关闭")
 
 
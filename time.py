@@ -1,276 +1,1958 @@
 import traceback
-import math
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QGraphicsDropShadowEffect
-from PyQt5.QtCore import Qt, QSettings, QTimer, QTime, QDate, QPropertyAnimation, QEasingCurve, pyqtProperty, QRect
+from collections import deque
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QGraphicsDropShadowEffect, QGraphicsScene, \
+    QGraphicsPixmapItem, QGraphicsBlurEffect
+from PyQt5.QtCore import Qt, QTimer, QTime, QDate, QPropertyAnimation, QEasingCurve, pyqtProperty, QRect, QRectF, \
+    QObject, QDateTime, QElapsedTimer, QEvent, QCoreApplication, QPoint, QTimeZone, QThread, QSize, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QPainter, QColor, QPen, QBrush, QFont, QFontDatabase, QLinearGradient, QRadialGradient, \
-    QPainterPath
-import tkinter as tk
-from tkinter import messagebox, ttk, colorchooser
+    QPainterPath, QPixmap, QFontMetrics, QStaticText, QTransform, QGradient, QGuiApplication, QRegion, QImage
 import os
 import sys
+import json
+import threading
 
 from plugin_base import PluginBase
 
+try:
+    from wallpaper_shared import StallWatchdog, watched, SettingsPersistence, SettingSpec, load_settings, \
+        validate_changes, SettingsPanel
+except ImportError:
+    # 宿主按文件路径加载插件而没有把插件目录加入 sys.path 时, 从本文件所在目录导入
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from wallpaper_shared import StallWatchdog, watched, SettingsPersistence, SettingSpec, load_settings, \
+        validate_changes, SettingsPanel
+
+# 静态图层缓存最多保留的条目数
+LAYER_CACHE_LIMIT = 64
+# 合成帧缓存最多保留的条目数
+FRAME_CACHE_LIMIT = 16
+# 画刷表缓存最多保留的 (主题, 透明度) 组合数; auto 主题每张表有 144 个渐变画刷
+PALETTE_CACHE_LIMIT = 4
+# 发光强度量化级数, 用于静态图层缓存的键
+GLOW_LEVELS = 8
+# 发光边框外层光环的层数
+GLOW_RINGS = 3
+# 发光呼吸周期 (毫秒): 0.3 → 1.0 → 0.3, 与 20fps 下每帧 ±0.02 的速度一致
+GLOW_PERIOD_MS = 3500
+
+# 单个时钟实例在缩放为 1 时的尺寸
+CLOCK_WIDTH = 400
+CLOCK_HEIGHT = 200
+# 局部重绘: 文字区域向四周扩展的像素 (抗锯齿和右下方的文字阴影), 以及发光边框环带宽度
+TEXT_DIRTY_MARGINS = (-2, -2, 5, 5)
+GLOW_DIRTY_BAND = 5
+# 为 True 时用半透明色块标出每次重绘的区域, 用于检查局部重绘
+DEBUG_REPAINT_OVERLAY = False
+# 绘制耗时分析: 每个阶段保留的最近样本数
+PROFILE_SAMPLES = 512
+
+# 窗口阴影: 模糊半径、偏移和颜色, 与原先的 QGraphicsDropShadowEffect 参数一致
+SHADOW_BLUR_RADIUS = 20
+SHADOW_OFFSET = (0, 5)
+SHADOW_COLOR = QColor(0, 0, 0, 80)
+# 缓存阴影模式下控件四周为阴影预留的边距
+SHADOW_MARGIN = SHADOW_BLUR_RADIUS + max(abs(SHADOW_OFFSET[0]), abs(SHADOW_OFFSET[1]))
+# 阴影实现: cached 为预模糊的缓存图层, effect 为 Qt 图形特效 (每次重绘都模糊), none 不绘制
+SHADOW_MODES = ('cached', 'effect', 'none')
+# 帧的合成方式: pixmap 为每帧新建 QPixmap 并在实例间共享, image 为每个控件一块可复用的
+# 预乘 ARGB QImage 后备缓冲, 只重新合成变化的区域, 尺寸不变时不重新分配; thread 由渲染线程
+# 合成到一对 QImage 双缓冲中, GUI 线程只贴上最近完成的一帧
+RENDER_MODES = ('pixmap', 'image', 'thread')
+
+# 文字与控件边缘的最小距离, 以及时间与日期之间的间距 (缩放为 1 时)
+TEXT_PADDING = 20
+DATE_GAP = 12
+# 世界时钟模式下每个时区时钟的缩放和间距
+WORLD_CLOCK_SCALE = 0.5
+WORLD_CLOCK_SPACING = 10
+# 时区没有后续转换 (不再实行夏令时) 时, 偏移表条目的有效期 (毫秒)
+ZONE_TABLE_HORIZON_MS = 24 * 3600 * 1000
+# 设置面板预览期间时钟只增大不缩小, 增大时按此步长 (逻辑像素) 取整, 拖动字号
+# 滑块时尺寸保持不变, 背景、阴影和装饰图层不会每一步都失效
+PREVIEW_SIZE_STEP = 64
+# 实例缩放范围
+MIN_INSTANCE_SCALE = 0.25
+MAX_INSTANCE_SCALE = 4.0
+
+
+# 发光动画的基准帧率, 步进量按此帧率定义
+BASE_ANIMATION_FPS = 20
+# 仅有呼吸发光 (边框/装饰) 时所需帧率, 量化后的发光级别变化远低于 20fps
+PULSE_ANIMATION_FPS = 10
+# 需要动画时复查遮挡状态的间隔 (毫秒): 其他控件或窗口盖住时钟不一定有事件通知
+OCCLUSION_POLL_MS = 1000
+# 所在窗口上的这些事件可能改变遮挡状态, 到达时立即重新评估
+OCCLUSION_EVENTS = (QEvent.Expose, QEvent.Move, QEvent.Resize, QEvent.ZOrderChange, QEvent.WindowStateChange)
+
+# 单调时钟, 用于统计定时器漂移和唤醒频率
+_MONOTONIC = QElapsedTimer()
+_MONOTONIC.start()
+
+
+# 各时间段的背景渐变色 (起点, 终点) 及开始小时: 早晨, 下午, 傍晚, 夜晚
+DAY_BANDS = (
+    (6, (255, 183, 77), (255, 138, 101)),
+    (12, (74, 144, 226), (80, 170, 255)),
+    (18, (255, 94, 77), (255, 154, 0)),
+    (22, (44, 62, 80), (76, 84, 102)),
+)
+
+# 主题预设, 双击或右键菜单循环切换; gradient 为固定主题的背景渐变色
+THEME_PRESETS = {
+    'morning': {'color': '#ff6b35', 'background_alpha': 70},
+    'afternoon': {'color': '#4a90e2', 'background_alpha': 80},
+    'evening': {'color': '#ff5e5b', 'background_alpha': 90},
+    'night': {'color': '#7b68ee', 'background_alpha': 60},
+    'neon': {'color': '#00ffff', 'background_alpha': 50, 'dynamic_color': True},
+    'elegant': {'color': '#ffd700', 'background_alpha': 40}
+}
+THEME_GRADIENTS = {
+    'morning': DAY_BANDS[0][1:],
+    'afternoon': DAY_BANDS[1][1:],
+    'evening': DAY_BANDS[2][1:],
+    'night': DAY_BANDS[3][1:],
+    'neon': ((0, 200, 255), (140, 60, 255)),
+    'elegant': ((60, 50, 30), (184, 134, 11)),
+}
+
+# 背景调色表的时间粒度 (分钟) 及时间段之间的过渡时长
+PALETTE_SLOT_MINUTES = 10
+PALETTE_TRANSITION_MINUTES = 60
+PALETTE_SLOTS = 24 * 60 // PALETTE_SLOT_MINUTES
+
+
+def palette_slot(hour, minute):
+    """将时刻映射到调色表下标"""
+    return (hour * 60 + minute) // PALETTE_SLOT_MINUTES
+
+
+def _band_colors_at(minutes):
+    """计算一天中某一分钟的渐变色, 在下一时间段开始前平滑过渡"""
+    hour = minutes / 60
+    index = len(DAY_BANDS) - 1
+    for i, band in enumerate(DAY_BANDS):
+        if hour >= band[0]:
+            index = i
+    current = DAY_BANDS[index]
+    following = DAY_BANDS[(index + 1) % len(DAY_BANDS)]
+
+    until_next = (following[0] * 60 - minutes) % (24 * 60)
+    if until_next >= PALETTE_TRANSITION_MINUTES:
+        return current[1], current[2]
+
+    t = 1 - until_next / PALETTE_TRANSITION_MINUTES
+    return tuple(
+        tuple(int(round(a + (b - a) * t)) for a, b in zip(start, end))
+        for start, end in ((current[1], following[1]), (current[2], following[2]))
+    )
+
+
+def _gradient_brush(colors, alpha):
+    """构建与尺寸无关的对角线渐变画刷"""
+    gradient = QLinearGradient(0, 0, 1, 1)
+    gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+    gradient.setColorAt(0, QColor(*colors[0], alpha))
+    gradient.setColorAt(1, QColor(*colors[1], alpha))
+    return QBrush(gradient)
+
+
+class PaletteTable:
+    """预计算的背景画刷表, 每次设置变化时构建一次
+
+    auto 主题按时刻查表 (含时间段之间的插值过渡), 固定主题和 cycle_theme
+    预设对所有时刻返回同一画刷。构建好的表按 (主题, 透明度) 缓存, 与静态图层
+    缓存一样满了就整体清空, 拖动透明度滑块预览时不会留下几百张表。
+    """
+
+    _tables = {}
+
+    @classmethod
+    def for_settings(cls, theme, alpha):
+        key = (theme, int(alpha))
+        table = cls._tables.get(key)
+        if table is None:
+            table = cls(theme, int(alpha))
+            if len(cls._tables) >= PALETTE_CACHE_LIMIT:
+                cls._tables.clear()
+            cls._tables[key] = table
+        return table
+
+    def __init__(self, theme, alpha):
+        self.theme = theme
+        self.fixed = theme in THEME_GRADIENTS
+        if self.fixed:
+            self.brushes = (_gradient_brush(THEME_GRADIENTS[theme], alpha),)
+        else:
+            self.brushes = tuple(
+                _gradient_brush(_band_colors_at(slot * PALETTE_SLOT_MINUTES), alpha)
+                for slot in range(PALETTE_SLOTS)
+            )
 
-class ModernTimeWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.settings = {}
-        self.animation_phase = 0
-        self.glow_intensity = 0.5
-        self.pulse_direction = 1
+    def slot(self, hour, minute):
+        """固定主题只有一个画刷, 返回 0"""
+        if self.fixed:
+            return 0
+        return palette_slot(hour, minute)
+
+    def brush(self, slot):
+        return self.brushes[slot]
+
+
+class TextLayoutCache:
+    """时间/日期文字的字体、度量和 QStaticText 缓存
+
+    字体按 ((字体族, 字号, 字重, 字间距), DPI, 实例缩放) 缓存; 宽度按字符串形状
+    缓存, 等宽数字字体中所有数字都映射为 0, 因此每秒变化的时间不会产生新的度量。
+    所有时钟实例共用同一个缓存, 版式相同的实例共享字体、度量和 QStaticText。
+    """
+
+    def __init__(self, limit=256):
+        self.limit = limit
+        self._fonts = {}
+        self._widths = {}
+        self._static_texts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, font, font_key, scale=1.0, dpi=None):
+        """返回 (QFont, QFontMetrics, 数字是否等宽)
+
+        给定 DPI 时按该 DPI 把字号换算为像素, 度量与控件所在屏幕一致,
+        不依赖主屏幕的 DPI。
+        """
+        entry = self._fonts.get(font_key)
+        if entry is None:
+            if dpi is not None:
+                font = QFont(font)
+                font.setPixelSize(max(1, round(font.pointSizeF() * dpi / 72 * scale)))
+            elif scale != 1.0:
+                font = QFont(font)
+                font.setPointSizeF(font.pointSizeF() * scale)
+            metrics = QFontMetrics(font)
+            tabular = len({metrics.width(digit) for digit in '0123456789'}) == 1
+            entry = (font, metrics, tabular)
+            self._fonts[font_key] = entry
+        return entry
+
+    def layout(self, font, font_key, text, scale=1.0, dpi=None):
+        """返回 (QFont, 宽度, 高度, 上升高度, QStaticText), font_key 需包含缩放和 DPI"""
+        font, metrics, tabular = self.font(font, font_key, scale, dpi)
+
+        shape = text.translate(_DIGIT_SHAPE) if tabular else text
+        width = self._widths.get((font_key, shape))
+        if width is None:
+            self.misses += 1
+            width = metrics.width(text)
+            self._trim(self._widths)
+            self._widths[(font_key, shape)] = width
+        else:
+            self.hits += 1
+
+        static_text = self._static_texts.get((font_key, text))
+        if static_text is None:
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.PlainText)
+            static_text.setPerformanceHint(QStaticText.AggressiveCaching)
+            static_text.prepare(QTransform(), font)
+            self._trim(self._static_texts)
+            self._static_texts[(font_key, text)] = static_text
+
+        return font, width, metrics.height(), metrics.ascent(), static_text
+
+    def _trim(self, table):
+        if len(table) >= self.limit:
+            table.clear()
+
+    def clear(self):
+        self._fonts.clear()
+        self._widths.clear()
+        self._static_texts.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'fonts': len(self._fonts),
+            'static_texts': len(self._static_texts),
+        }
 
-        # 动画属性
-        self._opacity = 1.0
-        self._scale = 1.0
 
-        # 设置动画定时器
-        self.glow_timer = QTimer()
-        self.glow_timer.timeout.connect(self.update_glow)
-        self.glow_timer.start(50)  # 20fps for smooth animation
+# 数字统一映射为 0, 作为等宽字体下的字符串形状
+_DIGIT_SHAPE = str.maketrans('123456789', '000000000')
 
-    @pyqtProperty(float)
-    def opacity(self):
-        return self._opacity
+# 模块共享的文字排版缓存
+TEXT_LAYOUT_CACHE = TextLayoutCache()
 
-    @opacity.setter
-    def opacity(self, value):
-        self._opacity = value
-        self.update()
+# 时间文字的三层阴影: (颜色, 偏移)
+TEXT_SHADOW_PASSES = (
+    (QColor(0, 0, 0, 100), (3, 3)),
+    (QColor(0, 0, 0, 60), (2, 2)),
+    (QColor(0, 0, 0, 30), (1, 1)),
+)
 
-    @pyqtProperty(float)
-    def scale(self):
-        return self._scale
 
-    @scale.setter
-    def scale(self, value):
-        self._scale = value
-        self.update()
+class ClockTickScheduler(QObject):
+    """模块共享的时钟调度器
 
-    def update_glow(self):
-        """更新发光效果"""
-        self.glow_intensity += 0.02 * self.pulse_direction
-        if self.glow_intensity >= 1.0:
-            self.glow_intensity = 1.0
-            self.pulse_direction = -1
-        elif self.glow_intensity <= 0.3:
-            self.glow_intensity = 0.3
-            self.pulse_direction = 1
-
-        self.animation_phase = (self.animation_phase + 1) % 360
-        self.update()
+    只使用一个单次定时器, 在下一个整秒 (隐藏秒数时为整分) 边界触发,
+    并在这一次唤醒中更新所有订阅者。
+    """
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.TextAntialiasing)
+    _instance = None
 
-        # 应用透明度和缩放
-        painter.setOpacity(self._opacity)
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
 
-        # 缩放变换
-        center = self.rect().center()
-        painter.translate(center)
-        painter.scale(self._scale, self._scale)
-        painter.translate(-center)
+    def __init__(self):
+        super().__init__()
+        self._subscribers = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_tick)
+        self._target_ms = 0
+        self._period_ms = 1000
+        self._wakeups = deque()
+
+        # 漂移统计 (毫秒)
+        self.tick_count = 0
+        self.last_drift_ms = 0
+        self.max_drift_ms = 0
+        self._drift_total_ms = 0
+
+    def subscribe(self, subscriber):
+        """订阅时钟 tick, 订阅者需提供 update_time() 和 needs_second_ticks()"""
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+        self.reschedule()
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+        if not self._subscribers:
+            self._timer.stop()
+
+    def reschedule(self, after_ms=0):
+        """按当前订阅者的需要重新对齐到下一个边界"""
+        if not self._subscribers:
+            self._timer.stop()
+            return
+
+        needs_seconds = any(sub.needs_second_ticks() for sub in self._subscribers)
+        self._period_ms = 1000 if needs_seconds else 60000
+
+        now_ms = QDateTime.currentMSecsSinceEpoch()
+        # 定时器提前触发时, 仍然对齐到刚刚目标之后的边界
+        base_ms = max(now_ms, after_ms)
+        self._target_ms = (base_ms // self._period_ms + 1) * self._period_ms
+        self._timer.start(max(0, self._target_ms - now_ms))
+
+    def _on_tick(self):
+        drift = QDateTime.currentMSecsSinceEpoch() - self._target_ms
+        self.tick_count += 1
+        self.last_drift_ms = drift
+        self.max_drift_ms = max(self.max_drift_ms, abs(drift))
+        self._drift_total_ms += abs(drift)
+
+        now = _MONOTONIC.elapsed()
+        self._wakeups.append(now)
+        while self._wakeups and now - self._wakeups[0] > 60000:
+            self._wakeups.popleft()
+
+        for subscriber in list(self._subscribers):
+            if PAINT_PROFILER.enabled:
+                PAINT_PROFILER.call('update_time', subscriber.update_time)
+            else:
+                subscriber.update_time()
+
+        self.reschedule(after_ms=self._target_ms)
+
+    def stats(self):
+        """返回漂移和每分钟唤醒次数"""
+        return {
+            'subscribers': len(self._subscribers),
+            'period_ms': self._period_ms,
+            'ticks': self.tick_count,
+            'last_drift_ms': self.last_drift_ms,
+            'max_drift_ms': self.max_drift_ms,
+            'avg_drift_ms': self._drift_total_ms / self.tick_count if self.tick_count else 0,
+            'wakeups_per_minute': len(self._wakeups),
+        }
+
+
+class ZoneOffsetTable:
+    """IANA 时区的 UTC 偏移表
 
-        # 获取当前时间和日期
-        current_time = QTime.currentTime()
-        current_date = QDate.currentDate()
+    每个时区缓存 (偏移, 生效起点, 下一次转换时刻), 只在跨过转换时刻 (夏令时
+    切换) 时查询一次时区数据库并预先求出下一次转换; 其余时刻换算本地时间只需
+    一次比较和一次加法, 每帧不查询时区数据库。
+    """
 
-        # 构建时间字符串
-        if self.settings.get('time_format', '24h') == '12h':
-            time_str = current_time.toString('h:mm')
-            if self.settings.get('show_seconds', True):
-                time_str += f":{current_time.toString('ss')}"
-            time_str += f" {current_time.toString('AP')}"
+    def __init__(self):
+        self._zones = {}
+        self.lookups = 0
+
+    def offset_ms(self, zone_id, utc_ms):
+        """返回时区在 utc_ms 时刻的 UTC 偏移 (毫秒)"""
+        entry = self._zones.get(zone_id)
+        if entry is None or not entry[1] <= utc_ms < entry[2]:
+            entry = self._resolve(zone_id, utc_ms)
+            self._zones[zone_id] = entry
+        return entry[0]
+
+    def local_datetime(self, zone_id, utc_ms):
+        """返回时区的本地时间, 以 UTC 规格的 QDateTime 表示 (不再做时区换算)"""
+        return QDateTime.fromMSecsSinceEpoch(utc_ms + self.offset_ms(zone_id, utc_ms), Qt.UTC)
+
+    def _resolve(self, zone_id, utc_ms):
+        self.lookups += 1
+        zone = QTimeZone(zone_id.encode())
+        moment = QDateTime.fromMSecsSinceEpoch(utc_ms, Qt.UTC)
+        start, end = utc_ms, utc_ms + ZONE_TABLE_HORIZON_MS
+        if zone.hasTransitions():
+            previous = zone.previousTransition(moment).atUtc
+            following = zone.nextTransition(moment).atUtc
+            if previous.isValid():
+                start = previous.toMSecsSinceEpoch()
+            if following.isValid():
+                end = following.toMSecsSinceEpoch()
+        return zone.offsetFromUtc(moment) * 1000, start, end
+
+    def stats(self):
+        return {'zones': len(self._zones), 'lookups': self.lookups}
+
+
+# 模块共享的时区偏移表
+ZONE_OFFSETS = ZoneOffsetTable()
+
+
+def fitted_clock_size(config, scale, dpi, label=''):
+    """按字号、DPI 和缩放计算能完整容纳时间和日期的控件尺寸 (逻辑像素)
+
+    内容区不小于 CLOCK_WIDTH×CLOCK_HEIGHT 按缩放后的尺寸, 四周另加阴影边距;
+    用最宽的时间和日期样例测量, 因此每秒变化的文字不会超出控件。
+    """
+    cache_scale = (dpi, scale)
+    sample_time = QTime(23, 58, 58).toString(config.time_pattern)
+    _, time_width, time_height, _, _ = TEXT_LAYOUT_CACHE.layout(
+        config.time_font, (config.time_font_key,) + cache_scale, sample_time, scale, dpi)
+    text_width, block_height = time_width, time_height
+
+    sample_date = QDate(2026, 9, 30).toString(config.date_pattern) if config.show_date else ''
+    if label:
+        sample_date = f"{label}  {sample_date}" if sample_date else label
+    if sample_date:
+        _, date_width, date_height, _, _ = TEXT_LAYOUT_CACHE.layout(
+            config.date_font, (config.date_font_key,) + cache_scale, sample_date, scale, dpi)
+        text_width = max(text_width, date_width)
+        block_height += int(DATE_GAP * scale) + date_height
+
+    padding = 2 * int(TEXT_PADDING * scale)
+    margin = 2 * config.shadow_margin
+    return (max(int(CLOCK_WIDTH * scale), text_width + padding) + margin,
+            max(int(CLOCK_HEIGHT * scale), block_height + padding) + margin)
+
+
+def zone_label(zone_id):
+    """时区的显示名称: 取 IANA 名称的最后一段, 如 America/New_York → New York"""
+    return zone_id.rsplit('/', 1)[-1].replace('_', ' ')
+
+
+def parse_zones(value):
+    """解析逗号或空白分隔的 IANA 时区列表, 含未知时区时返回 None"""
+    zones = [zone for zone in value.replace(',', ' ').split() if zone]
+    if not all(QTimeZone.isTimeZoneIdAvailable(zone.encode()) for zone in zones):
+        return None
+    return zones
+
+
+class RenderConfig:
+    """编译后的只读渲染配置
+
+    在设置变化时构建一次, 预先解析出 QColor、QFont 和时间格式, 绘制路径
+    直接读取属性而不是逐项 dict.get()。对象本身 (按身份比较) 也作为其他
+    渲染缓存的失效键: 设置不变时配置对象不变。layer_keys 记录每个静态图层
+    依赖的设置, 只有对应的键变化时该图层才需要重绘。
+    """
+
+    __slots__ = (
+        'show_seconds', 'show_date', 'time_pattern', 'date_pattern',
+        'font_family', 'font_size', 'time_font', 'date_font', 'time_font_key', 'date_font_key',
+        'color', 'background_alpha', 'border_radius', 'theme', 'palette',
+        'use_shadow', 'use_glow', 'dynamic_color', 'show_decorations',
+        'animation_enabled', 'animation_fps_cap', 'shadow_mode', 'shadow_margin', 'render_mode', 'layer_keys',
+    )
+
+    def __init__(self, settings):
+        assign = object.__setattr__
+
+        show_seconds = bool(settings.get('show_seconds', True))
+        if settings.get('time_format', '24h') == '12h':
+            time_pattern = 'h:mm:ss AP' if show_seconds else 'h:mm AP'
+        else:
+            time_pattern = 'HH:mm:ss' if show_seconds else 'HH:mm'
+        assign(self, 'show_seconds', show_seconds)
+        assign(self, 'show_date', bool(settings.get('show_date', True)))
+        assign(self, 'time_pattern', time_pattern)
+        assign(self, 'date_pattern', 'yyyy年MM月dd日 dddd')
+
+        # 字体: 时间为粗体加字间距, 日期为 0.35 倍字号的常规字重
+        family = settings.get('font_family', 'Arial')
+        font_size = int(settings.get('font_size', 48))
+        time_font = QFont(family)
+        time_font.setPointSize(max(1, font_size))
+        time_font.setWeight(QFont.Bold)
+        time_font.setLetterSpacing(QFont.AbsoluteSpacing, 2)
+        date_font = QFont(family)
+        date_font.setPointSize(max(1, int(font_size * 0.35)))
+        date_font.setWeight(QFont.Normal)
+        assign(self, 'font_family', family)
+        assign(self, 'font_size', font_size)
+        assign(self, 'time_font', time_font)
+        assign(self, 'date_font', date_font)
+        assign(self, 'time_font_key', (family, font_size, QFont.Bold, 2))
+        assign(self, 'date_font_key', (family, int(font_size * 0.35), QFont.Normal, 0))
+
+        background_alpha = int(settings.get('background_alpha', 50))
+        theme = settings.get('theme', 'auto')
+        assign(self, 'color', QColor(settings.get('color', '#FFFFFF')))
+        assign(self, 'background_alpha', background_alpha)
+        assign(self, 'border_radius', int(settings.get('border_radius', 20)))
+        assign(self, 'theme', theme)
+        assign(self, 'palette', PaletteTable.for_settings(theme, background_alpha))
+
+        assign(self, 'use_shadow', bool(settings.get('use_shadow', True)))
+        assign(self, 'use_glow', bool(settings.get('use_glow', True)))
+        assign(self, 'dynamic_color', bool(settings.get('dynamic_color', True)))
+        assign(self, 'show_decorations', bool(settings.get('show_decorations', True)))
+        assign(self, 'animation_enabled', bool(settings.get('animation_enabled', True)))
+        assign(self, 'animation_fps_cap', max(0, int(settings.get('animation_fps_cap', BASE_ANIMATION_FPS))))
+        shadow_mode = settings.get('shadow_mode', 'cached')
+        assign(self, 'shadow_mode', shadow_mode)
+        assign(self, 'shadow_margin', SHADOW_MARGIN if shadow_mode == 'cached' else 0)
+        assign(self, 'render_mode', settings.get('render_mode', 'pixmap'))
+
+        # 各静态图层依赖的设置: 背景 (调色表、圆角、发光边框), 装饰 (颜色), 阴影 (圆角、边距)
+        rgba = self.color.rgba()
+        assign(self, 'layer_keys', {
+            'background': (self.palette, self.border_radius, self.use_glow, rgba, self.shadow_margin),
+            'decorations': (rgba, self.shadow_margin),
+            'shadow': (self.border_radius, self.shadow_margin),
+        })
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RenderConfig 是只读的, 不能修改 {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"RenderConfig 是只读的, 不能删除 {name}")
+
+
+def glow_state(now_ms):
+    """按单调时钟计算 (发光强度, 动画相位), 同一时刻所有实例得到相同的值"""
+    t = (now_ms % GLOW_PERIOD_MS) / GLOW_PERIOD_MS
+    intensity = 0.3 + 0.7 * (1 - abs(2 * t - 1))
+    phase = (now_ms * BASE_ANIMATION_FPS / 1000) % 360
+    return intensity, phase
+
+
+def blur_silhouette(path, size, ratio):
+    """把轮廓路径按阴影参数模糊成图层, 结果按设备像素比缩放
+
+    借助 QGraphicsScene 对一个像素图项应用一次 QGraphicsBlurEffect; 只在尺寸或
+    设置变化时调用, 之后每帧只需贴图。
+    """
+    device_size = size * ratio
+    source = QPixmap(device_size)
+    source.fill(Qt.transparent)
+    painter = QPainter(source)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(ratio, ratio)
+    painter.translate(*SHADOW_OFFSET)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(SHADOW_COLOR)
+    painter.drawPath(path)
+    painter.end()
+
+    blur = QGraphicsBlurEffect()
+    blur.setBlurRadius(SHADOW_BLUR_RADIUS * ratio)
+    blur.setBlurHints(QGraphicsBlurEffect.QualityHint)
+    item = QGraphicsPixmapItem(source)
+    item.setGraphicsEffect(blur)
+    scene = QGraphicsScene()
+    scene.addItem(item)
+
+    shadow = QPixmap(device_size)
+    shadow.fill(Qt.transparent)
+    painter = QPainter(shadow)
+    bounds = QRectF(source.rect())
+    scene.render(painter, bounds, bounds)
+    painter.end()
+    shadow.setDevicePixelRatio(ratio)
+    return shadow
+
+
+class StaticLayerCache:
+    """模块共享的静态图层缓存
+
+    键为 (图层, 宽, 高, 调色表下标, 图层依赖的设置, 发光级别), 尺寸和设置相同的
+    时钟实例共用同一张 QPixmap, 实例数增加时缓存条目不随之线性增长。
+    合成帧缓存也使用这个类, 以帧内容为键。
+    """
+
+    def __init__(self, limit=LAYER_CACHE_LIMIT):
+        self.limit = limit
+        self._layers = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = {}
+
+    def get(self, key):
+        pixmap = self._layers.get(key)
+        if pixmap is None:
+            self.misses += 1
         else:
-            time_str = current_time.toString('HH:mm')
-            if self.settings.get('show_seconds', True):
-                time_str += f":{current_time.toString('ss')}"
+            self.hits += 1
+        return pixmap
+
+    def put(self, key, pixmap):
+        if len(self._layers) >= self.limit:
+            self._layers.clear()
+        self._layers[key] = pixmap
+
+    def clear(self):
+        self._layers.clear()
+
+    def discard(self, layer, settings_key):
+        """丢弃某个图层在旧设置下渲染的条目"""
+        stale = [key for key in self._layers if key[0] == layer and key[4] == settings_key]
+        for key in stale:
+            del self._layers[key]
+        if stale:
+            self.invalidations[layer] = self.invalidations.get(layer, 0) + 1
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._layers),
+            'invalidations': dict(self.invalidations),
+        }
+
+
+# 模块共享的静态图层缓存
+STATIC_LAYER_CACHE = StaticLayerCache()
+# 模块共享的合成帧缓存, 只需容纳同一时刻各种尺寸/配置的实例
+SHARED_FRAME_CACHE = StaticLayerCache(limit=FRAME_CACHE_LIMIT)
+
+
+class ResourceLedger:
+    """按类别统计存活的 Qt 对象
+
+    创建时登记, 对象的 destroyed 信号到达 (C++ 对象真正释放) 时注销,
+    用于发现关闭后仍然存活的控件、定时器、动画和特效。
+    """
+
+    def __init__(self):
+        self.live = {}
+        self.created = {}
+
+    def track(self, kind, obj):
+        self.live[kind] = self.live.get(kind, 0) + 1
+        self.created[kind] = self.created.get(kind, 0) + 1
+        obj.destroyed.connect(lambda *_: self._release(kind))
+        return obj
+
+    def _release(self, kind):
+        self.live[kind] -= 1
+
+    def stats(self):
+        return {'live': dict(self.live), 'created': dict(self.created)}
+
+
+RESOURCES = ResourceLedger()
+
+
+class PaintProfiler:
+    """可选的分阶段耗时统计
 
-        # 构建日期字符串
-        date_str = ""
-        if self.settings.get('show_date', True):
-            date_str = current_date.toString('yyyy年MM月dd日 dddd')
+    各绘制阶段 (整次重绘、合成、阴影/背景/装饰图层、文字、贴图) 和定时器回调
+    (update_glow、update_time) 的耗时按单调时钟记录到每个阶段一个的定长环形
+    缓冲中, 报告最近样本的 p50/p95/最大值。关闭时每个阶段只多一次 enabled 判断。
+    thread 渲染方式下渲染线程也会记录, 样本的读写都在锁内进行。
+    """
+
+    def __init__(self, size=PROFILE_SAMPLES):
+        self.enabled = False
+        self.size = size
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def call(self, stage, function, *args):
+        """调用 function 并记录耗时"""
+        start = _MONOTONIC.nsecsElapsed()
+        try:
+            return function(*args)
+        finally:
+            self.record(stage, _MONOTONIC.nsecsElapsed() - start)
+
+    def record(self, stage, elapsed_ns):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.size)
+            samples.append(elapsed_ns)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def report(self):
+        """返回各阶段最近样本的次数和 p50/p95/最大耗时 (毫秒)"""
+        with self._lock:
+            snapshot = [(stage, list(samples)) for stage, samples in self._samples.items()]
+        report = {}
+        for stage, samples in snapshot:
+            ordered = sorted(samples)
+            report[stage] = {
+                'count': len(ordered),
+                'p50_ms': ordered[len(ordered) // 2] / 1e6,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] / 1e6,
+                'max_ms': ordered[-1] / 1e6,
+            }
+        return report
+
+
+PAINT_PROFILER = PaintProfiler()
+
+
+class AnimationClock(QObject):
+    """模块共享的动画时钟
+
+    所有时钟实例共用一个定时器, 按实例中最高的帧率运行; 每次唤醒时只推进
+    到期的实例, 各实例仍按自己的帧率更新。
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        # 挂在 QApplication 下, 生命周期覆盖所有控件, 退出时控件隐藏仍可安全回调
+        super().__init__(QCoreApplication.instance())
+        # id(控件) -> [控件, 帧间隔 (毫秒), 上次推进时间]
+        self._entries = {}
+        # 已连接 destroyed 信号的控件; 暂停后恢复时复用原来的连接
+        self._connected = set()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._on_frame)
+        self.wakeups = 0
+
+    def set_rate(self, widget, fps):
+        """设置实例的动画帧率, 为 0 时停止推进该实例"""
+        key = id(widget)
+        if fps:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [widget, 1000 / fps, _MONOTONIC.elapsed()]
+                if key not in self._connected:
+                    self._connected.add(key)
+                    widget.destroyed.connect(lambda *_: self._forget(key))
+            else:
+                entry[1] = 1000 / fps
+        elif key in self._entries:
+            del self._entries[key]
+        self._restart()
+
+    def _forget(self, key):
+        self._connected.discard(key)
+        self._entries.pop(key, None)
+        self._restart()
+
+    def _restart(self):
+        if not self._entries:
+            self._timer.stop()
+            return
+        interval = int(round(min(entry[1] for entry in self._entries.values())))
+        if not self._timer.isActive() or self._timer.interval() != interval:
+            self._timer.start(interval)
+
+    def _on_frame(self):
+        self.wakeups += 1
+        now = _MONOTONIC.elapsed()
+        # 允许半个定时器周期的提前量, 避免帧率相同的实例因抖动跳帧
+        slack = self._timer.interval() / 2
+        glow = glow_state(now)
+        for entry in list(self._entries.values()):
+            widget, interval, last = entry
+            if now - last + slack >= interval:
+                entry[2] = now
+                if PAINT_PROFILER.enabled:
+                    PAINT_PROFILER.call('update_glow', widget.update_glow, glow)
+                else:
+                    widget.update_glow(glow)
+
+    def stats(self):
+        return {
+            'widgets': len(self._entries),
+            'interval_ms': self._timer.interval() if self._timer.isActive() else 0,
+            'wakeups': self.wakeups,
+        }
+
+
+class FrameRateGovernor:
+    """发光动画帧率调节器
+
+    根据启用的特效推导所需帧率, 没有动画时降为 0; 控件隐藏、最小化、
+    被完全遮挡、正在拖动或壁纸停止时暂停, 并受 animation_fps_cap 预算限制。
+    帧由共享的 AnimationClock 驱动。需要动画时每 OCCLUSION_POLL_MS 复查一次
+    遮挡, 所在窗口的暴露、移动和层叠次序变化由控件转来立即复查。
+    """
+
+    def __init__(self, widget, clock):
+        self.widget = widget
+        self.clock = clock
+        self.suspended = False
+        self.effective_fps = 0
+
+    def required_fps(self):
+        """根据启用的特效计算所需帧率"""
+        config = self.widget.config
+        if not config.animation_enabled:
+            return 0
+        if config.dynamic_color:
+            fps = BASE_ANIMATION_FPS
+        elif config.use_glow or config.show_decorations:
+            fps = PULSE_ANIMATION_FPS
+        else:
+            return 0
+        return min(fps, config.animation_fps_cap)
+
+    def is_occluded(self):
+        """控件不可见、所在窗口最小化或未暴露时视为被遮挡"""
+        widget = self.widget
+        if not widget.isVisible() or widget.window().isMinimized():
+            return True
+        handle = widget.window().windowHandle()
+        if handle is not None and not handle.isExposed():
+            return True
+        return widget.visibleRegion().isEmpty()
+
+    def set_suspended(self, suspended):
+        """壁纸停止/启动时挂起或恢复动画"""
+        self.suspended = suspended
+        self.evaluate()
+
+    def evaluate(self):
+        """重新计算有效帧率并通知动画时钟"""
+        wanted = 0 if self.suspended or self.widget.dragging else self.required_fps()
+        fps = 0 if not wanted or self.is_occluded() else wanted
+
+        lifecycle = self.widget.lifecycle
+        if wanted:
+            poll = lifecycle.timer('occlusion', self.evaluate)
+            if not poll.isActive():
+                poll.start(OCCLUSION_POLL_MS)
+        elif 'occlusion' in lifecycle.timers:
+            lifecycle.timers['occlusion'].stop()
+
+        if fps == self.effective_fps:
+            return
+        self.effective_fps = fps
+        self.clock.set_rate(self.widget, fps)
+
+
+class WidgetLifecycle:
+    """控件拥有的定时器、动画和特效
+
+    全部以控件为父对象创建并登记到 RESOURCES。shutdown() 按固定顺序停止动画和
+    定时器、移除特效、让动画时钟不再推进该控件并释放后备缓冲和渲染槽, 之后控件可以
+    安全地 deleteLater, 不会再有回调落到已关闭的控件上。
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.timers = {}
+        self.animations = {}
+        self.closed = False
+
+    def timer(self, name, callback):
+        """按名称复用的单次定时器"""
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = RESOURCES.track('timers', QTimer(self.widget))
+            timer.setSingleShot(True)
+            timer.timeout.connect(callback)
+            self.timers[name] = timer
+        return timer
+
+    def animate(self, property_name, duration, start, end, easing):
+        """启动属性动画, 同一属性上未结束的动画先停止; 动画结束后自动释放"""
+        self.stop_animation(property_name)
+        animation = RESOURCES.track('animations', QPropertyAnimation(self.widget, property_name, self.widget))
+        animation.setDuration(duration)
+        animation.setStartValue(start)
+        animation.setEndValue(end)
+        animation.setEasingCurve(easing)
+        animation.destroyed.connect(lambda *_: self._forget_animation(property_name, animation))
+        self.animations[property_name] = animation
+        animation.start(QPropertyAnimation.DeleteWhenStopped)
+        return animation
+
+    def _forget_animation(self, property_name, animation):
+        if self.animations.get(property_name) is animation:
+            del self.animations[property_name]
+
+    def stop_animation(self, property_name):
+        """停止动画而不触发 finished 回调"""
+        animation = self.animations.pop(property_name, None)
+        if animation is not None:
+            try:
+                animation.finished.disconnect()
+            except TypeError:
+                pass  # 没有连接 finished 的动画 (如淡入)
+            animation.stop()
+
+    def set_effect(self, effect):
+        """设置图形特效, 控件会释放原来的特效"""
+        if effect is not None:
+            RESOURCES.track('effects', effect)
+        self.widget.setGraphicsEffect(effect)
+
+    def shutdown(self):
+        """确定地停止并释放控件的全部资源, 重复调用无副作用"""
+        if self.closed:
+            return
+        self.closed = True
+        for property_name in list(self.animations):
+            self.stop_animation(property_name)
+        for timer in self.timers.values():
+            timer.stop()
+        self.set_effect(None)
+
+        widget = self.widget
+        widget.governor.set_suspended(True)
+        widget.release_render_slot()
+        widget.back_buffer = widget.back_buffer_state = widget.painted_state = None
+
+
+class ClockRenderer:
+    """时钟帧的合成: 静态图层、时间文字、重绘区域的计算
+
+    子类提供 width/height/size/rect/devicePixelRatioF/logicalDpiY、config、
+    layout_scale, 以及 new_layer() 和 shadow_layer()。控件在 GUI 线程中使用模块
+    共享的缓存; 渲染线程中的 OffscreenClock 使用线程自己的缓存和 QImage 图层。
+    """
+
+    layer_cache = STATIC_LAYER_CACHE
+    text_layouts = TEXT_LAYOUT_CACHE
+
+    def content_rect(self):
+        """卡片所在区域: 控件矩形减去四周的阴影边距"""
+        margin = self.config.shadow_margin
+        return self.rect().adjusted(margin, margin, -margin, -margin)
+
+    def card_radius(self):
+        """卡片圆角半径, 随实例缩放"""
+        return self.config.border_radius * self.layout_scale
+
+    def border_paths(self):
+        """返回 (卡片圆角矩形路径, 外层发光环路径列表), 按几何尺寸和圆角缓存"""
+        rect = self.content_rect()
+        radius = self.card_radius()
+        key = (rect, radius)
+        if self._border_paths[0] == key:
+            return self._border_paths[1]
+
+        card = QPainterPath()
+        card.addRoundedRect(QRectF(rect), radius, radius)
+        rings = []
+        for i in range(GLOW_RINGS):
+            ring = QPainterPath()
+            ring.addRoundedRect(QRectF(rect.adjusted(-i - 1, -i - 1, i + 1, i + 1)), radius + i + 1, radius + i + 1)
+            rings.append(ring)
+
+        self._border_paths = (key, (card, rings))
+        return card, rings
+
+    def compose_frame(self, time_str, date_str, slot, glow, text_color, frame=None, region=None):
+        """合成一帧: 背景图层、时间文字和装饰图层
+
+        默认绘制到新建的图层; 给出 frame 和 region 时只清空并重绘 frame 中的该区域。
+        """
+        if frame is None:
+            frame = self.new_layer()
+        painter = QPainter(frame)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        if region is not None:
+            painter.setClipRegion(region)
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.fillRect(self.rect(), Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        profiling = PAINT_PROFILER.enabled
+
+        # 贴上预模糊的阴影图层
+        if self.config.shadow_mode == 'cached':
+            if profiling:
+                PAINT_PROFILER.call('shadow', self.draw_layer, painter, 'shadow', 0, 0)
+            else:
+                self.draw_layer(painter, 'shadow', 0, 0)
 
         # 绘制现代化背景
-        self.draw_modern_background(painter)
+        if profiling:
+            PAINT_PROFILER.call('background', self.draw_layer, painter, 'background', slot, glow)
+        else:
+            self.draw_layer(painter, 'background', slot, glow)
 
-        # 绘制时间文字
-        self.draw_time_text(painter, time_str, date_str)
+        # 绘制时间文字; 局部合成时文字不在重绘区域内则跳过, 裁剪并不能省去字形光栅化
+        if region is None or region.intersects(self.text_region(time_str, date_str)):
+            if profiling:
+                PAINT_PROFILER.call('time_text', self.draw_time_text, painter, time_str, date_str, text_color)
+            else:
+                self.draw_time_text(painter, time_str, date_str, text_color)
 
-        # 绘制装饰元素
-        self.draw_decorative_elements(painter)
+        # 绘制装饰元素, 与调色表无关, 各时区的时钟共用同一张图层
+        if self.config.show_decorations:
+            if profiling:
+                PAINT_PROFILER.call('decorations', self.draw_layer, painter, 'decorations', 0, glow)
+            else:
+                self.draw_layer(painter, 'decorations', 0, glow)
 
         painter.end()
+        return frame
 
-    def draw_modern_background(self, painter):
-        """绘制现代化背景"""
-        rect = self.rect()
-
-        # 创建渐变背景
-        gradient = QLinearGradient(0, 0, rect.width(), rect.height())
-
-        # 根据时间改变背景颜色
-        current_hour = QTime.currentTime().hour()
-        if 6 <= current_hour < 12:  # 早晨
-            gradient.setColorAt(0, QColor(255, 183, 77, int(self.settings.get('background_alpha', 50))))
-            gradient.setColorAt(1, QColor(255, 138, 101, int(self.settings.get('background_alpha', 50))))
-        elif 12 <= current_hour < 18:  # 下午
-            gradient.setColorAt(0, QColor(74, 144, 226, int(self.settings.get('background_alpha', 50))))
-            gradient.setColorAt(1, QColor(80, 170, 255, int(self.settings.get('background_alpha', 50))))
-        elif 18 <= current_hour < 22:  # 傍晚
-            gradient.setColorAt(0, QColor(255, 94, 77, int(self.settings.get('background_alpha', 50))))
-            gradient.setColorAt(1, QColor(255, 154, 0, int(self.settings.get('background_alpha', 50))))
-        else:  # 夜晚
-            gradient.setColorAt(0, QColor(44, 62, 80, int(self.settings.get('background_alpha', 50))))
-            gradient.setColorAt(1, QColor(76, 84, 102, int(self.settings.get('background_alpha', 50))))
-
-        # 绘制主背景
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(gradient))
+    def draw_layer(self, painter, layer, slot, glow):
+        """贴上静态图层, 缓存未命中时先渲染该图层"""
+        self.blit(painter, self.static_layer(layer, slot, glow))
+
+    @staticmethod
+    def blit(painter, frame):
+        if isinstance(frame, QImage):
+            painter.drawImage(0, 0, frame)
+        else:
+            painter.drawPixmap(0, 0, frame)
+
+    def static_layer(self, layer, slot, glow):
+        """获取静态图层, 未命中时按设备像素比渲染到 new_layer() 创建的图层并放入缓存
 
-        # 创建圆角矩形路径
-        path = QPainterPath()
-        radius = self.settings.get('border_radius', 20)
-        painter.drawPath(path)
+        像素比是键的一部分, 各屏幕的图层分别缓存, 控件在屏幕间移动时不需要重绘。
+        """
+        key = (layer, self.width(), self.height(), slot, self.config.layer_keys[layer], glow,
+               self.devicePixelRatioF())
+        pixmap = self.layer_cache.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        if layer == 'shadow':
+            pixmap = self.shadow_layer()
+        else:
+            pixmap = self.new_layer()
+            layer_painter = QPainter(pixmap)
+            layer_painter.setRenderHint(QPainter.Antialiasing)
+            if layer == 'background':
+                self.draw_modern_background(layer_painter, self.config.palette.brush(slot), glow)
+            else:
+                self.draw_decorative_elements(layer_painter, glow)
+            layer_painter.end()
+
+        self.layer_cache.put(key, pixmap)
+        return pixmap
+
+    def draw_modern_background(self, painter, brush, glow_intensity):
+        """绘制现代化背景: 圆角卡片和多层发光边框
+
+        路径按几何尺寸缓存, 发光强度只体现在画笔的透明度上。
+        """
+        card, rings = self.border_paths()
+
+        # 绘制主背景, 渐变画刷来自预计算的调色表
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(brush)
+        painter.drawPath(card)
 
         # 绘制发光边框
-        if self.settings.get('use_glow', True):
-            glow_color = QColor(self.settings.get('color', '#FFFFFF'))
-            glow_color.setAlpha(int(80 * self.glow_intensity))
+        if self.config.use_glow:
+            glow_color = QColor(self.config.color)
+            glow_color.setAlpha(int(80 * glow_intensity))
 
             pen = QPen(glow_color, 2)
             painter.setPen(pen)
             painter.setBrush(Qt.NoBrush)
-            painter.drawPath(path)
+            painter.drawPath(card)
 
-            # 外层发光
-            for i in range(3):
-                glow_color.setAlpha(int(30 * self.glow_intensity / (i + 1)))
-                pen = QPen(glow_color, 1)
+            # 外层发光, 每层向外扩展 1 像素并逐层变淡
+            pen.setWidth(1)
+            for i, ring in enumerate(rings):
+                glow_color.setAlpha(int(30 * glow_intensity / (i + 1)))
+                pen.setColor(glow_color)
                 painter.setPen(pen)
-                expanded_rect = rect.adjusted(-i - 1, -i - 1, i + 1, i + 1)
-                path_expanded = QPainterPath()
+                painter.drawPath(ring)
 
-                painter.drawPath(path_expanded)
+    def layout_text(self, time_str, date_str):
+        """计算时间和日期的排版
 
-    def draw_time_text(self, painter, time_str, date_str):
+        返回 (时间字体, 时间 QStaticText, x, top, 宽, 高, 日期字体, 日期 QStaticText,
+        日期 x, 日期 top, 日期宽, 日期高); 没有日期时日期部分为 None/0。
+        """
+        rect = self.content_rect()
+        config = self.config
+
+        # 字体、度量和 QStaticText 都来自排版缓存, 版式不变时几乎没有开销;
+        # 字号按控件所在屏幕的逻辑 DPI 换算, 与 fitted_clock_size 一致
+        dpi = self.logicalDpiY()
+        scale = self.layout_scale
+
+        time_font, text_width, text_height, _, time_text = self.text_layouts.layout(
+            config.time_font, (config.time_font_key, dpi, scale), time_str, scale, dpi)
+        block_height = text_height
+
+        date_font, date_text, date_width, date_height = None, None, 0, 0
+        if date_str:
+            date_font, date_width, date_height, _, date_text = self.text_layouts.layout(
+                config.date_font, (config.date_font_key, dpi, scale), date_str, scale, dpi)
+            block_height += int(DATE_GAP * scale) + date_height
+
+        # 时间和日期作为一个整体垂直居中
+        x = rect.left() + (rect.width() - text_width) // 2
+        top = rect.top() + (rect.height() - block_height) // 2
+        date_x = rect.left() + (rect.width() - date_width) // 2
+        date_top = top + text_height + int(DATE_GAP * scale)
+        return (time_font, time_text, x, top, text_width, text_height,
+                date_font, date_text, date_x, date_top, date_width, date_height)
+
+    def draw_time_text(self, painter, time_str, date_str, text_color):
         """绘制时间文字"""
-        rect = self.rect()
+        config = self.config
 
-        # 设置时间字体
-        time_font = QFont(self.settings.get('font_family', 'Arial'))
-        time_font.setPointSize(self.settings.get('font_size', 48))
-        time_font.setWeight(QFont.Bold)
-        time_font.setLetterSpacing(QFont.AbsoluteSpacing, 2)
+        layout_start = _MONOTONIC.nsecsElapsed()
+        (time_font, time_text, x, top, _, _,
+         date_font, date_text, date_x, date_top, _, _) = self.layout_text(time_str, date_str)
+        self.last_text_layout_ns = _MONOTONIC.nsecsElapsed() - layout_start
+
+        painter.setFont(time_font)
 
         # 创建文字发光效果
-        if self.settings.get('use_shadow', True):
+        if config.use_shadow:
             # 绘制多层阴影实现发光效果
-            shadow_colors = [
-                QColor(0, 0, 0, 100),
-                QColor(0, 0, 0, 60),
-                QColor(0, 0, 0, 30)
-            ]
+            for shadow_color, (dx, dy) in TEXT_SHADOW_PASSES:
+                painter.setPen(shadow_color)
+                painter.drawStaticText(x + dx, top + dy, time_text)
 
-            offsets = [(3, 3), (2, 2), (1, 1)]
+        # 绘制主文字
+        painter.setPen(text_color)
+        painter.drawStaticText(x, top, time_text)
 
-            for shadow_color, (dx, dy) in zip(shadow_colors, offsets):
-                painter.setPen(shadow_color)
-                painter.setFont(time_font)
+        # 绘制日期
+        if date_str:
+            painter.setFont(date_font)
 
-                # 计算居中位置
-                fm = painter.fontMetrics()
-                text_width = fm.width(time_str)
-                text_height = fm.height()
+            date_color = QColor(text_color)
+            date_color.setAlpha(200)
+            painter.setPen(date_color)
 
-                x = (rect.width() - text_width) // 2 + dx
-                y = (rect.height() - text_height) // 2 + text_height // 2 + dy
+            painter.drawStaticText(date_x, date_top, date_text)
+
+    def decoration_geometry(self):
+        """返回装饰元素的 (四个角落圆点的矩形, 两条中心线的端点, 线宽)"""
+        rect = self.content_rect()
+        scale = self.layout_scale
+        inset = int(10 * scale)
+        corner_size = int(15 * scale)
+
+        left, top = rect.left() + inset, rect.top() + inset
+        right = rect.left() + rect.width() - corner_size - inset
+        bottom = rect.top() + rect.height() - corner_size - inset
+        corners = [QRect(cx, cy, corner_size, corner_size) for cx, cy in
+                   ((left, top), (right, top), (left, bottom), (right, bottom))]
+
+        center_y = rect.top() + rect.height() // 2
+        line_start, line_end = int(20 * scale), int(60 * scale)
+        right_edge = rect.left() + rect.width()
+        lines = [
+            (rect.left() + line_start, center_y, rect.left() + line_end, center_y),
+            (right_edge - line_end, center_y, right_edge - line_start, center_y),
+        ]
+        return corners, lines, 2 * scale
+
+    def draw_decorative_elements(self, painter, glow_intensity):
+        """绘制装饰元素"""
+        corners, lines, line_width = self.decoration_geometry()
 
-                painter.drawText(x, y, time_str)
+        # 绘制角落装饰: 左上、右上、左下、右下
+        corner_color = QColor(self.config.color)
+        corner_color.setAlpha(int(100 * glow_intensity))
 
-        # 绘制主文字
-        text_color = QColor(self.settings.get('color', '#FFFFFF'))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(corner_color)
+        for corner in corners:
+            painter.drawEllipse(corner)
 
-        # 添加时间变化的颜色效果
-        if self.settings.get('dynamic_color', True):
-            hue = (self.animation_phase + QTime.currentTime().second() * 6) % 360
-            text_color = QColor.fromHsv(hue, 100, 255)
+        # 绘制中心装饰线: 左侧、右侧
+        line_color = QColor(self.config.color)
+        line_color.setAlpha(int(50 * glow_intensity))
 
-        painter.setPen(text_color)
-        painter.setFont(time_font)
+        pen = QPen(line_color, line_width)
+        painter.setPen(pen)
+        for line in lines:
+            painter.drawLine(*line)
+
+    def text_region(self, time_str, date_str):
+        """时间和日期 (含文字阴影) 覆盖的区域"""
+        (_, _, x, top, width, height, _, _, date_x, date_top, date_width, date_height) = \
+            self.layout_text(time_str, date_str)
+        region = QRegion(QRect(x, top, width, height).adjusted(*TEXT_DIRTY_MARGINS))
+        if date_str:
+            region += QRect(date_x, date_top, date_width, date_height).adjusted(*TEXT_DIRTY_MARGINS)
+        return region
+
+    def changed_time_region(self, old_time, new_time, date_str):
+        """两次时间字符串之间变化的字符所覆盖的区域
+
+        等宽数字字体下字符位置固定, 只取第一个到最后一个不同字符的范围;
+        否则 (或长度变化时) 返回整段时间文字的区域。
+        """
+        config = self.config
+        dpi, scale = self.logicalDpiY(), self.layout_scale
+        _, metrics, tabular = self.text_layouts.font(config.time_font, (config.time_font_key, dpi, scale), scale, dpi)
+        if not tabular or len(old_time) != len(new_time):
+            return QRegion(self.text_region(new_time, '').boundingRect())
+
+        changed = [index for index, (a, b) in enumerate(zip(old_time, new_time)) if a != b]
+        (_, _, x, top, _, height, *_) = self.layout_text(new_time, date_str)
+        left = x + metrics.width(new_time[:changed[0]])
+        right = x + metrics.width(new_time[:changed[-1] + 1])
+        return QRegion(QRect(left, top, right - left, height).adjusted(*TEXT_DIRTY_MARGINS))
+
+    def glow_region(self):
+        """发光强度变化时需要重绘的区域: 发光边框的环带和装饰元素"""
+        key = (self.size(), self.config)
+        if self._glow_region[0] == key:
+            return self._glow_region[1]
+
+        config = self.config
+        region = QRegion()
+        if config.use_glow:
+            # 边框及外层发光构成的环带, 圆角处保留整个角落方块
+            rect = self.content_rect()
+            band = GLOW_DIRTY_BAND
+            corner = int(self.card_radius()) + band
+            region = QRegion(rect.adjusted(-band, -band, band, band))
+            region -= QRegion(rect.adjusted(corner, band, -corner, -band))
+            region -= QRegion(rect.adjusted(band, corner, -band, -corner))
+        if config.show_decorations:
+            corners, lines, line_width = self.decoration_geometry()
+            pad = int(line_width) + 1
+            for corner in corners:
+                region += corner.adjusted(-1, -1, 1, 1)
+            for x1, y1, x2, y2 in lines:
+                region += QRect(QPoint(x1, y1), QPoint(x2, y2)).normalized().adjusted(-pad, -pad, pad, pad)
+
+        self._glow_region = (key, region)
+        return region
+
+    def dirty_region(self, old, new):
+        """比较两帧的内容, 返回需要重绘的区域
+
+        尺寸、配置、日期或调色表变化时整块重绘; 否则只包含变化的时间字符、
+        颜色变化时的文字, 以及发光级别变化时的边框和装饰。
+        """
+        if old is None:
+            return QRegion(self.rect())
+        (width, height, ratio, dpi, scale, config, old_time, old_date, old_slot, old_glow, old_rgba) = old
+        (_, _, _, _, _, _, new_time, new_date, new_slot, new_glow, new_rgba) = new
+        if (width, height, ratio, dpi, scale, config) != new[:6] or old_date != new_date or old_slot != new_slot:
+            return QRegion(self.rect())
+
+        region = QRegion()
+        if old_rgba != new_rgba:
+            region += self.text_region(new_time, new_date)
+        elif old_time != new_time:
+            region += self.changed_time_region(old_time, new_time, new_date)
+        if old_glow != new_glow:
+            region += self.glow_region()
+        return region
+
+
+class ModernTimeWidget(QWidget, ClockRenderer):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        RESOURCES.track('widgets', self)
+        self.lifecycle = WidgetLifecycle(self)
+        self.config = RenderConfig({})
+        self.glow_intensity, self.animation_phase = glow_state(_MONOTONIC.elapsed())
 
-        # 计算居中位置
-        fm = painter.fontMetrics()
-        text_width = fm.width(time_str)
-        text_height = fm.height()
+        # 动画属性
+        self._opacity = 1.0
+        self._scale = 1.0
 
-        x = (rect.width() - text_width) // 2
-        y = (rect.height() - text_height) // 2 + text_height // 2
+        # 实例布局: 所在屏幕的原点、在设置中的序号和版式缩放
+        self.layout_origin = QPoint()
+        self.instance_index = 0
+        self.layout_scale = 1.0
+
+        # 世界时钟: IANA 时区, 为空时显示本地时间
+        self.time_zone = ''
+        self.zone_label = ''
+
+        # 上次按其计算尺寸的 (设备像素比, 逻辑 DPI), 移到其他屏幕时才重新布局
+        self.layout_dpi = None
+
+        # 局部重绘: 屏幕上已绘制的帧内容、发光区域缓存和重绘统计
+        self.painted_state = None
+        self._glow_region = (None, QRegion())
+        self._border_paths = (None, None)
+        self.paint_count = 0
+        self.painted_area = 0
+
+        # image 渲染方式的后备缓冲及其中已合成的帧内容
+        self.back_buffer = None
+        self.back_buffer_state = None
+        # thread 渲染方式下控件在渲染线程中的双缓冲
+        self.render_slot = None
+
+        # 拖动期间关闭 Qt 阴影特效并暂停发光动画
+        self.dragging = False
+
+        # 静态图层 (背景、边框、装饰) 放在模块共享的缓存中, 只有文字每帧重绘
+        self.last_text_layout_ns = 0
+
+        # 发光动画由共享的动画时钟驱动, 帧率由调节器决定, 显示后才开始运行
+        self.governor = FrameRateGovernor(self, AnimationClock.instance())
+
+    def apply_config(self, config, preview=False):
+        """应用编译后的渲染配置, 只丢弃依赖设置发生变化的图层
+
+        preview 为 True 时 (设置面板实时预览) 控件只增大不缩小, 面板关闭后再
+        按最终设置调整一次尺寸。
+        """
+        for layer, key in config.layer_keys.items():
+            if self.config.layer_keys[layer] != key:
+                STATIC_LAYER_CACHE.discard(layer, self.config.layer_keys[layer])
+        previous_mode, self.config = self.config.shadow_mode, config
+        self.update_shadow_effect(previous_mode)
+        self.fit_to_content(grow_only=preview)
+        self.governor.evaluate()
+        self.update()
 
-        painter.drawText(x, y, time_str)
+    def update_shadow_effect(self, previous_mode):
+        """effect 模式使用 Qt 的阴影特效, 其他模式移除特效"""
+        mode = self.config.shadow_mode
+        if mode == previous_mode and (mode == 'effect') == (self.graphicsEffect() is not None):
+            return
+        if mode == 'effect':
+            shadow = QGraphicsDropShadowEffect()
+            shadow.setBlurRadius(SHADOW_BLUR_RADIUS)
+            shadow.setColor(SHADOW_COLOR)
+            shadow.setOffset(*SHADOW_OFFSET)
+            shadow.setEnabled(not self.dragging)
+            self.lifecycle.set_effect(shadow)
+        else:
+            self.lifecycle.set_effect(None)
+
+    def set_dragging(self, dragging):
+        """拖动期间关闭 Qt 阴影特效并暂停发光动画, 结束后恢复"""
+        self.dragging = dragging
+        effect = self.graphicsEffect()
+        if effect is not None:
+            effect.setEnabled(not dragging)
+        self.governor.evaluate()
+
+    def fit_to_content(self, grow_only=False):
+        """按当前屏幕的 DPI、字号和缩放调整控件尺寸, 保证文字不被裁剪
+
+        grow_only 时只在放不下时增大, 并按 PREVIEW_SIZE_STEP 取整留出余量。
+        """
+        self.layout_dpi = (self.devicePixelRatioF(), self.logicalDpiY())
+        width, height = fitted_clock_size(self.config, self.layout_scale, self.logicalDpiY(), self.zone_label)
+        if grow_only:
+            def grown(fitted, current):
+                if fitted <= current:
+                    return current
+                return -(-fitted // PREVIEW_SIZE_STEP) * PREVIEW_SIZE_STEP
+            width, height = grown(width, self.width()), grown(height, self.height())
+        if (width, height) != (self.width(), self.height()):
+            self.resize(width, height)
+
+    def new_layer(self):
+        """按设备像素比创建透明图层, 高 DPI 屏幕上不会被放大而变模糊"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        return pixmap
+
+    def shadow_layer(self):
+        """把卡片轮廓模糊成窗口阴影图层"""
+        return blur_silhouette(self.border_paths()[0], self.size(), self.devicePixelRatioF())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 监视所在窗口及其 QWindow (暴露事件只发给后者), 重复安装不会重复过滤
+        window = self.window()
+        if window is not self:
+            window.installEventFilter(self)
+            if window.windowHandle() is not None:
+                window.windowHandle().installEventFilter(self)
+        self.governor.evaluate()
+
+    def eventFilter(self, obj, event):
+        if event.type() in OCCLUSION_EVENTS:
+            self.governor.evaluate()
+        return False
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.governor.evaluate()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.governor.evaluate()
 
-        # 绘制日期
-        if date_str:
-            date_font = QFont(self.settings.get('font_family', 'Arial'))
-            date_font.setPointSize(int(self.settings.get('font_size', 48) * 0.35))
-            date_font.setWeight(QFont.Normal)
-            painter.setFont(date_font)
+    @pyqtProperty(float)
+    def opacity(self):
+        return self._opacity
 
-            date_color = QColor(text_color)
-            date_color.setAlpha(200)
-            painter.setPen(date_color)
+    @opacity.setter
+    def opacity(self, value):
+        self._opacity = value
+        self.update()
+
+    @pyqtProperty(float)
+    def scale(self):
+        return self._scale
 
-            fm_date = painter.fontMetrics()
-            date_width = fm_date.width(date_str)
+    @scale.setter
+    def scale(self, value):
+        self._scale = value
+        self.update()
 
-            date_x = (rect.width() - date_width) // 2
-            date_y = y + 40
+    def update_glow(self, glow=None):
+        """更新发光效果, 强度和相位只取决于时间, 帧率降低时动画速度不变"""
+        self.glow_intensity, self.animation_phase = glow or glow_state(_MONOTONIC.elapsed())
+        self.refresh()
+
+    def refresh(self):
+        """只重绘与屏幕上内容相比发生变化的区域"""
+        state = self.frame_state()
+        if self.config.render_mode == 'thread':
+            # 渲染线程合成完成后由 frame_ready() 请求重绘
+            self.request_frame(state)
+            return
+        region = self.dirty_region(self.painted_state, state)
+        if not region.isEmpty():
+            self.update(region)
 
-            painter.drawText(date_x, date_y, date_str)
+    def frame_state(self):
+        """当前应显示的帧内容, 同时作为合成帧缓存的键
 
-    def draw_decorative_elements(self, painter):
-        """绘制装饰元素"""
-        if not self.settings.get('show_decorations', True):
+        (宽, 高, 像素比, 逻辑 DPI, 缩放, 配置, 时间, 日期, 调色表下标, 发光级别, 文字颜色);
+        字号按逻辑 DPI 换算, 尺寸相同而 DPI 不同的时钟不能共用一帧。
+        """
+        # 获取实例所在时区的当前时间和日期
+        current_time, current_date = self.wall_clock()
+
+        config = self.config
+
+        # 构建时间和日期字符串, 世界时钟在日期前显示时区名称
+        time_str = current_time.toString(config.time_pattern)
+        date_str = current_date.toString(config.date_pattern) if config.show_date else ""
+        if self.zone_label:
+            date_str = f"{self.zone_label}  {date_str}" if date_str else self.zone_label
+
+        # 静态图层按 (尺寸, 调色表下标, 图层依赖的设置, 发光级别) 缓存
+        slot = config.palette.slot(current_time.hour(), current_time.minute())
+        return (self.width(), self.height(), self.devicePixelRatioF(), self.logicalDpiY(), self.layout_scale,
+                config, time_str, date_str, slot, self.quantized_glow(), self.text_color(current_time).rgba())
+
+    def paintEvent(self, event):
+        if PAINT_PROFILER.enabled:
+            PAINT_PROFILER.call('paint', self.paint_frame, event)
+        else:
+            self.paint_frame(event)
+
+    def paint_frame(self, event):
+        # 移到 DPI 不同的屏幕后, 在下一轮事件循环中重新布局一次
+        ratio = self.devicePixelRatioF()
+        if (ratio, self.logicalDpiY()) != self.layout_dpi:
+            self.layout_dpi = (ratio, self.logicalDpiY())
+            self.lifecycle.timer('fit', self.fit_to_content).start(0)
+
+        state = self.frame_state()
+        mode = self.config.render_mode
+        if mode == 'thread':
+            # 只贴上渲染线程最近完成的一帧, 绘制期间渲染线程不能交换缓冲
+            self.back_buffer = self.back_buffer_state = None
+            slot = self.request_frame(state)
+            with slot.lock:
+                if slot.front is not None:
+                    self.present(event, slot.front, slot.front_state)
             return
 
-        rect = self.rect()
+        self.release_render_slot()
+        if mode == 'image':
+            frame = self.update_back_buffer(state)
+        else:
+            # 尺寸、像素比、配置和内容相同的实例共用同一帧, 每个显示帧只合成一次
+            self.back_buffer = self.back_buffer_state = None
+            frame = SHARED_FRAME_CACHE.get(state)
+            if frame is None:
+                time_str, date_str, slot, glow, rgba = state[6:]
+                if PAINT_PROFILER.enabled:
+                    frame = PAINT_PROFILER.call('compose', self.compose_frame, time_str, date_str, slot, glow,
+                                                QColor.fromRgba(rgba))
+                else:
+                    frame = self.compose_frame(time_str, date_str, slot, glow, QColor.fromRgba(rgba))
+                SHARED_FRAME_CACHE.put(state, frame)
+        self.present(event, frame, state)
+
+    def present(self, event, frame, state):
+        """把帧中需要更新的区域绘制到控件上, state 为帧的内容"""
+        # 请求重绘之后内容又变化时, 本次区域之外的部分留到下一次补画
+        missing = self.dirty_region(self.painted_state, state) - event.region()
+        self.painted_state = state
+        if not missing.isEmpty():
+            self.update(missing)
 
-        # 绘制角落装饰
-        corner_size = 15
-        corner_color = QColor(self.settings.get('color', '#FFFFFF'))
-        corner_color.setAlpha(int(100 * self.glow_intensity))
+        painter = QPainter(self)
 
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(corner_color)
+        # 只绘制需要更新的区域
+        painter.setClipRegion(event.region())
 
-        # 左上角
-        painter.drawEllipse(10, 10, corner_size, corner_size)
+        # 应用透明度和缩放
+        painter.setOpacity(self._opacity)
 
-        # 右上角
-        painter.drawEllipse(rect.width() - corner_size - 10, 10, corner_size, corner_size)
+        # 缩放变换
+        center = self.rect().center()
+        painter.translate(center)
+        painter.scale(self._scale, self._scale)
+        painter.translate(-center)
 
-        # 左下角
-        painter.drawEllipse(10, rect.height() - corner_size - 10, corner_size, corner_size)
+        if PAINT_PROFILER.enabled:
+            PAINT_PROFILER.call('blit', self.blit, painter, frame)
+        else:
+            self.blit(painter, frame)
+
+        # 调试: 用每次不同的颜色标出本次重绘的区域
+        self.paint_count += 1
+        self.painted_area += sum(rect.width() * rect.height() for rect in event.region().rects())
+        if DEBUG_REPAINT_OVERLAY:
+            painter.resetTransform()
+            painter.setOpacity(1.0)
+            overlay = QColor.fromHsv(self.paint_count * 47 % 360, 255, 255, 70)
+            for rect in event.region().rects():
+                painter.fillRect(rect, overlay)
+                painter.setPen(overlay.darker())
+                painter.drawRect(rect.adjusted(0, 0, -1, -1))
 
-        # 右下角
-        painter.drawEllipse(rect.width() - corner_size - 10, rect.height() - corner_size - 10, corner_size, corner_size)
+        painter.end()
 
-        # 绘制中心装饰线
-        center_y = rect.height() // 2
-        line_color = QColor(self.settings.get('color', '#FFFFFF'))
-        line_color.setAlpha(int(50 * self.glow_intensity))
+    def wall_clock(self):
+        """返回 (QTime, QDate); 设置了时区时由偏移表换算, 不查询时区数据库"""
+        if not self.time_zone:
+            return QTime.currentTime(), QDate.currentDate()
+        local = ZONE_OFFSETS.local_datetime(self.time_zone, QDateTime.currentMSecsSinceEpoch())
+        return local.time(), local.date()
+
+    def update_back_buffer(self, state):
+        """把帧内容合成到可复用的后备缓冲中, 只重新合成与缓冲内容相比变化的区域
+
+        缓冲为预乘 ARGB 格式的 QImage, 绘制到后备存储时不需要格式转换;
+        只有尺寸或像素比变化时才重新分配。
+        """
+        ratio = self.devicePixelRatioF()
+        size = self.size() * ratio
+        buffer = self.back_buffer
+        if buffer is None or buffer.size() != size or buffer.devicePixelRatioF() != ratio:
+            buffer = QImage(size, QImage.Format_ARGB32_Premultiplied)
+            buffer.setDevicePixelRatio(ratio)
+            self.back_buffer, self.back_buffer_state = buffer, None
+
+        region = self.dirty_region(self.back_buffer_state, state)
+        if not region.isEmpty():
+            time_str, date_str, slot, glow, rgba = state[6:]
+            if PAINT_PROFILER.enabled:
+                PAINT_PROFILER.call('compose', self.compose_frame, time_str, date_str, slot, glow,
+                                    QColor.fromRgba(rgba), buffer, region)
+            else:
+                self.compose_frame(time_str, date_str, slot, glow, QColor.fromRgba(rgba), buffer, region)
+            self.back_buffer_state = state
+        return buffer
+
+    def request_frame(self, state):
+        """thread 渲染方式: 帧内容变化时向渲染线程提交请求, 返回控件的渲染槽"""
+        renderer = FrameRenderThread.instance()
+        slot = self.render_slot
+        if slot is None:
+            slot = self.render_slot = renderer.open_slot(self)
+        if state == slot.requested:
+            return slot
+        slot.requested = state
+
+        # 阴影模糊依赖 QGraphicsScene, 只能在 GUI 线程中进行, 按尺寸和设置缓存
+        shadow = None
+        if self.config.shadow_mode == 'cached':
+            key = (state[:3], self.layout_scale, self.config.layer_keys['shadow'])
+            if slot.shadow[0] != key:
+                slot.shadow = (key, self.static_layer('shadow', 0, 0).toImage())
+            shadow = slot.shadow[1]
+        renderer.submit(slot, (state, shadow))
+        return slot
+
+    def frame_ready(self):
+        """渲染线程完成了一帧, 重绘与屏幕上内容相比变化的区域"""
+        region = self.dirty_region(self.painted_state, self.render_slot.front_state)
+        if not region.isEmpty():
+            self.update(region)
+
+    def release_render_slot(self):
+        """释放渲染线程中的双缓冲, 尚未开始的请求一并丢弃"""
+        if self.render_slot is not None:
+            FrameRenderThread.instance().release(self.render_slot)
+            self.render_slot = None
+
+    def text_color(self, current_time):
+        """文字颜色, 开启动态颜色时随动画相位和秒数变化"""
+        if self.config.dynamic_color:
+            hue = int(self.animation_phase + current_time.second() * 6) % 360
+            return QColor.fromHsv(hue, 100, 255)
+        return self.config.color
+
+    def quantized_glow(self):
+        """将发光强度量化, 使相邻帧可以复用同一张缓存图层"""
+        return round(self.glow_intensity * GLOW_LEVELS) / GLOW_LEVELS
+
+    def get_cache_stats(self):
+        """返回共享静态图层缓存的命中统计"""
+        return STATIC_LAYER_CACHE.stats()
+
+
+class OffscreenClock(ClockRenderer):
+    """渲染线程中的时钟: 帧请求携带的尺寸、像素比、DPI 和配置的快照
+
+    图层为预乘 ARGB 的 QImage, 静态图层和文字排版使用渲染线程自己的缓存,
+    不与 GUI 线程共享 QPixmap 和 QStaticText。窗口阴影的模糊需要 QGraphicsScene,
+    由 GUI 线程完成后随请求传入。
+    """
+
+    def __init__(self, layer_cache, text_layouts):
+        self.layer_cache = layer_cache
+        self.text_layouts = text_layouts
+        self.config = RenderConfig({})
+        self.layout_scale = 1.0
+        self.shadow = None
+        self._size = QSize()
+        self._ratio = 1.0
+        self._dpi = 96
+        self._border_paths = (None, None)
+        self._glow_region = (None, QRegion())
+        self.last_text_layout_ns = 0
+
+    def load(self, request):
+        """取用帧请求 (帧内容, 阴影图层) 中的几何和配置"""
+        state, self.shadow = request
+        width, height, self._ratio, self._dpi, self.layout_scale, self.config = state[:6]
+        self._size = QSize(width, height)
+
+    def width(self):
+        return self._size.width()
+
+    def height(self):
+        return self._size.height()
+
+    def size(self):
+        return QSize(self._size)
+
+    def rect(self):
+        return QRect(QPoint(0, 0), self._size)
+
+    def devicePixelRatioF(self):
+        return self._ratio
+
+    def logicalDpiY(self):
+        return self._dpi
+
+    def new_layer(self):
+        image = QImage(self._size * self._ratio, QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(self._ratio)
+        image.fill(Qt.transparent)
+        return image
+
+    def shadow_layer(self):
+        return self.shadow
+
+
+class RenderSlot:
+    """一个时钟在渲染线程中的帧请求和双缓冲
+
+    front 为最近完成的一帧, 由 GUI 线程贴到控件上; back 由渲染线程合成下一帧,
+    合成完成后两者在 lock 内交换。两块缓冲只在尺寸或像素比变化时重新分配。
+    """
+
+    def __init__(self, widget, clock):
+        self.widget = widget
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.front = self.back = None
+        self.front_state = self.back_state = None
+        # GUI 线程最近提交的帧内容, 以及按 (尺寸, 阴影设置) 缓存的阴影图像
+        self.requested = None
+        self.shadow = (None, None)
+
+
+class FrameRenderWorker(QObject):
+    """运行在渲染线程中, 依次合成各时钟最新的帧请求"""
+
+    frameReady = pyqtSignal(object)
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    @pyqtSlot()
+    def run(self):
+        while True:
+            job = self.service.take()
+            if job is None:
+                return
+            slot, request = job
+            if slot.widget is not None:
+                self.render(slot, request)
+                self.frameReady.emit(slot)
+
+    def render(self, slot, request):
+        """把请求的帧合成到后缓冲, 只重新合成与缓冲内容相比变化的区域, 然后交换前后缓冲"""
+        clock = slot.clock
+        clock.load(request)
+        state = request[0]
+        ratio = clock.devicePixelRatioF()
+        size = clock.size() * ratio
+        buffer = slot.back
+        if buffer is None or buffer.size() != size or buffer.devicePixelRatioF() != ratio:
+            buffer = QImage(size, QImage.Format_ARGB32_Premultiplied)
+            buffer.setDevicePixelRatio(ratio)
+            slot.back_state = None
+
+        region = clock.dirty_region(slot.back_state, state)
+        if not region.isEmpty():
+            time_str, date_str, palette_slot, glow, rgba = state[6:]
+            if PAINT_PROFILER.enabled:
+                PAINT_PROFILER.call('compose', clock.compose_frame, time_str, date_str, palette_slot, glow,
+                                    QColor.fromRgba(rgba), buffer, region)
+            else:
+                clock.compose_frame(time_str, date_str, palette_slot, glow, QColor.fromRgba(rgba), buffer, region)
+
+        with slot.lock:
+            slot.front, slot.back = buffer, slot.front
+            slot.front_state, slot.back_state = state, slot.front_state
+        self.service.rendered += 1
 
-        pen = QPen(line_color, 2)
-        painter.setPen(pen)
 
-        # 左侧装饰线
-        painter.drawLine(20, center_y, 60, center_y)
+class FrameRenderThread(QObject):
+    """thread 渲染方式共用的渲染线程
 
-        # 右侧装饰线
-        painter.drawLine(rect.width() - 60, center_y, rect.width() - 20, center_y)
+    GUI 线程提交帧请求, 渲染线程合成到时钟的后缓冲并交换, 再通知 GUI 线程重绘。
+    每个时钟只保留最新的一个请求: 渲染线程跟不上时, 尚未开始的旧请求被新请求
+    替换并计为丢帧, 不会排队积压。线程在第一个请求时启动, 最后一个时钟释放或
+    事件循环退出时停止。
+    """
+
+    _instance = None
+    renderRequested = pyqtSignal()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__(QCoreApplication.instance())
+        self._lock = threading.Lock()
+        # 渲染槽 -> 最新的帧请求, 以及渲染线程是否已被唤醒
+        self._pending = {}
+        self._scheduled = False
+        self._slots = set()
+        self._thread = None
+        self._worker = None
+        # 只在渲染线程中使用的图层和排版缓存
+        self.layers = StaticLayerCache()
+        self.text_layouts = TextLayoutCache()
+        self.requests = 0
+        self.rendered = 0
+        self.dropped = 0
+        QCoreApplication.instance().aboutToQuit.connect(self.stop)
+
+    def open_slot(self, widget):
+        slot = RenderSlot(widget, OffscreenClock(self.layers, self.text_layouts))
+        self._slots.add(slot)
+        return slot
+
+    def release(self, slot):
+        with self._lock:
+            self._pending.pop(slot, None)
+        with slot.lock:
+            slot.widget = None
+            slot.front = slot.back = slot.front_state = slot.back_state = None
+        self._slots.discard(slot)
+        if not self._slots:
+            self.stop()
+            self.layers.clear()
+
+    def submit(self, slot, request):
+        """提交帧请求, 替换该时钟尚未开始合成的请求"""
+        self.requests += 1
+        with self._lock:
+            if slot in self._pending:
+                self.dropped += 1
+            self._pending[slot] = request
+            wake, self._scheduled = not self._scheduled, True
+        if wake:
+            self.start()
+            self.renderRequested.emit()
+
+    def take(self):
+        """渲染线程取出下一个请求, 没有请求时返回 None"""
+        with self._lock:
+            if not self._pending:
+                self._scheduled = False
+                return None
+            slot = next(iter(self._pending))
+            return slot, self._pending.pop(slot)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = QThread()
+        self._thread.setObjectName("clock-render")
+        self._worker = FrameRenderWorker(self)
+        self._worker.moveToThread(self._thread)
+        self.renderRequested.connect(self._worker.run)
+        self._worker.frameReady.connect(self._deliver)
+        self._thread.start()
+
+    def stop(self):
+        """停止渲染线程, 等待正在合成的一帧完成; 未开始的请求在下次绘制时重新提交"""
+        if self._thread is None:
+            return
+        self.renderRequested.disconnect(self._worker.run)
+        self._thread.quit()
+        self._thread.wait()
+        self._thread = self._worker = None
+        # 字体和 QStaticText 引用的字体引擎属于已结束的线程, 不能带到下一个线程中使用
+        self.text_layouts.clear()
+        with self._lock:
+            self._pending.clear()
+            self._scheduled = False
+        for slot in self._slots:
+            slot.requested = None
+
+    @pyqtSlot(object)
+    def _deliver(self, slot):
+        if slot.widget is not None:
+            slot.widget.frame_ready()
+
+    def stats(self):
+        return {
+            'running': self._thread is not None,
+            'slots': len(self._slots),
+            'requests': self.requests,
+            'rendered': self.rendered,
+            'dropped': self.dropped,
+            'layers': self.layers.stats(),
+        }
+
+
+# 为 True 时 initialize() 不读取 QSettings, 推迟到控件首次显示或打开设置时
+DEFER_SETTINGS_LOAD = False
+
+def parse_instances(value):
+    """解析时钟实例列表 JSON: [{"x": .., "y": .., "scale": .., "zone": ..}, ...]
+
+    返回规范化后的列表, 格式错误或时区未知时返回 None。缩放缺省为 1 并限制在
+    允许范围内, 时区缺省为空 (本地时间)。
+    """
+    try:
+        items = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(items, list):
+        return None
+
+    instances = []
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        try:
+            x, y = int(item['x']), int(item['y'])
+            scale = float(item.get('scale', 1.0))
+            zone = str(item.get('zone', ''))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if zone and not QTimeZone.isTimeZoneIdAvailable(zone.encode()):
+            return None
+        instances.append(dict(item, x=x, y=y, scale=min(MAX_INSTANCE_SCALE, max(MIN_INSTANCE_SCALE, scale)),
+                              zone=zone))
+    return instances
+
+
+# 时间插件的设置声明
+SETTINGS_SCHEMA = (
+    SettingSpec('show_seconds', bool, True, label="显示秒数"),
+    SettingSpec('show_date', bool, True, label="显示日期"),
+    SettingSpec('font_size', int, 48, minimum=24, maximum=96, label="字体大小"),
+    SettingSpec('font_family', str, 'Arial', validator=bool, label="字体", editor='font'),
+    SettingSpec('time_format', str, '24h', choices=('24h', '12h'), label="时间格式"),
+    SettingSpec('world_clock_zones', str, '', validator=lambda value: parse_zones(value) is not None,
+                label="世界时钟时区"),
+    SettingSpec('color', str, '#FFFFFF', validator=QColor.isValidColor, label="文字颜色", editor='color'),
+    SettingSpec('background_alpha', int, 60, minimum=0, maximum=255, label="背景透明度"),
+    SettingSpec('position_x', int, 100, label="X 坐标"),
+    SettingSpec('position_y', int, 100, label="Y 坐标"),
+    SettingSpec('one_per_screen', bool, False, label="每个屏幕一个时钟"),
+    SettingSpec('instances', str, '[]', validator=lambda value: parse_instances(value) is not None,
+                label="时钟实例 (JSON)"),
+    SettingSpec('border_radius', int, 20, minimum=0, maximum=50, label="圆角半径"),
+    SettingSpec('use_shadow', bool, True, label="文字阴影"),
+    SettingSpec('shadow_mode', str, 'cached', choices=SHADOW_MODES, label="窗口阴影"),
+    SettingSpec('render_mode', str, 'pixmap', choices=RENDER_MODES, label="渲染方式"),
+    SettingSpec('use_glow', bool, True, label="发光效果"),
+    SettingSpec('dynamic_color', bool, False, label="动态颜色"),
+    SettingSpec('show_decorations', bool, True, label="显示装饰"),
+    SettingSpec('animation_enabled', bool, True, label="启用动画"),
+    SettingSpec('animation_fps_cap', int, BASE_ANIMATION_FPS, minimum=0, maximum=60, label="动画帧率上限"),
+    SettingSpec('theme', str, 'auto', choices=('auto',) + tuple(THEME_PRESETS), label="主题"),
+    SettingSpec('paint_profiling', bool, False, label="记录绘制耗时"),
+    SettingSpec('profile_log_seconds', int, 0, minimum=0, maximum=3600, label="耗时日志间隔 (秒, 0 为关闭)",
+                editor='spin'),
+    SettingSpec('stall_watchdog', bool, False, label="检测事件循环卡顿"),
+)
+
+# 设置面板的选项卡及其包含的设置项
+SETTINGS_PAGES = (
+    ("时间显示", ('show_seconds', 'show_date', 'time_format', 'world_clock_zones')),
+    ("外观设置", ('font_size', 'font_family', 'color', 'background_alpha', 'border_radius', 'theme')),
+    ("动效设置", ('animation_enabled', 'use_shadow', 'shadow_mode', 'use_glow', 'dynamic_color', 'show_decorations',
+                 'animation_fps_cap', 'render_mode')),
+    ("位置调整", ('position_x', 'position_y', 'one_per_screen', 'instances')),
+    ("性能分析", ('paint_profiling', 'profile_log_seconds', 'stall_watchdog')),
+)
+
+SETTINGS_PANEL_STYLE = """
+    QWidget { background-color: #2c3e50; color: #ecf0f1; }
+    QTabWidget::pane { background-color: #34495e; border: none; }
+    QTabBar::tab { background-color: #34495e; padding: 6px 14px; }
+    QTabBar::tab:selected { background-color: #3498db; }
+    QPushButton { background-color: #3498db; color: white; border: none; padding: 6px 16px; }
+"""
 
 
 class TimeDisplayPlugin(PluginBase):
@@ -280,349 +1962,350 @@ class TimeDisplayPlugin(PluginBase):
         self.version = "2.0.0"
         self.description = "美观现代的桌面时间显示插件，支持动态效果和主题切换"
         self.author = "LiangYu"
-        self.settings = {
-            'show_seconds': True,
-            'show_date': True,
-            'font_size': 48,
-            'font_family': 'Arial',
-            'time_format': '24h',
-            'color': '#FFFFFF',
-            'background_alpha': 60,
-            'position_x': 100,
-            'position_y': 100,
-            'border_radius': 20,
-            'use_shadow': True,
-            'use_glow': True,
-            'dynamic_color': False,
-            'show_decorations': True,
-            'animation_enabled': True,
-            'theme': 'auto'  # auto, morning, afternoon, evening, night
-        }
-        self.widget = None
+        self.settings = {spec.key: spec.default for spec in SETTINGS_SCHEMA}
+        self.settings_loaded = False
+        self.init_time_ms = 0.0
+        self.window = None
+        self.widgets = []
+        # 正在淡出、尚未释放的时钟
+        self.closing_widgets = []
+        self.instance_signature = None
         self.timer = None
-        self.fade_animation = None
-
+        self.settings_panel = None
+        self.preview_timer = None
+        self.pending_preview = {}
+        self.profile_timer = None
+        # 拖动: 按下时指针相对控件左上角的偏移, 尚未应用的最新位置, 以及事件/移动计数
+        self.drag_position = None
+        self.drag_target = None
+        self.drag_events = 0
+        self.drag_moves = 0
+        # 编译后的渲染配置, 加载设置或首次访问时才创建 (QFont 和调色表的构建不计入插件创建)
+        self._render_config = None
+
+    @watched
     def initialize(self, app_instance):
-        print(f"[{self.name}] 插件初始化")
+        elapsed = QElapsedTimer()
+        elapsed.start()
         self.app = app_instance
 
-        # 从QSettings加载保存的设置
-        settings = QSettings("VideoWallpaper", "PluginSettings")
-        settings.beginGroup(f"plugins/{self.name}")
+        # 从QSettings加载保存的设置, 可延迟到控件首次显示
+        if not DEFER_SETTINGS_LOAD:
+            self.ensure_settings_loaded()
 
-        # 加载设置
-        for key, default_value in self.settings.items():
-            if isinstance(default_value, bool):
-                self.settings[key] = settings.value(key, default_value, type=bool)
-            elif isinstance(default_value, int):
-                self.settings[key] = settings.value(key, default_value, type=int)
-            else:
-                self.settings[key] = settings.value(key, default_value, type=str)
-
-        settings.endGroup()
+        self.init_time_ms = elapsed.nsecsElapsed() / 1e6
+        print(f"[{self.name}] 插件初始化 ({self.init_time_ms:.2f} ms)")
 
+    def ensure_settings_loaded(self):
+        """按设置声明一次性加载整个设置组"""
+        if self.settings_loaded:
+            return
+        self.settings_loaded = True
+        self.settings.update(load_settings(f"plugins/{self.name}", SETTINGS_SCHEMA))
+        self.rebuild_render_config()
+
+    @property
+    def widget(self):
+        """第一个时钟实例, 没有实例时为 None"""
+        return self.widgets[0] if self.widgets else None
+
+    @property
+    def render_config(self):
+        if self._render_config is None:
+            self._render_config = RenderConfig(self.settings)
+        return self._render_config
+
+    @watched
     def on_wallpaper_start(self, video_path, loop):
         print(f"[{self.name}] 壁纸启动: {os.path.basename(video_path)}")
         self.start_timer()
+        for widget in self.widgets:
+            widget.governor.set_suspended(False)
 
+    @watched
     def on_wallpaper_stop(self):
         print(f"[{self.name}] 壁纸停止")
         self.stop_timer()
-        if self.widget:
-            self.fade_out_widget()
+        SettingsPersistence.instance().flush()
+        for widget in list(self.widgets):
+            widget.governor.set_suspended(True)
+            self.fade_out_widget(widget)
+        self.update_profiling()
 
+    @watched
     def on_settings_changed(self, settings):
         print(f"[{self.name}] 设置已更改")
-        self.settings.update(settings)
-        if self.widget:
-            self.widget.settings = self.settings
-            self.widget.update()
+        self.ensure_settings_loaded()
+        self.apply_settings(settings)
+
+    def rebuild_render_config(self, preview=False):
+        """设置变化后重新编译渲染配置并应用到控件"""
+        self._render_config = RenderConfig(self.settings)
+        for widget in self.widgets:
+            widget.apply_config(self.render_config, preview)
+        self.update_profiling()
+
+    def update_profiling(self):
+        """按设置开关绘制耗时记录、定期日志和卡顿检测; 后两者只在有时钟显示时运行"""
+        PAINT_PROFILER.enabled = self.settings['paint_profiling']
+        interval = self.settings['profile_log_seconds'] * 1000
+        if PAINT_PROFILER.enabled and interval and self.widgets:
+            if self.profile_timer is None:
+                self.profile_timer = QTimer()
+                self.profile_timer.timeout.connect(self.log_paint_profile)
+            if not self.profile_timer.isActive() or self.profile_timer.interval() != interval:
+                self.profile_timer.start(interval)
+        elif self.profile_timer is not None:
+            self.profile_timer.stop()
+        watchdog = StallWatchdog.active()
+        if self.settings['stall_watchdog'] and self.widgets:
+            StallWatchdog.instance().acquire(self.name)
+        elif watchdog is not None:
+            watchdog.release(self.name)
+
+    def get_paint_profile(self):
+        """返回各绘制阶段和定时器回调最近样本的 p50/p95/最大耗时 (毫秒)"""
+        return PAINT_PROFILER.report()
+
+    def log_paint_profile(self):
+        """输出一行各阶段的 p50/p95/最大耗时"""
+        report = PAINT_PROFILER.report()
+        if not report:
+            return
+        stages = ", ".join(f"{stage} {item['p50_ms']:.2f}/{item['p95_ms']:.2f}/{item['max_ms']:.2f}"
+                           for stage, item in report.items())
+        print(f"[{self.name}] 绘制耗时 (ms, p50/p95/max): {stages}")
 
     def start_timer(self):
-        if self.timer:
-            self.timer.stop()
-
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
+        """订阅共享时钟调度器"""
+        self.timer = ClockTickScheduler.instance()
+        self.timer.subscribe(self)
 
     def stop_timer(self):
         if self.timer:
-            self.timer.stop()
+            self.timer.unsubscribe(self)
             self.timer = None
 
-    def show_settings_dialog(self):
-        root = tk.Tk()
-        root.title(f"{self.name} 设置")
-        root.geometry("500x700")
-        root.configure(bg='#2c3e50')
-
-        # 设置现代化样式
-        style = ttk.Style()
-        style.theme_use('clam')
-
-        # 自定义样式
-        style.configure('Modern.TNotebook', background='#34495e')
-        style.configure('Modern.TFrame', background='#34495e')
-        style.configure('Modern.TLabel', background='#34495e', foreground='#ecf0f1')
-        style.configure('Modern.TButton', background='#3498db', foreground='white')
-
-        # 创建选项卡
-        tab_control = ttk.Notebook(root, style='Modern.TNotebook')
-
-        # 时间显示选项卡
-        time_tab = ttk.Frame(tab_control, style='Modern.TFrame')
-        tab_control.add(time_tab, text="时间显示")
-
-        # 外观选项卡
-        appearance_tab = ttk.Frame(tab_control, style='Modern.TFrame')
-        tab_control.add(appearance_tab, text="外观设置")
-
-        # 动效选项卡
-        effects_tab = ttk.Frame(tab_control, style='Modern.TFrame')
-        tab_control.add(effects_tab, text="动效设置")
-
-        # 位置选项卡
-        position_tab = ttk.Frame(tab_control, style='Modern.TFrame')
-        tab_control.add(position_tab, text="位置调整")
-
-        tab_control.pack(expand=1, fill="both", padx=10, pady=10)
-
-        # 时间显示选项
-        ttk.Label(time_tab, text="显示秒数:", style='Modern.TLabel').grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        show_seconds_var = tk.BooleanVar(value=self.settings['show_seconds'])
-        ttk.Checkbutton(time_tab, variable=show_seconds_var).grid(row=0, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(time_tab, text="显示日期:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        show_date_var = tk.BooleanVar(value=self.settings['show_date'])
-        ttk.Checkbutton(time_tab, variable=show_date_var).grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(time_tab, text="时间格式:", style='Modern.TLabel').grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        time_format_var = tk.StringVar(value=self.settings['time_format'])
-        ttk.Radiobutton(time_tab, text="24小时制", variable=time_format_var, value="24h").grid(row=2, column=1,
-                                                                                               sticky=tk.W, padx=10,
-                                                                                               pady=5)
-        ttk.Radiobutton(time_tab, text="12小时制", variable=time_format_var, value="12h").grid(row=3, column=1,
-                                                                                               sticky=tk.W, padx=10,
-                                                                                               pady=5)
-
-        # 外观选项
-        ttk.Label(appearance_tab, text="字体大小:", style='Modern.TLabel').grid(row=0, column=0, sticky=tk.W, padx=10,
-                                                                                pady=5)
-        font_size_var = tk.IntVar(value=self.settings['font_size'])
-        ttk.Scale(appearance_tab, from_=24, to=96, orient=tk.HORIZONTAL, variable=font_size_var, length=200).grid(row=0,
-                                                                                                                  column=1,
-                                                                                                                  padx=10,
-                                                                                                                  pady=5)
-        size_label = ttk.Label(appearance_tab, text=str(font_size_var.get()), style='Modern.TLabel')
-        size_label.grid(row=0, column=2, padx=5, pady=5)
-
-        def update_size_label(*args):
-            size_label.config(text=str(font_size_var.get()))
-
-        font_size_var.trace('w', update_size_label)
-
-        # 字体选择
-        available_fonts = ["Arial", "Microsoft YaHei", "SimHei", "Helvetica", "Times New Roman", "Consolas",
-                           "Comic Sans MS"]
-        ttk.Label(appearance_tab, text="字体:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=10,
-                                                                            pady=5)
-        font_family_var = tk.StringVar(value=self.settings['font_family'])
-        font_combo = ttk.Combobox(appearance_tab, textvariable=font_family_var, values=available_fonts, width=20)
-        font_combo.grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
-
-        # 颜色选择
-        ttk.Label(appearance_tab, text="文字颜色:", style='Modern.TLabel').grid(row=2, column=0, sticky=tk.W, padx=10,
-                                                                                pady=5)
-        color_var = tk.StringVar(value=self.settings['color'])
-        color_frame = tk.Frame(appearance_tab, bg=self.settings['color'], width=30, height=20)
-        color_frame.grid(row=2, column=1, sticky=tk.W, padx=10, pady=5)
-
-        def choose_color():
-            color = colorchooser.askcolor(initialcolor=color_var.get())[1]
-            if color:
-                color_var.set(color)
-                color_frame.config(bg=color)
-
-        ttk.Button(appearance_tab, text="选择", command=choose_color).grid(row=2, column=2, padx=5, pady=5)
-
-        # 背景透明度
-        ttk.Label(appearance_tab, text="背景透明度:", style='Modern.TLabel').grid(row=3, column=0, sticky=tk.W, padx=10,
-                                                                                  pady=5)
-        bg_alpha_var = tk.IntVar(value=self.settings['background_alpha'])
-        ttk.Scale(appearance_tab, from_=0, to=255, orient=tk.HORIZONTAL, variable=bg_alpha_var, length=200).grid(row=3,
-                                                                                                                 column=1,
-                                                                                                                 padx=10,
-                                                                                                                 pady=5)
-        alpha_label = ttk.Label(appearance_tab, text=str(bg_alpha_var.get()), style='Modern.TLabel')
-        alpha_label.grid(row=3, column=2, padx=5, pady=5)
-
-        def update_alpha_label(*args):
-            alpha_label.config(text=str(bg_alpha_var.get()))
-
-        bg_alpha_var.trace('w', update_alpha_label)
-
-        # 圆角半径
-        ttk.Label(appearance_tab, text="圆角半径:", style='Modern.TLabel').grid(row=4, column=0, sticky=tk.W, padx=10,
-                                                                                pady=5)
-        border_radius_var = tk.IntVar(value=self.settings['border_radius'])
-        ttk.Scale(appearance_tab, from_=0, to=50, orient=tk.HORIZONTAL, variable=border_radius_var, length=200).grid(
-            row=4, column=1, padx=10, pady=5)
-        radius_label = ttk.Label(appearance_tab, text=str(border_radius_var.get()), style='Modern.TLabel')
-        radius_label.grid(row=4, column=2, padx=5, pady=5)
-
-        def update_radius_label(*args):
-            radius_label.config(text=str(border_radius_var.get()))
-
-        border_radius_var.trace('w', update_radius_label)
-
-        # 动效选项
-        ttk.Label(effects_tab, text="启用动画:", style='Modern.TLabel').grid(row=0, column=0, sticky=tk.W, padx=10,
-                                                                             pady=5)
-        animation_var = tk.BooleanVar(value=self.settings['animation_enabled'])
-        ttk.Checkbutton(effects_tab, variable=animation_var).grid(row=0, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(effects_tab, text="文字阴影:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=10,
-                                                                             pady=5)
-        use_shadow_var = tk.BooleanVar(value=self.settings['use_shadow'])
-        ttk.Checkbutton(effects_tab, variable=use_shadow_var).grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(effects_tab, text="发光效果:", style='Modern.TLabel').grid(row=2, column=0, sticky=tk.W, padx=10,
-                                                                             pady=5)
-        use_glow_var = tk.BooleanVar(value=self.settings['use_glow'])
-        ttk.Checkbutton(effects_tab, variable=use_glow_var).grid(row=2, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(effects_tab, text="动态颜色:", style='Modern.TLabel').grid(row=3, column=0, sticky=tk.W, padx=10,
-                                                                             pady=5)
-        dynamic_color_var = tk.BooleanVar(value=self.settings['dynamic_color'])
-        ttk.Checkbutton(effects_tab, variable=dynamic_color_var).grid(row=3, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(effects_tab, text="显示装饰:", style='Modern.TLabel').grid(row=4, column=0, sticky=tk.W, padx=10,
-                                                                             pady=5)
-        show_decorations_var = tk.BooleanVar(value=self.settings['show_decorations'])
-        ttk.Checkbutton(effects_tab, variable=show_decorations_var).grid(row=4, column=1, sticky=tk.W, padx=10, pady=5)
-
-        # 位置选项
-        ttk.Label(position_tab, text="X 坐标:", style='Modern.TLabel').grid(row=0, column=0, sticky=tk.W, padx=10,
-                                                                            pady=5)
-        x_pos_var = tk.IntVar(value=self.settings['position_x'])
-        ttk.Entry(position_tab, textvariable=x_pos_var, width=10).grid(row=0, column=1, sticky=tk.W, padx=10, pady=5)
-
-        ttk.Label(position_tab, text="Y 坐标:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=10,
-                                                                            pady=5)
-        y_pos_var = tk.IntVar(value=self.settings['position_y'])
-        ttk.Entry(position_tab, textvariable=y_pos_var, width=10).grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
-
-        def save_settings():
-            new_settings = {
-                'show_seconds': show_seconds_var.get(),
-                'show_date': show_date_var.get(),
-                'font_size': font_size_var.get(),
-                'font_family': font_family_var.get(),
-                'time_format': time_format_var.get(),
-                'color': color_var.get(),
-                'background_alpha': bg_alpha_var.get(),
-                'position_x': x_pos_var.get(),
-                'position_y': y_pos_var.get(),
-                'border_radius': border_radius_var.get(),
-                'use_shadow': use_shadow_var.get(),
-                'use_glow': use_glow_var.get(),
-                'dynamic_color': dynamic_color_var.get(),
-                'show_decorations': show_decorations_var.get(),
-                'animation_enabled': animation_var.get()
-            }
-
-            # 保存设置
-            settings = QSettings("VideoWallpaper", "PluginSettings")
-            settings.beginGroup(f"plugins/{self.name}")
-            for key, value in new_settings.items():
-                settings.setValue(key, value)
-            settings.endGroup()
+    def needs_second_ticks(self):
+        """隐藏秒数时只需要整分 tick"""
+        return self.render_config.show_seconds
 
-            self.settings.update(new_settings)
-
-            if self.widget:
-                self.widget.settings = self.settings
-                self.widget.move(self.settings['position_x'], self.settings['position_y'])
-                self.widget.update()
-
-            messagebox.showinfo("保存成功", "设置已保存并应用")
-            root.destroy()
-
-        # 保存按钮
-        button_frame = tk.Frame(root, bg='#2c3e50')
-        button_frame.pack(fill='x', padx=10, pady=10)
-
-        save_button = tk.Button(button_frame, text="保存设置", command=save_settings,
-                                bg='#3498db', fg='white', font=('Arial', 12, 'bold'),
-                                relief='flat', padx=20, pady=8)
-        save_button.pack(side='right', padx=5)
-
-        cancel_button = tk.Button(button_frame, text="取消", command=root.destroy,
-                                  bg='#e74c3c', fg='white', font=('Arial', 12, 'bold'),
-                                  relief='flat', padx=20, pady=8)
-        cancel_button.pack(side='right', padx=5)
-
-        root.mainloop()
+    def get_scheduler_stats(self):
+        """返回共享调度器的漂移和唤醒统计"""
+        return ClockTickScheduler.instance().stats()
 
+    @watched
+    def show_settings_dialog(self):
+        """打开非模态设置面板, 修改实时生效"""
+        self.ensure_settings_loaded()
+        if self.settings_panel is None:
+            self.settings_panel = SettingsPanel(
+                f"{self.name} 设置", SETTINGS_SCHEMA, SETTINGS_PAGES,
+                on_change=self.preview_settings, on_save=self.save_settings,
+                style_sheet=SETTINGS_PANEL_STYLE, on_close=self.end_preview)
+        self.settings_panel.open_with(self.settings)
+
+    def apply_settings(self, changes, preview=False):
+        """应用部分设置, 控件保持不变, 只重新编译渲染配置
+
+        preview 为 True 时来自设置面板的实时预览, 时钟尺寸只增大不缩小。修改先按
+        设置声明校验, 越界值夹紧, 非法值和未声明的键被忽略。
+        """
+        changes, rejected = validate_changes(SETTINGS_SCHEMA, changes)
+        if rejected:
+            print(f"[{self.name}] 忽略无效的设置: {'; '.join(rejected)}")
+        if not changes:
+            return
+        self.settings.update(changes)
+        self.rebuild_render_config(preview)
+        if self.window is not None and self.instance_layout_signature() != self.instance_signature:
+            self.rebuild_clocks()
+        elif 'position_x' in changes or 'position_y' in changes:
+            self.sync_shared_position()
+        if self.timer:
+            self.timer.reschedule()
+
+    def preview_settings(self, changes):
+        """设置面板的实时预览: 合并连续的修改, 每个显示帧最多应用一次"""
+        self.pending_preview.update(changes)
+        if self.preview_timer is None:
+            self.preview_timer = QTimer()
+            self.preview_timer.setSingleShot(True)
+            self.preview_timer.timeout.connect(self.flush_preview)
+        if not self.preview_timer.isActive():
+            self.preview_timer.start(self.frame_interval_ms())
+
+    @watched
+    def flush_preview(self):
+        """应用尚未生效的预览修改"""
+        if self.preview_timer:
+            self.preview_timer.stop()
+        if self.pending_preview:
+            changes, self.pending_preview = self.pending_preview, {}
+            self.apply_settings(changes, preview=True)
+
+    def end_preview(self):
+        """设置面板关闭: 应用剩余的预览修改, 再按最终设置调整一次时钟尺寸"""
+        self.flush_preview()
+        for widget in self.widgets:
+            widget.fit_to_content()
+
+    def frame_interval_ms(self, widget=None):
+        """控件所在屏幕的刷新间隔"""
+        widget = widget or self.widget
+        screen = None
+        if widget and widget.window().windowHandle():
+            screen = widget.window().windowHandle().screen()
+        screen = screen or QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 0
+        return max(1, int(1000 / (refresh_rate or 60)))
+
+    @watched
+    def save_settings(self):
+        """由持久化服务合并写入全部设置"""
+        self.flush_preview()
+        SettingsPersistence.instance().queue(
+            f"plugins/{self.name}", {spec.key: self.settings[spec.key] for spec in SETTINGS_SCHEMA})
+        print(f"[{self.name}] 设置已保存")
+
+    @watched
     def operate_on_window(self, window):
-        """在壁纸上显示现代化时间控件"""
+        """在壁纸上显示现代化时间控件, 每个实例一个"""
+        self.ensure_settings_loaded()
+        self.window = window
         try:
-            # 创建现代化时间控件
-            self.widget = ModernTimeWidget(window)
-            self.widget.settings = self.settings
-
-            # 设置控件位置和大小
-            self.widget.setGeometry(
-                self.settings['position_x'],
-                self.settings['position_y'],
-                400,
-                200
-            )
-
-            # 设置窗口属性
-            self.widget.setWindowFlags(
-                Qt.FramelessWindowHint |
-                Qt.WindowStaysOnTopHint |
-                Qt.SubWindow
-            )
-            self.widget.setAttribute(Qt.WA_TranslucentBackground, True)
-
-            # 添加阴影效果
-            shadow = QGraphicsDropShadowEffect()
-            shadow.setBlurRadius(20)
-            shadow.setColor(QColor(0, 0, 0, 80))
-            shadow.setOffset(0, 5)
-            self.widget.setGraphicsEffect(shadow)
-
-            # 设置拖拽功能
-            self.setup_drag_functionality()
+            for origin, x, y, scale, zone in self.instance_layout(window):
+                self.create_clock(window, origin, x, y, scale, zone)
+            self.instance_signature = self.instance_layout_signature()
+            self.update_profiling()
 
-            # 设置右键菜单
-            self.setup_context_menu()
-
-            # 淡入动画
-            self.fade_in_widget()
-
-            print(f"[{self.name}] 现代化时间显示插件已启动")
+            print(f"[{self.name}] 现代化时间显示插件已启动 ({len(self.widgets)} 个时钟)")
         except Exception as e:
             print(f"[{self.name}] 显示时间时出错: {e}")
             traceback.print_exc()
 
-    def setup_drag_functionality(self):
+    def instance_layout(self, window):
+        """返回各时钟实例的 (布局原点, x, y, 缩放, 时区)
+
+        设置了实例列表时按列表创建; 设置了世界时钟时区时, 从 position_x/
+        position_y 开始按网格为每个时区放一个缩小的时钟; 开启每屏一个时钟时,
+        在与窗口相交的每个屏幕上按相对位置各放一个; 否则只有一个本地时钟。
+        """
+        x, y = self.settings['position_x'], self.settings['position_y']
+        instances = parse_instances(self.settings['instances'])
+        if instances:
+            return [(QPoint(), item['x'], item['y'], item['scale'], item['zone']) for item in instances]
+
+        zones = parse_zones(self.settings['world_clock_zones'])
+        if zones:
+            sizes = [fitted_clock_size(self.render_config, WORLD_CLOCK_SCALE, window.logicalDpiY(), zone_label(zone))
+                     for zone in zones]
+            cell_width = max(width for width, _ in sizes) + WORLD_CLOCK_SPACING
+            cell_height = max(height for _, height in sizes) + WORLD_CLOCK_SPACING
+            columns = max(1, (window.width() - x) // cell_width)
+            return [
+                (QPoint(index % columns * cell_width, index // columns * cell_height), x, y, WORLD_CLOCK_SCALE, zone)
+                for index, zone in enumerate(zones)
+            ]
+
+        if self.settings['one_per_screen']:
+            layout = []
+            for screen in QGuiApplication.screens():
+                geometry = screen.geometry()
+                origin = window.mapFromGlobal(geometry.topLeft())
+                if window.rect().intersects(QRect(origin, geometry.size())):
+                    layout.append((origin, x, y, 1.0, ''))
+            if layout:
+                return layout
+
+        return [(QPoint(), x, y, 1.0, '')]
+
+    def instance_layout_signature(self):
+        """决定实例数量、缩放和时区的设置, 变化时需要重建时钟"""
+        instances = parse_instances(self.settings['instances']) or ()
+        return (self.settings['one_per_screen'], self.settings['world_clock_zones'],
+                tuple((item['x'], item['y'], item['scale'], item['zone']) for item in instances))
+
+    def create_clock(self, window, origin, x, y, scale, zone=''):
+        """创建一个时钟实例, 共用插件的渲染配置和模块级缓存"""
+        widget = ModernTimeWidget(window)
+        widget.layout_origin = origin
+        widget.instance_index = len(self.widgets)
+        widget.layout_scale = scale
+        widget.time_zone = zone
+        widget.zone_label = zone_label(zone) if zone else ''
+
+        # 设置控件位置, 尺寸由渲染配置按 DPI 和文字大小决定
+        widget.move(origin.x() + x, origin.y() + y)
+        widget.apply_config(self.render_config)
+
+        # 设置窗口属性
+        widget.setWindowFlags(
+            Qt.FramelessWindowHint |
+            Qt.WindowStaysOnTopHint |
+            Qt.SubWindow
+        )
+        widget.setAttribute(Qt.WA_TranslucentBackground, True)
+
+        # 设置拖拽功能
+        self.setup_drag_functionality(widget)
+
+        # 设置右键菜单
+        self.setup_context_menu(widget)
+
+        self.widgets.append(widget)
+
+        # 淡入动画
+        self.fade_in_widget(widget)
+        return widget
+
+    def rebuild_clocks(self):
+        """实例列表或每屏设置变化时重建全部时钟"""
+        for widget in list(self.widgets):
+            self.destroy_clock(widget)
+        self.operate_on_window(self.window)
+
+    def destroy_clock(self, widget):
+        """停止时钟的全部定时器、动画和特效后释放控件"""
+        for widgets in (self.widgets, self.closing_widgets):
+            if widget in widgets:
+                widgets.remove(widget)
+        widget.lifecycle.shutdown()
+        widget.close()
+        widget.deleteLater()
+        # 合成帧只对当前时刻有用, 没有时钟后不再保留
+        if not self.widgets and not self.closing_widgets:
+            SHARED_FRAME_CACHE.clear()
+        self.update_profiling()
+
+    def uses_instance_list(self):
+        return bool(parse_instances(self.settings['instances']))
+
+    def sync_shared_position(self):
+        """按 position_x/position_y 移动共用该位置的时钟 (单个或每屏一个)"""
+        if self.uses_instance_list():
+            return
+        offset = QPoint(self.settings['position_x'], self.settings['position_y'])
+        for widget in self.widgets:
+            widget.move(widget.layout_origin + offset)
+
+    def setup_drag_functionality(self, widget):
         """设置拖拽功能"""
 
         def mousePressEvent(event):
             if event.button() == Qt.LeftButton:
-                self.drag_position = event.globalPos() - self.widget.frameGeometry().topLeft()
+                self.drag_position = event.globalPos() - widget.frameGeometry().topLeft()
                 event.accept()
 
         def mouseMoveEvent(event):
-            if event.buttons() & Qt.LeftButton:
-                new_pos = event.globalPos() - self.drag_position
-                self.widget.move(new_pos)
-                self.settings['position_x'] = self.widget.x()
-                self.settings['position_y'] = self.widget.y()
+            if event.buttons() & Qt.LeftButton and self.drag_position is not None:
+                self.drag_to(widget, event.globalPos() - self.drag_position)
+                event.accept()
+
+        def mouseReleaseEvent(event):
+            """拖拽结束时恢复特效并保存一次位置"""
+            if event.button() == Qt.LeftButton:
+                self.end_drag(widget)
                 event.accept()
 
         def mouseDoubleClickEvent(event):
@@ -631,11 +2314,74 @@ class TimeDisplayPlugin(PluginBase):
                 self.cycle_theme()
                 event.accept()
 
-        self.widget.mousePressEvent = mousePressEvent
-        self.widget.mouseMoveEvent = mouseMoveEvent
-        self.widget.mouseDoubleClickEvent = mouseDoubleClickEvent
+        widget.mousePressEvent = mousePressEvent
+        widget.mouseMoveEvent = mouseMoveEvent
+        widget.mouseReleaseEvent = mouseReleaseEvent
+        widget.mouseDoubleClickEvent = mouseDoubleClickEvent
+
+    def drag_timer(self, widget):
+        return widget.lifecycle.timer('drag', lambda: self.flush_drag(widget))
+
+    def drag_to(self, widget, position):
+        """记录拖动的最新位置, 每个显示帧最多移动一次控件
+
+        空闲时立即移动并开始计时; 一帧之内到达的位置只保留最新的一个,
+        由定时器在帧末应用。高回报率鼠标每秒上千个事件也只产生与刷新率相当的移动。
+        """
+        self.drag_events += 1
+        self.drag_target = position
+        if not widget.dragging:
+            widget.set_dragging(True)
+        if not self.drag_timer(widget).isActive():
+            self.flush_drag(widget)
+
+    def flush_drag(self, widget):
+        """应用最新的拖动位置, 移动后等待一帧再应用下一个位置"""
+        target = self.drag_target
+        if target is None or target == widget.pos():
+            return
+        widget.move(target)
+        self.drag_moves += 1
+        if widget.dragging:
+            self.drag_timer(widget).start(self.frame_interval_ms(widget))
+
+    def end_drag(self, widget):
+        """拖动结束: 恢复特效, 应用最后的位置并只保存一次"""
+        self.drag_position = None
+        if not widget.dragging:
+            return
+        self.drag_timer(widget).stop()
+        widget.set_dragging(False)
+        self.flush_drag(widget)
+        self.drag_target = None
+        self.save_position(widget)
+
+    def get_drag_stats(self):
+        """返回拖动收到的事件数、实际移动次数和被合并的事件数"""
+        return {
+            'events': self.drag_events,
+            'moves': self.drag_moves,
+            'coalesced': self.drag_events - self.drag_moves,
+        }
 
-    def setup_context_menu(self):
+    def save_position(self, widget):
+        """记录拖拽后的位置并加入待写队列"""
+        instances = parse_instances(self.settings['instances'])
+        if instances:
+            instances[widget.instance_index].update(x=widget.x(), y=widget.y())
+            self.settings['instances'] = json.dumps(instances)
+            self.instance_signature = self.instance_layout_signature()
+            values = {'instances': self.settings['instances']}
+        else:
+            # 单个或每屏一个时钟共用相对位置, 其余屏幕上的时钟跟随移动
+            position = widget.pos() - widget.layout_origin
+            self.settings['position_x'] = position.x()
+            self.settings['position_y'] = position.y()
+            self.sync_shared_position()
+            values = {'position_x': position.x(), 'position_y': position.y()}
+        SettingsPersistence.instance().queue(f"plugins/{self.name}", values)
+
+    def setup_context_menu(self, widget):
         """设置右键菜单"""
 
         def contextMenuEvent(event):
@@ -660,12 +2406,12 @@ class TimeDisplayPlugin(PluginBase):
             """)
 
             # 设置菜单
-            settings_action = QAction("⚙️ 设置", self.widget)
+            settings_action = QAction("⚙️ 设置", widget)
             settings_action.triggered.connect(self.show_settings_dialog)
             menu.addAction(settings_action)
 
             # 主题切换
-            theme_action = QAction("🎨 切换主题", self.widget)
+            theme_action = QAction("🎨 切换主题", widget)
             theme_action.triggered.connect(self.cycle_theme)
             menu.addAction(theme_action)
 
@@ -674,33 +2420,25 @@ class TimeDisplayPlugin(PluginBase):
             # 透明度调整
             opacity_menu = menu.addMenu("🔍 透明度")
             for opacity in [0.3, 0.5, 0.7, 0.9, 1.0]:
-                action = QAction(f"{int(opacity * 100)}%", self.widget)
-                action.triggered.connect(lambda checked, o=opacity: self.set_opacity(o))
+                action = QAction(f"{int(opacity * 100)}%", widget)
+                action.triggered.connect(lambda checked, o=opacity: self.set_opacity(o, widget))
                 opacity_menu.addAction(action)
 
             menu.addSeparator()
 
             # 关闭选项
-            close_action = QAction("❌ 关闭插件", self.widget)
+            close_action = QAction("❌ 关闭插件", widget)
             close_action.triggered.connect(self.close_widget)
             menu.addAction(close_action)
 
             menu.exec_(event.globalPos())
 
-        self.widget.contextMenuEvent = contextMenuEvent
+        widget.contextMenuEvent = contextMenuEvent
 
+    @watched
     def cycle_theme(self):
         """循环切换主题"""
-        themes = {
-            'morning': {'color': '#ff6b35', 'bg_alpha': 70},
-            'afternoon': {'color': '#4a90e2', 'bg_alpha': 80},
-            'evening': {'color': '#ff5e5b', 'bg_alpha': 90},
-            'night': {'color': '#7b68ee', 'bg_alpha': 60},
-            'neon': {'color': '#00ffff', 'bg_alpha': 50, 'dynamic_color': True},
-            'elegant': {'color': '#ffd700', 'bg_alpha': 40}
-        }
-
-        theme_names = list(themes.keys())
+        theme_names = list(THEME_PRESETS.keys())
         current_theme = getattr(self, 'current_theme', 'morning')
 
         try:
@@ -710,67 +2448,129 @@ class TimeDisplayPlugin(PluginBase):
             next_index = 0
 
         next_theme = theme_names[next_index]
-        theme_settings = themes[next_theme]
+        theme_settings = THEME_PRESETS[next_theme]
 
         self.settings.update(theme_settings)
+        self.settings['theme'] = next_theme
         self.current_theme = next_theme
-
-        if self.widget:
-            self.widget.settings = self.settings
-            self.widget.update()
+        self.rebuild_render_config()
 
         print(f"[{self.name}] 切换到主题: {next_theme}")
 
-    def set_opacity(self, opacity):
+    @watched
+    def set_opacity(self, opacity, widget):
         """设置透明度"""
-        if self.widget:
-            self.widget.setWindowOpacity(opacity)
+        widget.setWindowOpacity(opacity)
 
-    def fade_in_widget(self):
+    def fade_in_widget(self, widget):
         """淡入动画"""
         if not self.settings.get('animation_enabled', True):
-            self.widget.show()
+            widget.show()
             return
 
-        self.widget.show()
-
-        self.fade_animation = QPropertyAnimation(self.widget, b"opacity")
-        self.fade_animation.setDuration(800)
-        self.fade_animation.setStartValue(0.0)
-        self.fade_animation.setEndValue(1.0)
-        self.fade_animation.setEasingCurve(QEasingCurve.OutCubic)
-        self.fade_animation.start()
+        widget.show()
+        widget.lifecycle.animate(b"opacity", 800, 0.0, 1.0, QEasingCurve.OutCubic)
 
-    def fade_out_widget(self):
-        """淡出动画"""
-        if not self.widget:
-            return
+    def fade_out_widget(self, widget):
+        """淡出动画, 控件立即从实例列表中移除, 动画结束后释放"""
+        if widget in self.widgets:
+            self.widgets.remove(widget)
 
         if not self.settings.get('animation_enabled', True):
-            self.widget.close()
-            self.widget = None
+            self.destroy_clock(widget)
             return
 
-        self.fade_animation = QPropertyAnimation(self.widget, b"opacity")
-        self.fade_animation.setDuration(500)
-        self.fade_animation.setStartValue(1.0)
-        self.fade_animation.setEndValue(0.0)
-        self.fade_animation.setEasingCurve(QEasingCurve.InCubic)
-        self.fade_animation.finished.connect(self.widget.close)
-        self.fade_animation.finished.connect(lambda: setattr(self, 'widget', None))
-        self.fade_animation.start()
+        self.closing_widgets.append(widget)
+        animation = widget.lifecycle.animate(b"opacity", 500, 1.0, 0.0, QEasingCurve.InCubic)
+        animation.finished.connect(lambda: self.destroy_clock(widget))
+
+    def release_clocks(self):
+        """不等淡出动画, 立即释放全部时钟 (包括正在淡出的)"""
+        for widget in self.widgets + self.closing_widgets:
+            self.destroy_clock(widget)
+
+    def get_render_cache_stats(self):
+        """返回共享静态图层缓存的命中/未命中次数, frames 为合成帧缓存"""
+        stats = STATIC_LAYER_CACHE.stats()
+        stats['frames'] = SHARED_FRAME_CACHE.stats()
+        return stats
+
+    def get_render_thread_stats(self):
+        """返回 thread 渲染方式的请求数、合成帧数、丢弃的请求数和渲染线程的图层缓存"""
+        return FrameRenderThread.instance().stats()
+
+    def get_persistence_stats(self):
+        """返回设置持久化的写入次数和 flush 耗时"""
+        return SettingsPersistence.instance().stats()
+
+    def get_effective_fps(self):
+        """返回各实例中最高的发光动画有效帧率, 空闲时为 0"""
+        return max((widget.governor.effective_fps for widget in self.widgets), default=0)
+
+    def get_animation_stats(self):
+        """返回共享动画时钟的实例数和唤醒次数"""
+        return AnimationClock.instance().stats()
+
+    def get_repaint_stats(self):
+        """返回重绘次数和重绘面积占整块重绘面积的比例"""
+        paints = sum(widget.paint_count for widget in self.widgets)
+        area = sum(widget.painted_area for widget in self.widgets)
+        full_area = sum(widget.paint_count * widget.width() * widget.height() for widget in self.widgets)
+        return {'paints': paints, 'painted_area': area, 'area_ratio': area / full_area if full_area else 0}
+
+    def get_resource_stats(self):
+        """返回存活的控件、定时器、动画、特效和像素图数量, 以及动画时钟和调度器的登记数
+
+        pixmaps 包括共享图层缓存、合成帧缓存和各时钟的后备缓冲; render_slots 为
+        thread 渲染方式下各时钟在渲染线程中的双缓冲。
+        """
+        clocks = self.widgets + self.closing_widgets
+        live = RESOURCES.stats()['live']
+        return {
+            'clocks': len(clocks),
+            'widgets': live.get('widgets', 0),
+            'timers': live.get('timers', 0),
+            'animations': live.get('animations', 0),
+            'effects': live.get('effects', 0),
+            'pixmaps': STATIC_LAYER_CACHE.stats()['entries'] + SHARED_FRAME_CACHE.stats()['entries'] +
+            sum(1 for widget in clocks if widget.back_buffer is not None),
+            'render_slots': FrameRenderThread.instance().stats()['slots'],
+            'animation_clock_entries': AnimationClock.instance().stats()['widgets'],
+            'scheduler_subscribers': ClockTickScheduler.instance().stats()['subscribers'],
+        }
+
+    def get_stall_stats(self):
+        """返回事件循环延迟, 以及本插件回调造成的卡顿次数、时长和调用栈采样"""
+        return StallWatchdog.instance().stats(self.name)
+
+    def get_zone_stats(self):
+        """返回时区偏移表的时区数和时区数据库查询次数"""
+        return ZONE_OFFSETS.stats()
+
+    def get_text_layout_stats(self):
+        """返回文字排版缓存统计和最近一帧的排版耗时"""
+        stats = TEXT_LAYOUT_CACHE.stats()
+        stats['last_layout_ns'] = self.widget.last_text_layout_ns if self.widget else 0
+        return stats
 
+    @watched
     def update_time(self):
-        """更新时间显示"""
-        if self.widget:
-            self.widget.update()
+        """更新时间显示, 所有实例共用这一次 tick"""
+        for widget in self.widgets:
+            # 除窗口事件和定期复查外, 每次时钟 tick 也重新评估遮挡
+            widget.governor.evaluate()
+            widget.refresh()
 
+    @watched
     def close_widget(self):
         """关闭控件"""
         self.stop_timer()
-        if self.widget:
-            self.fade_out_widget()
+        SettingsPersistence.instance().flush()
+        if self.widgets:
+            for widget in list(self.widgets):
+                self.fade_out_widget(widget)
             print(f"[{self.name}] 控件已关闭")
+        self.update_profiling()
 
 
 def create_plugin():
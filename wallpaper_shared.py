@@ -0,0 +1,646 @@
+"""视频壁纸插件的共享服务
+
+time.py 和 notepad.py 共用的事件循环卡顿检测、合并写入的设置持久化、设置项声明
+和由声明生成的设置面板。本文件与插件放在同一目录, 由插件导入, 本身不是插件
+(没有 create_plugin())。
+
+通过 findChild 共享的服务带有 VERSION, 接口或行为变化时递增; 仍自带旧版实现的
+插件文件会创建自己的服务, 不会调用到对方的实现。
+"""
+import traceback
+from collections import deque
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QTabWidget, QFormLayout, \
+    QDialogButtonBox, QCheckBox, QComboBox, QSlider, QSpinBox, QColorDialog, QPlainTextEdit, QLineEdit
+from PyQt5.QtCore import Qt, QSettings, QObject, QTimer, QElapsedTimer, QEvent, QCoreApplication
+from PyQt5.QtGui import QColor, QTextCursor, QFontDatabase
+import sys
+import functools
+import threading
+
+
+# 事件循环卡顿检测: 心跳间隔、判定为卡顿的阈值、保留的卡顿记录数和栈帧数
+STALL_HEARTBEAT_MS = 100
+STALL_THRESHOLD_MS = 250
+STALL_HISTORY = 64
+STALL_STACK_DEPTH = 12
+
+
+class StallWatchdog(QObject):
+    """事件循环卡顿检测
+
+    GUI 线程上的心跳定时器记录事件循环延迟; 辅助线程发现心跳超过阈值未到达时,
+    用 sys._current_frames() 采集 GUI 线程的调用栈, 并记下当时正在执行的插件
+    回调。心跳恢复后按实际间隔确定卡顿时长。回调长时间占用 GIL 时辅助线程
+    采不到栈, 仍按回调的执行时间记录归属。服务挂在 QApplication 下, 各插件
+    文件中版本相同的服务复用同一个对象, 卡顿记录可按插件查询。
+
+    检测默认不运行: 插件按设置调用 acquire() 登记后才启动心跳和辅助线程,
+    最后一个插件 release() 后两者都停止; 未运行时插件回调也不登记。
+    """
+
+    VERSION = 1
+    OBJECT_NAME = f"VideoWallpaperStallWatchdog.v{VERSION}"
+
+    @classmethod
+    def instance(cls):
+        app = QCoreApplication.instance()
+        service = app.findChild(QObject, cls.OBJECT_NAME) if app else None
+        if service is None:
+            service = cls(app)
+        return service
+
+    @classmethod
+    def active(cls):
+        """正在运行的检测服务, 没有时返回 None"""
+        app = QCoreApplication.instance()
+        service = app.findChild(QObject, cls.OBJECT_NAME) if app else None
+        return service if service is not None and service.running() else None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName(self.OBJECT_NAME)
+        self._clock = QElapsedTimer()
+        self._clock.start()
+        self._gui_thread = threading.get_ident()
+        self._lock = threading.Lock()
+
+        # GUI 线程维护: 正在执行的回调 (插件, 回调名) 栈, 最近一次超过阈值的回调
+        self._active = []
+        self._slow_callback = None
+        self._last_beat = 0
+        # 辅助线程写入: 本次卡顿的栈采样
+        self._sample = None
+
+        self.latencies = deque(maxlen=STALL_HISTORY * 8)
+        self.stalls = deque(maxlen=STALL_HISTORY)
+        self.callback_count = 0
+
+        # 登记了检测的插件
+        self._owners = set()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(STALL_HEARTBEAT_MS)
+        self._timer.timeout.connect(self._beat)
+
+        # 心跳时置位, 辅助线程阻塞等待它而不是轮询
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # 不连接 aboutToQuit: 宿主可能多次进入和退出事件循环
+        self.destroyed.connect(self._stop.set)
+        self.destroyed.connect(self._wake.set)
+
+    def acquire(self, owner):
+        """登记使用检测的插件, 第一个登记时启动心跳和辅助线程"""
+        if owner in self._owners:
+            return
+        self._owners.add(owner)
+        if self._thread is None:
+            self._last_beat = 0
+            self._slow_callback = None
+            self._stop.clear()
+            self._wake.clear()
+            self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+            self._thread.start()
+            self._timer.start()
+
+    def release(self, owner):
+        """注销插件, 没有插件登记时停止检测"""
+        self._owners.discard(owner)
+        if not self._owners:
+            self.stop()
+
+    def running(self):
+        return self._thread is not None
+
+    def enter(self, plugin, callback):
+        """插件回调开始执行, 返回交给 leave() 的令牌"""
+        self.callback_count += 1
+        self._active.append((plugin, callback))
+        return self._clock.elapsed()
+
+    def leave(self, started):
+        """插件回调执行完毕, 超过阈值时记下以便心跳恢复后归属"""
+        plugin, callback = self._active.pop()
+        elapsed = self._clock.elapsed() - started
+        if elapsed >= STALL_THRESHOLD_MS:
+            self._slow_callback = (plugin, callback, elapsed)
+
+    def _beat(self):
+        self._wake.set()
+        now = self._clock.elapsed()
+        gap = now - self._last_beat if self._last_beat else STALL_HEARTBEAT_MS
+        self._last_beat = now
+        self.latencies.append(max(0, gap - STALL_HEARTBEAT_MS))
+
+        with self._lock:
+            sample, self._sample = self._sample, None
+        slow, self._slow_callback = self._slow_callback, None
+        if gap < STALL_THRESHOLD_MS:
+            return
+
+        if sample is not None:
+            callbacks, stack = sample
+        elif slow is not None:
+            callbacks, stack = [slow[:2]], []
+        else:
+            callbacks, stack = [], []
+        plugin, callback = callbacks[-1] if callbacks else (None, None)
+        self.stalls.append({
+            'plugin': plugin,
+            'callback': callback,
+            'callbacks': [f"{owner}.{name}" for owner, name in callbacks],
+            'duration_ms': gap,
+            'ended_ms': now,
+            'stack': stack,
+        })
+
+    def _watch(self):
+        """辅助线程: 每次心跳后等待下一次心跳, 超过阈值未到达时采集一次 GUI 线程的调用栈"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if self._wake.wait(STALL_THRESHOLD_MS / 1000):
+                continue
+            frame = sys._current_frames().get(self._gui_thread)
+            stack = traceback.format_stack(frame)[-STALL_STACK_DEPTH:] if frame is not None else []
+            with self._lock:
+                self._sample = (list(self._active), [line.rstrip() for line in stack])
+
+    def stop(self):
+        """停止心跳和辅助线程, 清除全部登记"""
+        self._owners.clear()
+        self._timer.stop()
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self, plugin=None):
+        """返回事件循环延迟和卡顿记录; 给出插件名时只统计该插件回调造成的卡顿"""
+        stalls = [stall for stall in self.stalls if plugin is None or stall['plugin'] == plugin]
+        by_callback = {}
+        for stall in stalls:
+            by_callback[stall['callback']] = by_callback.get(stall['callback'], 0) + 1
+        latencies = sorted(self.latencies)
+        return {
+            'running': self.running(),
+            'heartbeat_ms': STALL_HEARTBEAT_MS,
+            'threshold_ms': STALL_THRESHOLD_MS,
+            'latency_p50_ms': latencies[len(latencies) // 2] if latencies else 0,
+            'latency_p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0,
+            'latency_max_ms': latencies[-1] if latencies else 0,
+            'stalls': len(stalls),
+            'stall_max_ms': max((stall['duration_ms'] for stall in stalls), default=0),
+            'stall_total_ms': sum(stall['duration_ms'] for stall in stalls),
+            'by_callback': by_callback,
+            'recent': [dict(stall) for stall in stalls],
+        }
+
+
+def watched(method):
+    """插件入口的装饰器: 回调执行期间的事件循环卡顿归属到该插件和回调"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        watchdog = StallWatchdog.active()
+        if watchdog is None:
+            return method(self, *args, **kwargs)
+        started = watchdog.enter(self.name, method.__name__)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            watchdog.leave(started)
+    return wrapper
+
+
+# 设置写入的合并窗口 (毫秒)
+SETTINGS_DEBOUNCE_MS = 500
+
+
+class SettingsPersistence(QObject):
+    """合并写入的 QSettings 持久化服务
+
+    写入先进入待写队列, 在防抖窗口结束、壁纸停止、控件关闭或程序退出时
+    通过同一个 QSettings 对象一次写入并 sync。不存放在 QSettings 中的数据
+    (如笔记文件) 可以登记写入函数, 在同一时机执行。实例挂在 QApplication 下,
+    各插件文件中版本相同的服务复用同一个对象。
+    """
+
+    VERSION = 1
+    OBJECT_NAME = f"VideoWallpaperSettingsPersistence.v{VERSION}"
+
+    @classmethod
+    def instance(cls):
+        app = QCoreApplication.instance()
+        service = app.findChild(QObject, cls.OBJECT_NAME) if app else None
+        if service is None:
+            service = cls(app)
+        return service
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName(self.OBJECT_NAME)
+        self._settings = QSettings("VideoWallpaper", "PluginSettings")
+        self._pending = {}
+        # 登记的写入函数, 同一个键只保留最后一次登记的
+        self._writers = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SETTINGS_DEBOUNCE_MS)
+        self._timer.timeout.connect(self.flush)
+
+        # 写入统计
+        self.queued_count = 0
+        self.write_count = 0
+        self.flush_count = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
+
+    def queue(self, group, values):
+        """加入待写队列, 每次写入都会重新开始防抖计时"""
+        self._pending.setdefault(group, {}).update(values)
+        self.queued_count += len(values)
+        self._timer.start()
+
+    def queue_write(self, key, write):
+        """登记一个在 flush 时执行的写入函数, 同样重新开始防抖计时"""
+        self._writers[key] = write
+        self.queued_count += 1
+        self._timer.start()
+
+    def read_group(self, group):
+        """一次读取整个设置组的原始值, 尚未写入的值优先"""
+        self._settings.beginGroup(group)
+        values = {key: self._settings.value(key) for key in self._settings.childKeys()}
+        self._settings.endGroup()
+        values.update(self._pending.get(group, {}))
+        return values
+
+    def flush(self):
+        """立即写入所有待写的设置"""
+        self._timer.stop()
+        if not self._pending and not self._writers:
+            return
+
+        pending, self._pending = self._pending, {}
+        writers, self._writers = self._writers, {}
+        elapsed = QElapsedTimer()
+        elapsed.start()
+        for write in writers.values():
+            write()
+        self.write_count += len(writers)
+        for group, values in pending.items():
+            self._settings.beginGroup(group)
+            for key, value in values.items():
+                self._settings.setValue(key, value)
+            self._settings.endGroup()
+            self.write_count += len(values)
+        if pending:
+            self._settings.sync()
+
+        self.flush_count += 1
+        self.last_flush_ms = elapsed.nsecsElapsed() / 1e6
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+
+    def stats(self):
+        """返回写入次数和 flush 耗时"""
+        return {
+            'pending': sum(len(values) for values in self._pending.values()) + len(self._writers),
+            'queued': self.queued_count,
+            'writes': self.write_count,
+            'flushes': self.flush_count,
+            'last_flush_ms': self.last_flush_ms,
+            'max_flush_ms': self.max_flush_ms,
+        }
+
+
+class SettingSpec:
+    """设置项声明: 键、类型、默认值, 取值范围或校验函数, 以及设置面板的展示方式"""
+
+    __slots__ = ('key', 'type', 'default', 'minimum', 'maximum', 'choices', 'validator', 'label', 'editor')
+
+    def __init__(self, key, type, default, minimum=None, maximum=None, choices=None, validator=None,
+                 label=None, editor=None):
+        self.key = key
+        self.type = type
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.validator = validator
+        # 设置面板中的显示名称和编辑器类型 (为 None 时按类型推断)
+        self.label = label
+        self.editor = editor
+
+    def parse(self, raw):
+        """将原始值转换为声明类型, 越界时夹紧, 非法时抛出 ValueError"""
+        try:
+            if self.type is bool:
+                value = raw if isinstance(raw, bool) else str(raw).strip().lower() in ('true', '1', 'yes')
+            else:
+                value = self.type(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.key}: 无法转换为 {self.type.__name__}: {raw!r}") from None
+
+        if self.minimum is not None:
+            value = max(self.minimum, value)
+        if self.maximum is not None:
+            value = min(self.maximum, value)
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{self.key}: 不在可选值中: {value!r}")
+        if self.validator is not None and not self.validator(value):
+            raise ValueError(f"{self.key}: 校验失败: {value!r}")
+        return value
+
+    def coerce(self, raw):
+        """将 QSettings 读出的原始值转换为声明类型, 越界时夹紧, 非法时回退默认值"""
+        try:
+            return self.parse(raw)
+        except ValueError:
+            return self.default
+
+
+def load_settings(group, schema):
+    """一次读取整个设置组, 按声明转换和校验, 缺失项使用默认值"""
+    stored = SettingsPersistence.instance().read_group(group)
+    return {
+        spec.key: spec.coerce(stored[spec.key]) if spec.key in stored else spec.default
+        for spec in schema
+    }
+
+
+def validate_changes(schema, changes):
+    """按声明校验部分设置, 越界时夹紧
+
+    返回 (有效的修改, 被拒绝项的说明); 非法值和未声明的键不在有效修改中,
+    对应设置保留原值。
+    """
+    specs = {spec.key: spec for spec in schema}
+    valid, rejected = {}, []
+    for key, raw in changes.items():
+        spec = specs.get(key)
+        if spec is None:
+            rejected.append(f"{key}: 未声明的设置项")
+            continue
+        try:
+            valid[key] = spec.parse(raw)
+        except ValueError as error:
+            rejected.append(str(error))
+    return valid, rejected
+
+
+class SettingsPanel(QWidget):
+    """由设置声明生成的非模态 Qt 设置面板
+
+    与壁纸运行在同一个事件循环中, 打开时不会阻塞动画和其他插件。每次修改
+    立即通过 on_change 应用到插件, 文本框在编辑完成 (回车或失去焦点) 时才
+    应用; 非法输入不应用, 保留上一个有效值并将编辑器标红。保存时调用 on_save,
+    取消或关闭窗口时通过 on_change 恢复打开面板前的设置。面板关闭后调用
+    on_close (如果给出)。
+    """
+
+    # 输入非法的编辑器的样式, 追加在面板样式表之后
+    INVALID_STYLE = '*[invalid="true"] { border: 1px solid #e74c3c; }'
+    # 多行文本超过此字符数时分块填入, 每轮事件循环插入一块
+    TEXT_CHUNK_CHARS = 256 * 1024
+
+    def __init__(self, title, schema, pages, on_change, on_save, style_sheet="", on_close=None):
+        super().__init__(None, Qt.Window | Qt.WindowStaysOnTopHint)
+        self.setWindowTitle(title)
+        self.setStyleSheet(style_sheet + self.INVALID_STYLE)
+        self._specs = {spec.key: spec for spec in schema}
+        self._on_change = on_change
+        self._on_save = on_save
+        self._on_close = on_close
+        self._editors = {}
+        # 多行文本框没有 editingFinished 信号, 在失去焦点时应用
+        self._focus_editors = {}
+        # 正在分块填入的多行编辑器及其定时器
+        self._fill_timers = {}
+        # 字体编辑器在面板显示后才填入字体列表, 首次打开不等待枚举系统字体
+        self._font_editors = []
+        self._snapshot = {}
+        # 各设置项最后一次应用的有效值
+        self._values = {}
+        self._saved = False
+
+        layout = QVBoxLayout(self)
+        if len(pages) > 1:
+            tabs = QTabWidget()
+            for page_title, keys in pages:
+                tabs.addTab(self._build_page(keys), page_title)
+            layout.addWidget(tabs)
+        else:
+            layout.addWidget(self._build_page(pages[0][1]))
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Save).setText("保存设置")
+        buttons.button(QDialogButtonBox.Cancel).setText("取消")
+        buttons.accepted.connect(self.save)
+        buttons.rejected.connect(self.close)
+        layout.addWidget(buttons)
+
+    def _build_page(self, keys):
+        page = QWidget()
+        form = QFormLayout(page)
+        for key in keys:
+            spec = self._specs[key]
+            form.addRow(f"{spec.label or key}:", self._create_editor(spec))
+        return page
+
+    def _create_editor(self, spec):
+        """按声明的编辑器类型创建控件, 修改时立即回调"""
+        key = spec.key
+        editor = spec.editor
+        if editor is None:
+            if spec.type is bool:
+                editor = 'check'
+            elif spec.choices is not None:
+                editor = 'choice'
+            elif spec.type is int:
+                editor = 'slider' if spec.minimum is not None and spec.maximum is not None else 'spin'
+            else:
+                editor = 'text'
+
+        if editor == 'check':
+            widget = QCheckBox()
+            widget.toggled.connect(lambda value: self._changed(key, value))
+            setter = widget.setChecked
+        elif editor == 'choice':
+            widget = QComboBox()
+            widget.addItems([str(choice) for choice in spec.choices])
+            widget.currentTextChanged.connect(lambda value: self._changed(key, value))
+            setter = widget.setCurrentText
+        elif editor == 'slider':
+            widget = QWidget()
+            row = QHBoxLayout(widget)
+            row.setContentsMargins(0, 0, 0, 0)
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(spec.minimum, spec.maximum)
+            value_label = QLabel()
+            value_label.setMinimumWidth(32)
+            slider.valueChanged.connect(lambda value: value_label.setText(str(value)))
+            slider.valueChanged.connect(lambda value: self._changed(key, value))
+            row.addWidget(slider)
+            row.addWidget(value_label)
+
+            def setter(value):
+                slider.setValue(value)
+                value_label.setText(str(value))
+        elif editor == 'spin':
+            widget = QSpinBox()
+            widget.setRange(-100000 if spec.minimum is None else spec.minimum,
+                            100000 if spec.maximum is None else spec.maximum)
+            widget.valueChanged.connect(lambda value: self._changed(key, value))
+            setter = widget.setValue
+        elif editor == 'color':
+            widget = QPushButton()
+            widget.setFixedWidth(80)
+
+            def setter(value):
+                widget.setText(value)
+                widget.setStyleSheet(f"background-color: {value};")
+
+            def choose_color():
+                color = QColorDialog.getColor(QColor(widget.text()), self)
+                if color.isValid():
+                    setter(color.name())
+                    self._changed(key, color.name())
+
+            widget.clicked.connect(choose_color)
+        elif editor == 'font':
+            widget = QComboBox()
+            widget.setEditable(True)
+            widget.setInsertPolicy(QComboBox.NoInsert)
+            self._font_editors.append(widget)
+            widget.activated[str].connect(lambda value: self._changed(key, value))
+            widget.lineEdit().editingFinished.connect(lambda: self._changed(key, widget.currentText()))
+            setter = widget.setCurrentText
+        elif editor == 'multiline':
+            widget = QPlainTextEdit()
+            widget.installEventFilter(self)
+            self._focus_editors[widget] = key
+            setter = functools.partial(self._fill_text, widget)
+        else:
+            widget = QLineEdit()
+            widget.editingFinished.connect(lambda: self._changed(key, widget.text()))
+            setter = widget.setText
+
+        self._editors[key] = (widget, setter)
+        return widget
+
+    def _changed(self, key, value):
+        """校验修改: 非法时标记编辑器并保留上一个有效值, 有效且与当前值不同时应用"""
+        widget = self._editors[key][0]
+        try:
+            value = self._specs[key].parse(value)
+        except ValueError:
+            self._mark_invalid(widget, True)
+            return
+        self._mark_invalid(widget, False)
+        if value != self._values.get(key):
+            self._values[key] = value
+            self._on_change({key: value})
+
+    def _mark_invalid(self, widget, invalid):
+        if bool(widget.property('invalid')) == invalid:
+            return
+        widget.setProperty('invalid', invalid)
+        widget.setToolTip("无效的值, 未应用" if invalid else "")
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+
+    def eventFilter(self, obj, event):
+        # 分块填入期间编辑器只读, 其内容还不完整
+        if event.type() == QEvent.FocusOut and obj in self._focus_editors and obj not in self._fill_timers:
+            self._changed(self._focus_editors[obj], obj.toPlainText())
+        return super().eventFilter(obj, event)
+
+    def _fill_text(self, widget, text):
+        """填入多行文本; 长文本先填入第一块, 其余每轮事件循环追加一块, 填完之前只读"""
+        timer = self._fill_timers.pop(widget, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        chunk = self.TEXT_CHUNK_CHARS
+        widget.setPlainText(text[:chunk])
+        widget.setReadOnly(len(text) > chunk)
+        if len(text) <= chunk:
+            return
+
+        offset = [chunk]
+        timer = QTimer(widget)
+        timer.setInterval(0)
+
+        def append():
+            cursor = QTextCursor(widget.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text[offset[0]:offset[0] + chunk])
+            offset[0] += chunk
+            if offset[0] >= len(text):
+                timer.stop()
+                timer.deleteLater()
+                del self._fill_timers[widget]
+                widget.setReadOnly(False)
+                widget.moveCursor(QTextCursor.Start)
+
+        timer.timeout.connect(append)
+        timer.start()
+        self._fill_timers[widget] = timer
+
+    def _fill_fonts(self):
+        """填入系统字体列表, 保留编辑框中的当前值"""
+        editors, self._font_editors = self._font_editors, []
+        if not editors:
+            return
+        families = QFontDatabase().families()
+        for widget in editors:
+            text = widget.currentText()
+            widget.blockSignals(True)
+            widget.addItems(families)
+            widget.setCurrentText(text)
+            widget.blockSignals(False)
+
+    def open_with(self, settings):
+        """载入当前设置并显示, 已打开时只激活窗口"""
+        if not self.isVisible():
+            self._snapshot = {key: settings[key] for key in self._editors}
+            self._values = dict(self._snapshot)
+            self._saved = False
+            for key, (widget, setter) in self._editors.items():
+                self._mark_invalid(widget, False)
+                widget.blockSignals(True)
+                for child in widget.findChildren(QWidget):
+                    child.blockSignals(True)
+                setter(settings[key])
+                for child in widget.findChildren(QWidget):
+                    child.blockSignals(False)
+                widget.blockSignals(False)
+            self.show()
+            if self._font_editors:
+                QTimer.singleShot(0, self._fill_fonts)
+        self.raise_()
+        self.activateWindow()
+
+    def save(self):
+        self._saved = True
+        self._on_save()
+        self.close()
+
+    def closeEvent(self, event):
+        # 未保存就关闭时恢复打开前的设置
+        if not self._saved and self._snapshot:
+            self._on_change(dict(self._snapshot))
+        self._snapshot = {}
+        super().closeEvent(event)
+        if self._on_close is not None:
+            self._on_close()